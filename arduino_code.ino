@@ -109,6 +109,29 @@ byte outputFrameBuffer[MAX_NUMBER_OF_CHANNELS*2];             //Output frame buf
 #define LINE_FEED 10                                          //\n character
 
 byte sendBufferIndex = 0;                                     //index of output frame buffer that contains data
+
+//------------------------------ PROTOCOL V2 ---------------------------------
+//Opt-in framing selected with the "p:2;" command. Samples are sent in batches:
+//  header byte 0x80 | sequence (7 bits), frames as 7-bit byte pairs,
+//  two 7-bit Fletcher checksum bytes (s1 += b; s2 += s1 over header and data)
+//Only the header has the high bit set. Batches that are ready while the previous
+//one is still being sent are dropped, and the sequence number shows the gap.
+//Between batches the TX handler sends 0x00 filler so that servo PWM keeps running.
+#define V2_BATCH_SAMPLES 32                                   //samples per batch (whole frames only)
+#define V2_BATCH_BUFFER_SIZE (1 + 2*V2_BATCH_SAMPLES + 2)
+byte protocolVersion = 1;                                     //1: frame per sample, 2: checksummed batches
+byte batchBuffer[2][V2_BATCH_BUFFER_SIZE];                    //one batch is filled while the other one is sent
+byte batchFillBuffer = 0;                                     //index of batch buffer being filled
+byte batchFillLength = 0;                                     //bytes already in the batch being filled
+byte batchFrames = V2_BATCH_SAMPLES;                          //frames per batch for current number of channels
+byte batchFramesFilled = 0;
+byte batchSequence = 0;                                       //sequence number of the batch being filled
+byte batchSum1 = 0;                                           //running checksums of the batch being filled
+byte batchSum2 = 0;
+volatile byte batchSendBuffer = 0;                            //index of batch buffer being sent
+volatile byte batchSendLength = 0;                            //length of batch being sent, 0 when TX is free
+volatile byte batchSendIndex = 0;                             //index of next byte of batch to send
+volatile byte batchTxRunning = 0;                             //TX handler is sending batches/filler
 #define USART_BAUDRATE 230400                                 //baud rate of serial communication
 #define BAUD_PRESCALE (F_CPU / 4 / USART_BAUDRATE - 1) / 2    //value for UBRR0H and UBRR0L registers that controll baud rate
 
@@ -258,6 +281,11 @@ void loop()
                   outputFrameBuffer[9]=  samplingBuffer[4] & 0x7F;
                   outputFrameBuffer[10]= (samplingBuffer[5]>>7)& 0x7F;
                   outputFrameBuffer[11]=  samplingBuffer[5] & 0x7F;
+
+                  if(protocolVersion == 2)
+                  {
+                      appendFrameToBatch();
+                  }
         
         
         if(sensitivityVisualFeedbackCounter==0)//disable update of LEDs when we display selected sensitivity level
@@ -520,6 +548,7 @@ void loop()
                        sensitivityVisualFeedbackCounterMax = SENSITIVITY_LED_FEEDBACK/numberOfChannels;
                        antiFlickeringTimerForOutput = antiFlickeringCounterMax;
                       OCR1A = (interrupt_Number+1)*numberOfChannels - 1;
+                      resetBatch();
                       TIMSK1 |= (1 << OCIE1A);//enable timer for sampling
                     }
                     else if(*separator == 'b')//if we received command for board name
@@ -528,6 +557,18 @@ void loop()
                        PORTD &= B11110111;//turn off HHI relay, we don't want to stim. people
                        sendMessage(CURRENT_SHIELD_TYPE);//send message with escape sequence
                     }
+                    else if(*separator == 'p')//if we received command for protocol version
+                    {
+                      separator = separator+2;
+                      tempNumberOfChanels = (byte)atoi(separator);//read protocol version
+                      if(tempNumberOfChanels == 1 || tempNumberOfChanels == 2)
+                      {
+                         cli();//dissable interrupts
+                         protocolVersion = tempNumberOfChanels;
+                         resetBatch();
+                         sendMessage(protocolVersion == 2 ? "PROTO:2;" : "PROTO:1;");//confirm with escape sequence
+                      }
+                    }
                 }
                 // Find the next command in input string
                 command = strtok(0, ";");
@@ -547,11 +588,23 @@ void loop()
       //we set this flag here so that aux comp. is done only once after this initialization of frame sending 
       readyToDoAuxComputation = 1;
 
-      //Sends first byte of frame. The rest is sent by TX handler.
-      
-      UDR0 = outputFrameBuffer[sendBufferIndex];
-      
-      sendBufferIndex++;
+      if(protocolVersion == 2)
+      {
+          //In v2 TX handler sends batches and filler on its own once started
+          if(batchTxRunning == 0)
+          {
+              batchTxRunning = 1;
+              UDR0 = 0x00;
+          }
+      }
+      else
+      {
+          //Sends first byte of frame. The rest is sent by TX handler.
+
+          UDR0 = outputFrameBuffer[sendBufferIndex];
+
+          sendBufferIndex++;
+      }
 
 
      
@@ -601,11 +654,29 @@ ISR (USART_TX_vect)
             messageSendingIndex = 0;
             outputBufferReady = 1;
             sendBufferIndex =0;
+            batchTxRunning = 0;                                 //main loop restarts batch sending
         }
     }
     else
     {
-        
+            if(protocolVersion == 2)
+            {
+                if(batchSendLength > 0)                         //if there is a batch to send
+                {
+                    UDR0 = batchBuffer[batchSendBuffer][batchSendIndex];
+                    batchSendIndex++;
+                    if(batchSendIndex == batchSendLength)
+                    {
+                        batchSendLength = 0;                    //free for next batch
+                    }
+                }
+                else
+                {
+                    UDR0 = 0x00;                                //filler, ignored by host
+                }
+            }
+            else
+            {
             if(sendBufferIndex==(numberOfChannels<<1))               //we have 2 * numberOfChannels bytes in one frame
             {
                 sendBufferIndex = 0;
@@ -617,8 +688,9 @@ ISR (USART_TX_vect)
             }
               
               UDR0 = outputFrameBuffer[sendBufferIndex];
-               
+
               sendBufferIndex++;
+            }
 
 
               //----------------------------------------------- UPDATE SERVO PWM ----------------------------------------
@@ -731,4 +803,71 @@ void sendMessage(const char * message)
   messageSending =1;                                                   //set flag that we are sending message and not data frames
   messageSendingIndex = 0;                                             //rewind index
   sei();                                                               //enable interrupts
-}
\ No newline at end of file
+}
+
+
+
+//------------------------------- PROTOCOL V2 BATCHES ------------------------------------------------------------------
+//Start a new batch from scratch. Called when the protocol or number of channels changes.
+
+void resetBatch()
+{
+  batchFrames = V2_BATCH_SAMPLES/numberOfChannels;
+  if(batchFrames == 0)
+  {
+    batchFrames = 1;
+  }
+  batchFillLength = 0;
+  batchFramesFilled = 0;
+  batchSendLength = 0;
+  batchSendIndex = 0;
+}
+
+//Add the last measured frame to the batch and hand the batch to the TX handler when full
+
+void appendFrameToBatch()
+{
+  byte i;
+  byte dataByte;
+
+  if(batchFillLength == 0)                                             //start of batch, header first
+  {
+      dataByte = batchSequence & 0x7F;
+      batchBuffer[batchFillBuffer][batchFillLength++] = 0x80 | dataByte;
+      batchSum1 = dataByte;
+      batchSum2 = dataByte;
+  }
+
+  for(i=0;i<numberOfChannels;i++)
+  {
+      dataByte = (samplingBuffer[i]>>7) & 0x7F;
+      batchBuffer[batchFillBuffer][batchFillLength++] = dataByte;
+      batchSum1 += dataByte;
+      batchSum2 += batchSum1;
+
+      dataByte = samplingBuffer[i] & 0x7F;
+      batchBuffer[batchFillBuffer][batchFillLength++] = dataByte;
+      batchSum1 += dataByte;
+      batchSum2 += batchSum1;
+  }
+
+  batchFramesFilled++;
+  if(batchFramesFilled < batchFrames)
+  {
+      return;
+  }
+
+  batchBuffer[batchFillBuffer][batchFillLength++] = batchSum1 & 0x7F;  //byte overflow keeps sums modulo 128
+  batchBuffer[batchFillBuffer][batchFillLength++] = batchSum2 & 0x7F;
+
+  if(batchSendLength == 0)                                             //if TX is free swap buffers,
+  {                                                                    //otherwise this batch is dropped
+      batchSendBuffer = batchFillBuffer;
+      batchSendIndex = 0;
+      batchSendLength = batchFillLength;
+      batchFillBuffer ^= 1;
+  }
+  batchSequence++;
+  batchFillLength = 0;
+  batchFramesFilled = 0;
+}
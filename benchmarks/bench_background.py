@@ -0,0 +1,101 @@
+"""Per-frame cost of drawing the grass, road and start/finish lines.
+
+"before" is what GameWorld.draw did each frame: fill the sky, draw two
+grass rects, blit the road tile until the game area is covered, and build
+the label backgrounds, with the road and checkerboards left in their
+creation format. "after" is the current GameWorld: one pre-composited,
+display-format background strip blitted in at most two pieces and
+converted checkerboards and labels.
+
+Run from the repository root with: python -m benchmarks.bench_background
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from byb_cars import defaults
+from byb_cars.elements import GameWorld
+from byb_cars.elements.fonts import render_text
+from byb_cars.elements.layout_config import layout
+from byb_cars.elements.world import world_config
+
+FRAMES = 600
+
+
+def draw_before(surface, world, road, line):
+    game_height = world.game_height
+    surface.fill(defaults.SKY_BLUE, (0, 0, defaults.WIDTH, game_height))
+    pygame.draw.rect(surface, defaults.GRASS_GREEN, (0, 0, world.road_left, game_height))
+    pygame.draw.rect(
+        surface, defaults.GRASS_GREEN, (world.road_right, 0, defaults.WIDTH - world.road_right, game_height)
+    )
+    current_y = int(world.position % road.get_height()) - road.get_height()
+    while current_y < game_height:
+        surface.blit(road, (world.road_left, current_y))
+        current_y += road.get_height()
+
+    y = world.position - world.start_line_position
+    if -world_config.start_finish_line_height < y < game_height:
+        surface.blit(line, (world.road_left, y))
+        text = render_text("START", world_config.start_finish_font_size, (255, 255, 255))
+        text_bg = pygame.Surface(
+            (text.get_width() + 2 * world_config.text_bg_padding, text.get_height() + 2 * world_config.text_bg_padding)
+        )
+        text_bg.fill((0, 0, 0))
+        text_bg.set_alpha(world_config.text_bg_alpha)
+        text_x = world.road_left + world.road_width / 2 - text.get_width() / 2
+        text_y = y - world_config.text_y_offset
+        surface.blit(text_bg, (text_x - world_config.text_bg_padding, text_y - world_config.text_bg_padding))
+        surface.blit(text, (text_x, text_y))
+
+
+def draw_after(surface, world):
+    world.draw_background(surface)
+    y = world.position - world.start_line_position
+    if -world_config.start_finish_line_height < y < world.game_height:
+        surface.blit(world.start_line_surface, (world.road_left, y))
+        text, text_bg = world.line_labels["start"]
+        text_x = world.road_left + world.road_width / 2 - text.get_width() / 2
+        text_y = y - world_config.text_y_offset
+        surface.blit(text_bg, (text_x - world_config.text_bg_padding, text_y - world_config.text_bg_padding))
+        surface.blit(text, (text_x, text_y))
+
+
+def run(draw, world):
+    times = np.empty(FRAMES)
+    for frame in range(FRAMES):
+        world.position = 3.7 * frame  # Start line on screen for the first frames
+        start = time.perf_counter()
+        draw()
+        times[frame] = time.perf_counter() - start
+    return times
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((defaults.WIDTH, defaults.HEIGHT))
+    world = GameWorld(game_height=layout.game_height, seed=0)
+
+    # The old surfaces, as created before they were converted
+    road = pygame.Surface(world.road_surface.get_size())
+    road.blit(world.road_surface, (0, 0))
+    line = pygame.Surface(world.start_line_surface.get_size())
+    line.blit(world.start_line_surface, (0, 0))
+    print(f"Display format: {screen.get_bitsize()} bit, creation format: {road.get_bitsize()} bit")
+
+    before = run(lambda: draw_before(screen, world, road, line), world)
+    after = run(lambda: draw_after(screen, world), world)
+    for name, times in (("before", before), ("after", after)):
+        print(
+            f"{name:7s} background median {np.median(times) * 1e3:6.3f} ms"
+            f"  p95 {np.percentile(times, 95) * 1e3:6.3f} ms"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Throughput of the block frame decoder against the old per-byte loop.
+
+Run from the repository root with: python -m benchmarks.bench_decoder
+"""
+import time
+
+import numpy as np
+
+from byb_cars.decoder import decode_frames
+
+SAMPLE_RATE = 10000  # Shield sample rate (frames/s for a single channel)
+# How much data arrives per serial read: a steady 10 ms poll, and the backlog
+# that piles up behind a 250 ms stall of the game loop
+CHUNK_SECONDS = (0.01, 0.25)
+
+
+def make_stream(num_frames, num_channels, seed=0):
+    """Encode random ADC values the way the firmware does"""
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 1024, size=(num_frames, num_channels))
+    frames = np.empty((num_frames, num_channels, 2), dtype=np.uint8)
+    frames[:, :, 0] = (values >> 7) & 0x7F
+    frames[:, :, 1] = values & 0x7F
+    frames[:, 0, 0] |= 0x80
+    return frames.tobytes(), values
+
+
+def legacy_decode(buffer, num_channels):
+    """The per-byte loop the reader thread used before the block decoder"""
+    frames = []
+    while len(buffer) >= 2 * num_channels:
+        if buffer[0] & 0x80:
+            frame_values = []
+            for i in range(num_channels):
+                if len(buffer) < 2 * (i + 1):
+                    break
+                high_byte = buffer[2 * i] & 0x7F
+                low_byte = buffer[2 * i + 1] & 0x7F
+                frame_values.append(((high_byte << 7) | low_byte) / 1023.0)
+            if len(frame_values) == num_channels:
+                frames.append(frame_values)
+                buffer = buffer[2 * num_channels :]
+            else:
+                break
+        else:
+            buffer.pop(0)
+    return frames, buffer
+
+
+def run_legacy(stream, num_channels, chunk_size):
+    buffer = bytearray()
+    count = 0
+    for i in range(0, len(stream), chunk_size):
+        buffer.extend(stream[i : i + chunk_size])
+        frames, buffer = legacy_decode(buffer, num_channels)
+        count += len(frames)
+    return count
+
+
+def run_block(stream, num_channels, chunk_size):
+    buffer = bytearray()
+    count = 0
+    for i in range(0, len(stream), chunk_size):
+        buffer.extend(stream[i : i + chunk_size])
+        values, consumed = decode_frames(buffer, num_channels)
+        del buffer[:consumed]
+        count += len(values)
+    return count
+
+
+def bench(func, stream, num_channels, chunk_size):
+    start = time.perf_counter()
+    count = func(stream, num_channels, chunk_size)
+    elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def main():
+    seconds = 5
+    for num_channels in (1, 2, 6):
+        # The firmware splits the 10 kHz sample clock across channels
+        frame_rate = SAMPLE_RATE // num_channels
+        num_frames = frame_rate * seconds
+        stream, values = make_stream(num_frames, num_channels)
+
+        buffer = bytearray(stream)
+        decoded, _ = decode_frames(buffer, num_channels)
+        assert np.array_equal(decoded, values)
+
+        for chunk_seconds in CHUNK_SECONDS:
+            # Odd sizes so that reads split frames
+            chunk_size = int(frame_rate * chunk_seconds) * 2 * num_channels + 1
+            print(f"{num_channels} channel(s), {seconds}s of data, {chunk_size} byte reads")
+            for name, func in (("legacy loop", run_legacy), ("block decoder", run_block)):
+                count, elapsed = bench(func, stream, num_channels, chunk_size)
+                rate = count * num_channels / elapsed
+                print(
+                    f"  {name:14s} {count:7d} frames in {elapsed * 1000:8.1f} ms"
+                    f"  ({rate / 1e6:6.2f} Msamples/s, {elapsed / seconds * 100:5.1f}% of real time)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""End-to-end throughput from a VirtualArduino to ArduinoEMGHandler's ring.
+
+Each scenario streams for a few seconds over a pseudo-terminal and reports
+how many frames the simulator sent against how many the handler decoded.
+Scenarios without the line limit push the pty as fast as the rate asks to
+find where the host side falls behind. Protocol v2 scenarios also report
+the batches the decoder counted as lost, corrupt or truncated.
+
+Run from the repository root with: python -m benchmarks.bench_end_to_end
+"""
+import time
+
+from byb_cars.input_handler import ArduinoEMGHandler
+from byb_cars.simulator import SimulatorConfig, VirtualArduino
+
+DURATION = 3.0
+
+SCENARIOS = [
+    ("10 kHz, 1 ch", SimulatorConfig(seed=0), 1),
+    ("10 kHz, 6 ch", SimulatorConfig(num_channels=6, seed=0), 1),
+    ("line limit, 1 ch", SimulatorConfig(sample_rate=1e6, seed=0), 1),
+    ("10 kHz, 0.1% corrupt", SimulatorConfig(corruption_rate=1e-3, seed=0), 1),
+    ("v2 10 kHz, 6 ch", SimulatorConfig(num_channels=6, seed=0), 2),
+    ("v2 0.1% corrupt", SimulatorConfig(corruption_rate=1e-3, seed=0), 2),
+    ("100 kHz, no limit", SimulatorConfig(sample_rate=1e5, line_limit=False, seed=0), 1),
+    ("500 kHz, no limit", SimulatorConfig(sample_rate=5e5, line_limit=False, seed=0), 1),
+]
+
+
+def measure(config, protocol):
+    arduino = VirtualArduino(config)
+    arduino.start()
+    handler = ArduinoEMGHandler(port=arduino.port, protocol=protocol)
+    handler.connect()
+    handler.set_channels(config.num_channels)
+    handler.start_reading()
+    time.sleep(0.5)  # Settle
+
+    frames_start = arduino.frames_sent
+    dropped_start = arduino.bytes_dropped
+    cursor = handler.ring.write_index
+    start = time.perf_counter()
+    time.sleep(DURATION)
+    elapsed = time.perf_counter() - start
+    sent = (arduino.frames_sent - frames_start) / elapsed
+    received = (handler.ring.write_index - cursor) / elapsed
+    dropped = (arduino.bytes_dropped - dropped_start) / elapsed
+    batches = (handler.batches_lost, handler.batches_corrupt, handler.v2_decoder.batches_truncated)
+
+    handler.disconnect()
+    arduino.close()
+    return sent, received, dropped, batches
+
+
+def main():
+    for name, config, protocol in SCENARIOS:
+        sent, received, dropped, (lost, corrupt, truncated) = measure(config, protocol)
+        line = (
+            f"{name:22s} sent {sent:8.0f} frames/s  decoded {received:8.0f} frames/s"
+            f"  ({received / sent * 100:5.1f}%)  pty overflow {dropped:6.0f} bytes/s"
+        )
+        if protocol == 2:
+            line += f"  batches lost {lost}, corrupt {corrupt}, truncated {truncated}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Throughput of the EMG envelope pipeline on per-frame blocks.
+
+Each scenario feeds one second of synthetic EMG through EMGEnvelope in the
+blocks a 60 fps game loop would hand it, and reports the cost per block and
+how many times faster than real time that is. The last column runs the
+same filters one sample at a time in Python, the way a naive per-sample
+implementation would, on the first channel only.
+
+Run from the repository root with: python -m benchmarks.bench_envelope
+"""
+import time
+
+import numpy as np
+
+from byb_cars.dsp import EMGEnvelope
+
+GAME_FPS = 60
+REPEAT = 5
+
+SCENARIOS = [
+    # (name, frames per second per channel, channels)
+    ("1 ch at 10 kHz", 10000, 1),
+    ("6 ch at shield rate", 10000 / 6, 6),
+    ("6 ch at 10 kHz each", 10000, 6),
+]
+
+
+def make_emg(sample_rate, num_channels, seconds=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(sample_rate * seconds)
+    t = np.arange(n) / sample_rate
+    amplitude = 0.02 + 0.2 * np.clip(np.sin(2 * np.pi * 0.5 * t), 0, None)
+    return (0.5 + amplitude[:, None] * rng.standard_normal((n, num_channels))).astype(np.float32)
+
+
+def per_sample(envelope, samples):
+    """The same cascades, one sample and one section at a time"""
+    stages = [envelope.highpass.sections, envelope.lowpass.sections]
+    states = [[[0.0, 0.0] for _ in sections] for sections in stages]
+    for x in samples:
+        for stage, (sections, stage_states) in enumerate(zip(stages, states)):
+            for (b, a), state in zip(sections, stage_states):
+                y = b[0] * x + state[0]
+                state[0] = b[1] * x - a[1] * y + state[1]
+                state[1] = b[2] * x - a[2] * y
+                x = y
+            if stage == 0:
+                x = abs(x)
+    return x
+
+
+def measure(sample_rate, num_channels):
+    samples = make_emg(sample_rate, num_channels)
+    block = max(1, int(round(sample_rate / GAME_FPS)))
+    blocks = [samples[i : i + block] for i in range(0, len(samples), block)]
+
+    best = np.inf
+    for _ in range(REPEAT):
+        envelope = EMGEnvelope(sample_rate, num_channels)
+        start = time.perf_counter()
+        for b in blocks:
+            envelope.process(b)
+        best = min(best, time.perf_counter() - start)
+
+    envelope = EMGEnvelope(sample_rate, num_channels)
+    start = time.perf_counter()
+    per_sample(envelope, samples[:, 0].tolist())
+    loop = time.perf_counter() - start
+
+    seconds = len(samples) / sample_rate
+    return block, best / len(blocks), seconds / best, seconds / loop
+
+
+def main():
+    for name, sample_rate, num_channels in SCENARIOS:
+        block, per_block, realtime, loop_realtime = measure(sample_rate, num_channels)
+        print(
+            f"{name:22s} {block:4d} samples/block  {per_block * 1e6:7.1f} us/block"
+            f"  {realtime:7.0f}x real time  (per-sample loop, 1 ch: {loop_realtime:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Cost of drawing the signal plot as the amount of signal on screen grows.
+
+For each window size, the plot is filled with enough synthetic EMG and its
+trace is drawn repeatedly into an off-screen surface. The "per-point loop"
+column draws the same window the way SignalPlot used to: one np.roll per new
+value and a Python loop building an (x, y) tuple per sample. The last two
+columns are the whole SignalPlot.draw(), with the cached background, and
+with the background (border, grid, labels, title) re-rendered every frame as
+before it was cached. The scroll columns are the steady-state cost of a
+frame in the scroll render modes, which only rasterize the new columns.
+
+Run from the repository root with: python -m benchmarks.bench_plot
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from byb_cars import defaults
+from byb_cars.elements.layout_config import layout
+from byb_cars.elements.plot import SignalPlot
+
+SAMPLE_RATE = 10000
+GAME_FPS = 60
+REPEAT = 50
+# Samples across the plot
+WINDOWS = [200, 2000, 20000, 200000]
+
+
+def per_point(surface, buffer, plot_width, plot_height, y_max):
+    """The old draw: one tuple per buffered value"""
+    points = []
+    for i in range(len(buffer)):
+        x_pos = layout.plot_margin + i * plot_width / (len(buffer) - 1)
+        y_pos = layout.plot_margin + plot_height - (buffer[i] / y_max * plot_height)
+        y_pos = min(layout.plot_margin + plot_height, max(layout.plot_margin, y_pos))
+        points.append((x_pos, y_pos))
+    pygame.draw.lines(surface, defaults.PLOT_LINE, False, points, 2)
+
+
+def best_of(fn):
+    best = np.inf
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(num_samples, rng):
+    plot = SignalPlot(layout.screen_width, layout.plot_height, sample_rate=SAMPLE_RATE)
+    plot.window_seconds = num_samples / SAMPLE_RATE
+    samples = (0.5 + 0.1 * rng.standard_normal(num_samples)).astype(np.float32)
+    for block in np.array_split(samples, max(1, num_samples // 167)):
+        plot.update(block)
+    screen = pygame.Surface((layout.screen_width, layout.plot_height))
+
+    trace = best_of(plot._draw_signal)
+    full = best_of(lambda: plot.draw(screen, 0, 0))
+
+    def uncached():
+        plot._background_key = None
+        plot.draw(screen, 0, 0)
+
+    rebuilt = best_of(uncached)
+
+    scroll = {}
+    for mode in ("scroll-band", "scroll-line"):
+        scrolling = SignalPlot(
+            layout.screen_width, layout.plot_height, sample_rate=SAMPLE_RATE, render_mode=mode
+        )
+        scrolling.window_seconds = num_samples / SAMPLE_RATE
+        scrolling.update(samples)
+        scrolling.draw(screen, 0, 0)
+        # One game frame's worth of new samples per draw
+        frames = 0.5 + 0.1 * rng.standard_normal((REPEAT, SAMPLE_RATE // GAME_FPS))
+        blocks = iter(frames.astype(np.float32))
+
+        def frame():
+            scrolling.update(next(blocks))
+            scrolling.draw(screen, 0, 0)
+
+        scroll[mode] = best_of(frame)
+
+    buffer = samples.astype(np.float64)
+    loop = best_of(
+        lambda: per_point(plot.surface, np.roll(buffer, -1), plot.plot_width, plot.plot_height, plot.y_max)
+    )
+    return trace, loop, full, rebuilt, scroll
+
+
+def main():
+    pygame.init()
+    rng = np.random.default_rng(0)
+    for num_samples in WINDOWS:
+        trace, loop, full, rebuilt, scroll = measure(num_samples, rng)
+        print(
+            f"{num_samples:7d} samples  trace {trace * 1e3:6.3f} ms"
+            f"  per-point loop {loop * 1e3:7.2f} ms  full draw {full * 1e3:6.2f} ms"
+            f"  (background re-rendered: {rebuilt * 1e3:6.2f} ms)"
+            f"  scroll band {scroll['scroll-band'] * 1e3:5.2f} ms"
+            f"  scroll line {scroll['scroll-line'] * 1e3:5.2f} ms"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""CPU usage and wakeups of the serial reader thread in each read mode.
+
+A feeder process streams 1-channel frames at the shield's 10 kHz rate into a
+pseudo-terminal in 1 ms packets, the way a USB serial adapter delivers them.
+The reader thread's CPU time and voluntary context switches (wakeups) are
+taken from /proc, so this only runs on Linux.
+
+Run from the repository root with: python -m benchmarks.bench_read_modes
+"""
+import multiprocessing
+import os
+import time
+import tty
+
+import numpy as np
+
+from byb_cars.input_handler import ArduinoEMGHandler
+
+SAMPLE_RATE = 10000
+PACKET_SECONDS = 0.001
+DURATION = 3.0
+
+MODES = [
+    ("poll", 0.0),
+    ("blocking", 0.0),
+    ("blocking", 0.002),
+    ("blocking", 0.005),
+    ("blocking", 0.010),
+]
+
+
+def feed(master_fd, stop):
+    """Write frames into the pty at SAMPLE_RATE"""
+    frames_per_packet = int(SAMPLE_RATE * PACKET_SECONDS)
+    values = np.arange(frames_per_packet) % 1024
+    packet = np.empty((frames_per_packet, 2), dtype=np.uint8)
+    packet[:, 0] = (values >> 7) | 0x80
+    packet[:, 1] = values & 0x7F
+    packet = packet.tobytes()
+
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        os.write(master_fd, packet)
+        next_time += PACKET_SECONDS
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def thread_stats(native_id):
+    """CPU seconds and voluntary context switches of one thread"""
+    task = f"/proc/self/task/{native_id}"
+    with open(f"{task}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"{task}/status") as f:
+        for line in f:
+            if line.startswith("voluntary_ctxt_switches"):
+                switches = int(line.split()[1])
+    return cpu, switches
+
+
+def measure(master_fd, port, read_mode, latency_target, streaming):
+    # The feeder does not answer the board query
+    handler = ArduinoEMGHandler(
+        port=port, read_mode=read_mode, latency_target=latency_target, board_timeout=None
+    )
+    handler.connect()
+
+    stop = multiprocessing.Event()
+    feeder = None
+    if streaming:
+        feeder = multiprocessing.Process(target=feed, args=(master_fd, stop), daemon=True)
+        feeder.start()
+
+    handler.start_reading()
+    time.sleep(0.5)  # Settle
+    native_id = handler.thread.native_id
+    cpu_start, switches_start = thread_stats(native_id)
+    cursor = handler.ring.write_index
+    time.sleep(DURATION)
+    cpu_end, switches_end = thread_stats(native_id)
+    samples = handler.ring.write_index - cursor
+
+    stop.set()
+    if feeder:
+        feeder.join()
+    handler.disconnect()
+    return (
+        (cpu_end - cpu_start) / DURATION * 100,
+        (switches_end - switches_start) / DURATION,
+        samples / DURATION,
+    )
+
+
+def main():
+    master_fd, slave = os.openpty()
+    tty.setraw(slave)
+    port = os.ttyname(slave)
+
+    for streaming in (True, False):
+        print("Streaming 10 kHz" if streaming else "Idle (no data)")
+        for read_mode, latency_target in MODES:
+            cpu, wakeups, rate = measure(
+                master_fd, port, read_mode, latency_target, streaming
+            )
+            label = f"{read_mode} {latency_target * 1000:.0f} ms" if read_mode == "blocking" else read_mode
+            print(
+                f"  {label:16s} CPU {cpu:5.1f}%  wakeups {wakeups:7.0f}/s"
+                f"  samples {rate:7.0f}/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
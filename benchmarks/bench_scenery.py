@@ -0,0 +1,81 @@
+"""Tree placement time: rejection sampling against Poisson-disc sampling.
+
+"rejection" is the old GameWorld.generate_trees: each tree tries up to 100
+random spots, each checked against every tree already placed, and is left
+out if none fits. "scatter" is scatter_trees with a tree count: random
+darts checked against a grid hash, in numpy batches. Each track is long
+enough to hold the requested trees at the old density. "dense" is
+scatter_trees without a count, which fills the verges with Bridson's
+Poisson-disc sampling, as many trees as the spacing allows.
+
+Run from the repository root with: python -m benchmarks.bench_scenery
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from byb_cars import defaults
+from byb_cars.elements.handle_assets import get_tree_imgs
+from byb_cars.elements.scenery import scatter_trees
+from byb_cars.elements.world import world_config
+
+TREE_COUNTS = (30, 300, 3000, 30000)
+# Slower than this and the old sampler is not timed
+REJECTION_LIMIT = 3000
+# Track length per tree, as in the default 30-tree track
+LENGTH_PER_TREE = 290
+
+
+def rejection_trees(num_trees, strips, world_length, imgs, max_attempts=100):
+    trees = []
+    for _ in range(num_trees):
+        img = random.choice(imgs)
+        min_distance = int(4 / 3 * max(img.get_width(), img.get_height()))
+        for _ in range(max_attempts):
+            low, high = random.choice(strips)
+            x = random.randint(int(low), int(high)) - img.get_width() // 2
+            y = random.randint(0, world_length)
+            if all(((x - tx) ** 2 + (y - ty) ** 2) ** 0.5 >= min_distance for tx, ty, _ in trees):
+                trees.append((x, y, img))
+                break
+    return trees
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((defaults.WIDTH, defaults.HEIGHT))
+    imgs = get_tree_imgs(world_config.tree_height)
+    road_left = (defaults.WIDTH - int(defaults.WIDTH * world_config.road_width_fraction)) // 2
+    road_right = defaults.WIDTH - road_left
+    strips = [
+        (world_config.tree_min_side_offset, road_left - world_config.tree_min_side_offset),
+        (road_right + world_config.tree_min_road_offset, defaults.WIDTH - world_config.tree_min_side_offset),
+    ]
+
+    scatter_trees(0, strips, (0, 1000), imgs)  # Warm up
+    print(f"{'trees':>6s}  {'rejection':>20s}  {'scatter':>20s}  {'dense':>20s}")
+    for count in TREE_COUNTS:
+        world_length = count * LENGTH_PER_TREE
+        if count <= REJECTION_LIMIT:
+            random.seed(0)
+            start = time.perf_counter()
+            placed = len(rejection_trees(count, strips, world_length, imgs))
+            rejection = f"{(time.perf_counter() - start) * 1e3:9.1f} ms {placed:6d} placed"
+        else:
+            rejection = "not timed"
+        start = time.perf_counter()
+        scenery = scatter_trees(0, strips, (0, world_length), imgs, count)
+        scatter = f"{(time.perf_counter() - start) * 1e3:9.1f} ms {len(scenery):6d} placed"
+        start = time.perf_counter()
+        scenery = scatter_trees(0, strips, (0, world_length), imgs)
+        dense = f"{(time.perf_counter() - start) * 1e3:9.1f} ms {len(scenery):6d} placed"
+        print(f"{count:6d}  {rejection:>20s}  {scatter:>20s}  {dense:>20s}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Cost of the streaming spectral stage and spectrogram on per-frame blocks.
+
+Each scenario feeds one second of synthetic EMG through EMGSpectrum (all
+channels) and SpectrogramPlot (channel 0 drawn) in the blocks a 60 fps
+game loop would hand them. It reports the worst and median cost per frame
+next to the 16.7 ms frame budget.
+
+Run from the repository root with: python -m benchmarks.bench_spectrum
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from benchmarks.bench_envelope import make_emg
+from byb_cars.elements.layout_config import layout
+from byb_cars.elements.spectrogram import SpectrogramPlot
+from byb_cars.spectrum import EMGSpectrum
+
+GAME_FPS = 60
+REPEAT = 5
+
+SCENARIOS = [
+    # (name, frames per second per channel, channels)
+    ("1 ch at 10 kHz", 10000, 1),
+    ("6 ch at shield rate", 10000 / 6, 6),
+    ("6 ch at 10 kHz each", 10000, 6),
+    ("1 ch at 100 kHz", 100000, 1),
+]
+
+
+def frame_times(fn, blocks):
+    times = np.empty(len(blocks))
+    for i, block in enumerate(blocks):
+        start = time.perf_counter()
+        fn(block)
+        times[i] = time.perf_counter() - start
+    return times
+
+
+def measure(sample_rate, num_channels, screen):
+    samples = make_emg(sample_rate, num_channels)
+    block = max(1, int(round(sample_rate / GAME_FPS)))
+    blocks = [samples[i : i + block] for i in range(0, len(samples), block)]
+
+    spectrum_best = np.inf
+    plot_best = np.inf
+    for _ in range(REPEAT):
+        spectrum = EMGSpectrum(sample_rate, num_channels)
+        spectrum_best = min(spectrum_best, frame_times(spectrum.process, blocks).sum())
+
+        plot = SpectrogramPlot(layout.screen_width, layout.plot_height, sample_rate, num_channels)
+
+        def frame(block):
+            plot.update(block)
+            plot.draw(screen, 0, 0)
+
+        times = frame_times(frame, blocks)
+        if times.sum() < plot_best:
+            plot_best, plot_times = times.sum(), times
+    return spectrum.frames_total, spectrum_best / len(blocks), plot_times
+
+
+def main():
+    pygame.init()
+    screen = pygame.Surface((layout.screen_width, layout.plot_height))
+    budget = 1 / GAME_FPS
+    for name, sample_rate, num_channels in SCENARIOS:
+        frames, per_block, plot_times = measure(sample_rate, num_channels, screen)
+        print(
+            f"{name:22s} {frames:3d} FFT frames/s  spectrum {per_block * 1e6:6.1f} us/block"
+            f"  spectrogram frame median {np.median(plot_times) * 1e3:5.2f} ms"
+            f" max {plot_times.max() * 1e3:5.2f} ms ({plot_times.max() / budget:4.1%} of budget)"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
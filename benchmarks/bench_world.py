@@ -0,0 +1,106 @@
+"""Tree drawing cost against the number of trees on the track.
+
+Scatters N trees along a track of fixed density per pixel of world length,
+then draws one screen's worth of scenery per frame while driving forward.
+"scan" is the old draw loop, which tested every tree for visibility each
+frame; "index" is SceneryIndex.draw, which bisects to the visible trees.
+
+Then drives a GameWorld a long way and reports how many scenery chunks
+and trees it holds, what drawing the trees costs per frame, and what the
+world update costs on the frames that generate a chunk ahead of the car.
+
+Run from the repository root with: python -m benchmarks.bench_world
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from byb_cars import defaults
+from byb_cars.elements import GameWorld
+from byb_cars.elements.handle_assets import get_tree_imgs
+from byb_cars.elements.layout_config import layout
+from byb_cars.elements.scenery import SceneryIndex
+
+FRAMES = 300
+TREE_COUNTS = (30, 300, 3000, 30000)
+TREES_PER_SCREEN = 12
+DRIVE_FRAMES = 20000
+DRIVE_SPEED = 50  # World units per frame
+
+
+def scan_draw(surface, trees, position, game_height):
+    for x, pos, img in trees:
+        screen_y = position - pos
+        if -img.get_height() < screen_y < game_height:
+            surface.blit(img, (x, screen_y))
+
+
+def run(draw, surface, track_length, game_height):
+    times = np.empty(FRAMES)
+    for frame in range(FRAMES):
+        position = game_height + (frame * 7) % (track_length - game_height)
+        start = time.perf_counter()
+        draw(surface, position, game_height)
+        times[frame] = time.perf_counter() - start
+    return times
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((defaults.WIDTH, defaults.HEIGHT))
+    game_height = layout.game_height
+    imgs = get_tree_imgs(120)
+    rng = np.random.default_rng(0)
+
+    print(f"{'trees':>6s}  {'scan median':>12s}  {'index median':>13s}")
+    for count in TREE_COUNTS:
+        # Fixed density, so each frame shows about the same number of trees
+        track_length = max(count * game_height // TREES_PER_SCREEN, 2 * game_height)
+        xs = rng.integers(0, defaults.WIDTH, count)
+        ys = rng.integers(0, track_length, count)
+        ids = rng.integers(0, len(imgs), count)
+        trees = [(int(x), int(y), imgs[i]) for x, y, i in zip(xs, ys, ids)]
+        index = SceneryIndex(xs, ys, ids, imgs)
+
+        scan = run(lambda s, p, h: scan_draw(s, trees, p, h), screen, track_length, game_height)
+        indexed = run(index.draw, screen, track_length, game_height)
+        print(
+            f"{count:6d}  {np.median(scan) * 1e3:9.3f} ms  {np.median(indexed) * 1e3:10.3f} ms"
+        )
+
+    world = GameWorld(game_height=game_height, seed=0)
+    times = np.empty(DRIVE_FRAMES)
+    generation = []
+    held_chunks = held_trees = 0
+    for frame in range(DRIVE_FRAMES):
+        generated = world.scenery.generated
+        start = time.perf_counter()
+        world.update(DRIVE_SPEED)
+        if world.scenery.generated > generated:
+            generation.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        world.scenery.draw(screen, world.position, game_height)
+        times[frame] = time.perf_counter() - start
+        held_chunks = max(held_chunks, len(world.scenery.chunks))
+        held_trees = max(held_trees, len(world.scenery))
+    print(
+        f"\nDrove {world.position:.0f} units: {world.scenery.generated} chunks generated,"
+        f" at most {held_chunks} chunks / {held_trees} trees held"
+    )
+    print(
+        f"Tree draw median {np.median(times) * 1e3:.3f} ms  p99 {np.percentile(times, 99) * 1e3:.3f} ms"
+        f"  max {times.max() * 1e3:.3f} ms"
+    )
+    print(
+        f"Update generating a chunk median {np.median(generation) * 1e3:.3f} ms"
+        f"  max {max(generation) * 1e3:.3f} ms"
+    )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Per-player calibration of the EMG envelope.
+
+Signal strength varies a lot between players and electrode placements, so
+a fixed mapping leaves some players stuck at min_speed and others pinned at
+max_speed. A calibration records a rest window and a maximal contraction
+window. Both are summarized by streaming statistics that keep no samples:
+Welford's mean and variance (RunningStats) and the P-square percentile
+estimator (P2Quantile). The result is a PlayerCalibration that maps the
+envelope to 0-1 effort for that player and is saved next to the scores.
+"""
+from dataclasses import dataclass, field
+import time
+
+import numpy as np
+
+
+class RunningStats:
+    """Streaming mean and variance (Welford), merged a block at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, values):
+        """Add one value or a block of values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(values)
+        if n == 0:
+            return
+        block_mean = float(values.mean())
+        block_m2 = float(((values - block_mean) ** 2).sum())
+        # Chan et al.'s pairwise update: Welford's step for a whole block
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += block_m2 + delta**2 * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def sd(self):
+        return float(np.sqrt(self.variance))
+
+
+class P2Quantile:
+    """Running estimate of one percentile in O(1) memory (Jain & Chlamtac's P-square).
+
+    Five markers track the minimum, the p/2, p and (1+p)/2 quantiles and the
+    maximum; each new value moves the markers' positions, and heights are
+    adjusted with a piecewise-parabolic fit when a marker drifts a whole
+    position away from where it should be.
+    """
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError(f"p must be between 0 and 1, got {p}")
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, values):
+        """Add one value or a block of values"""
+        for x in np.asarray(values, dtype=np.float64).ravel().tolist():
+            self._add(x)
+
+    def _add(self, x):
+        self.count += 1
+        q = self.heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        if not self.heights:
+            return float("nan")
+        if self.count <= 5:
+            return float(np.percentile(self.heights, self.p * 100))
+        return self.heights[2]
+
+
+@dataclass
+class CalibrationConfig:
+    # Length of each recording window, in seconds
+    rest_seconds: float = 3.0
+    max_seconds: float = 3.0
+    # Start of each window ignored while the player settles or ramps up
+    settle_seconds: float = 0.5
+
+    # Envelope percentiles taken as "at rest" and "full effort"; below the
+    # maximum so a single spike does not set the scale
+    rest_percentile: float = 0.95
+    max_percentile: float = 0.9
+    # Percentile of raw per-tick maxima at rest, for the plot's threshold line
+    raw_percentile: float = 0.95
+
+
+@dataclass
+class PlayerCalibration:
+    username: str
+    rest_mean: float  # Envelope at rest
+    rest_sd: float
+    rest_level: float  # Envelope percentile at rest: zero effort
+    max_level: float  # Envelope percentile at maximal contraction: full effort
+    raw_threshold: float  # Raw sample level that rest noise rarely exceeds
+    timestamp: float = field(default_factory=time.time)
+
+    def effort(self, envelope):
+        """Envelope as 0-1 effort for this player"""
+        span = max(self.max_level - self.rest_level, 1e-9)
+        return float(np.clip((envelope - self.rest_level) / span, 0.0, 1.0))
+
+
+class CalibrationRecorder:
+    """Accumulates the rest and contraction windows, one InputSnapshot at a time"""
+
+    REST = "rest"
+    MAX = "max"
+
+    def __init__(self, config=None):
+        self.config = config or CalibrationConfig()
+        self.rest = RunningStats()
+        self.rest_quantile = P2Quantile(self.config.rest_percentile)
+        self.raw_quantile = P2Quantile(self.config.raw_percentile)
+        self.contraction = RunningStats()
+        self.max_quantile = P2Quantile(self.config.max_percentile)
+
+    def add(self, phase, snapshot):
+        """Add one tick's envelope (and raw samples) to the rest or max window"""
+        if phase == self.REST:
+            self.rest.add(snapshot.envelope)
+            self.rest_quantile.add(snapshot.envelope)
+            if len(snapshot.samples):
+                self.raw_quantile.add(snapshot.samples[:, 0].max())
+        elif phase == self.MAX:
+            self.contraction.add(snapshot.envelope)
+            self.max_quantile.add(snapshot.envelope)
+        else:
+            raise ValueError(f"phase must be {self.REST!r} or {self.MAX!r}, got {phase!r}")
+
+    def result(self, username):
+        """PlayerCalibration from the recorded windows, or None if one is empty"""
+        if self.rest.count == 0 or self.contraction.count == 0:
+            return None
+        return PlayerCalibration(
+            username=username,
+            rest_mean=self.rest.mean,
+            rest_sd=self.rest.sd,
+            rest_level=self.rest_quantile.value,
+            max_level=max(self.max_quantile.value, self.rest_quantile.value),
+            raw_threshold=self.raw_quantile.value,
+        )
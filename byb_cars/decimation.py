@@ -0,0 +1,159 @@
+"""Multi-resolution min/max store for plotting long, full-rate signals.
+
+Level 0 keeps raw samples; level l keeps the min and max of each run of
+``factor ** l`` samples. Every level is a ring of the same capacity, so
+coarser levels reach further back in time. Appending a block updates all
+levels incrementally. window() picks the coarsest level that still has at
+least one entry per pixel, then reduces it to exactly one min/max pair per
+pixel, so drawing costs the same for 100 ms of raw signal as for minutes of
+history.
+"""
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Incrementally decimated min/max history of one signal"""
+
+    def __init__(self, capacity=65536, levels=5, factor=4):
+        self.capacity = capacity
+        self.levels = levels
+        self.factor = factor
+        # Each ring is stored twice back to back, so that any run of up to
+        # `capacity` entries is a contiguous view and reads never copy
+        self.mins = np.zeros((levels, 2 * capacity), dtype=np.float32)
+        self.maxs = np.zeros((levels, 2 * capacity), dtype=np.float32)
+        # Entries ever written to each level
+        self.counts = np.zeros(levels, dtype=np.int64)
+        # Decimated runs on their way to the next level
+        self._scratch_min = np.empty(capacity, dtype=np.float32)
+        self._scratch_max = np.empty(capacity, dtype=np.float32)
+        # reduceat offsets of the last window, reused while its shape holds
+        self._starts_key = None
+        self._starts = None
+
+    @property
+    def total_samples(self):
+        return int(self.counts[0])
+
+    def history(self, level=None):
+        """Raw samples reachable at a level (the coarsest by default)"""
+        level = self.levels - 1 if level is None else level
+        return min(int(self.counts[level]), self.capacity) * self.factor**level
+
+    def append(self, block):
+        """Add raw samples and update every level"""
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim != 1:
+            block = block.ravel()
+        if len(block) == 0:
+            return
+        self._write(0, block, block)
+        for level in range(1, self.levels):
+            # Runs of `factor` entries below that are now complete
+            below = int(self.counts[level - 1])
+            start = int(self.counts[level]) * self.factor
+            stop = below // self.factor * self.factor
+            oldest = below - self.capacity
+            if start < oldest:
+                # Runs that were overwritten before they could be decimated
+                skipped = -(-(oldest - start) // self.factor)
+                self.counts[level] += skipped
+                start += skipped * self.factor
+            if stop <= start:
+                break
+            n = (stop - start) // self.factor
+            mins, maxs = self._scratch_min[:n], self._scratch_max[:n]
+            shape = (n, self.factor)
+            np.minimum.reduce(self._read(self.mins[level - 1], start, stop).reshape(shape), axis=1, out=mins)
+            np.maximum.reduce(self._read(self.maxs[level - 1], start, stop).reshape(shape), axis=1, out=maxs)
+            self._write(level, mins, maxs)
+
+    def _write(self, level, mins, maxs):
+        if len(mins) > self.capacity:
+            skipped = len(mins) - self.capacity
+            self.counts[level] += skipped
+            mins, maxs = mins[skipped:], maxs[skipped:]
+        start = int(self.counts[level]) % self.capacity
+        self._store(self.mins[level], start, mins)
+        self._store(self.maxs[level], start, maxs)
+        self.counts[level] += len(mins)
+
+    def _store(self, ring, start, values):
+        """Write values at ring position start, in both copies of the ring"""
+        capacity = self.capacity
+        first = min(len(values), capacity - start)
+        rest = len(values) - first
+        ring[start : start + first] = values[:first]
+        ring[capacity + start : capacity + start + first] = values[:first]
+        ring[:rest] = values[first:]
+        ring[capacity : capacity + rest] = values[first:]
+
+    def _read(self, ring, start, stop):
+        """Entries [start, stop) of a level ring, by absolute index, as a view"""
+        start = max(start, stop - self.capacity)
+        i = start % self.capacity
+        return ring[i : i + stop - start]
+
+    def samples(self, start, stop):
+        """Raw samples [start, stop), by absolute index, as a read-only view.
+
+        Samples that already left the level 0 ring are dropped from the front.
+        """
+        stop = min(stop, self.total_samples)
+        start = max(start, stop - self.capacity, 0)
+        view = self._read(self.mins[0], start, max(start, stop))
+        view.flags.writeable = False
+        return view
+
+    def window(self, num_samples, num_pixels):
+        """(mins, maxs), one pair per pixel, for the newest num_samples samples.
+
+        Pixels older than the available history are NaN.
+        """
+        mins = np.full(num_pixels, np.nan, dtype=np.float32)
+        maxs = np.full(num_pixels, np.nan, dtype=np.float32)
+        self.fill_window(num_samples, mins, maxs)
+        return mins, maxs
+
+    def fill_window(self, num_samples, mins, maxs):
+        """Like window(), but into preallocated arrays, one element per pixel.
+
+        Returns the first pixel with data; the ones before it are left as is.
+        """
+        num_pixels = len(mins)
+        per_pixel = num_samples / num_pixels
+        level = 0
+        while level + 1 < self.levels and self.counts[level + 1] > 0:
+            coarser = self.factor ** (level + 1)
+            # Go coarser while that still leaves an entry per pixel, or when
+            # this level does not reach back far enough
+            if coarser > per_pixel and num_samples <= self.history(level):
+                break
+            level += 1
+        scale = self.factor**level
+
+        count = int(self.counts[level])
+        entries = -(-num_samples // scale)
+        available = min(entries, count, self.capacity)
+        if available == 0:
+            return num_pixels
+
+        first, starts = self._pixel_starts(entries, available, num_pixels)
+        np.minimum.reduceat(self._read(self.mins[level], count - available, count), starts, out=mins[first:])
+        np.maximum.reduceat(self._read(self.maxs[level], count - available, count), starts, out=maxs[first:])
+        return first
+
+    def _pixel_starts(self, entries, available, num_pixels):
+        """First pixel with data, and where each such pixel starts in the data"""
+        key = (entries, available, num_pixels)
+        if key != self._starts_key:
+            # Pixel p covers entries [edges[p], edges[p + 1]) of the window;
+            # only the last `available` of them exist
+            edges = np.linspace(0, entries, num_pixels + 1)
+            missing = entries - available
+            first = int(np.searchsorted(edges[1:], missing, side="right"))
+            starts = np.floor(edges[first:-1]).astype(np.intp) - missing
+            np.clip(starts, 0, available - 1, out=starts)
+            self._starts_key = key
+            self._starts = (first, starts)
+        return self._starts
@@ -0,0 +1,232 @@
+import numpy as np
+
+# Arduino ADC is 10-bit: 0-1023
+ADC_MAX = 1023.0
+# ADC conversions per second, shared by all channels
+FIRMWARE_SAMPLE_RATE = 10000
+
+# Constants from Arduino firmware: replies are wrapped in these sequences
+START_ESCAPE_SEQ = bytes([255, 255, 1, 1, 128, 255])
+END_ESCAPE_SEQ = bytes([255, 255, 1, 1, 129, 255])
+MAX_MESSAGE_SIZE = 100  # MESSAGE_BUFFER_SIZE, including both sequences
+
+# Protocol v2 sends samples in checksummed batches of about this many samples
+V2_BATCH_SAMPLES = 32
+V2_SEQUENCE_MODULO = 128
+
+
+def decode_frames(buffer, num_channels):
+    """Decode every complete frame in buffer at once.
+
+    Frames are 2 bytes per channel; the first byte of a frame has its high bit
+    set and every other byte has it clear. Returns the raw 15-bit values as an
+    int16 array of shape (n_frames, num_channels) and the number of bytes
+    consumed from the front of the buffer. Bytes before the first frame start
+    and truncated frames are dropped; an incomplete frame at the end of the
+    buffer is left in place for the next call.
+    """
+    frame_size = 2 * num_channels
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    starts = np.flatnonzero(data & 0x80)
+    if len(starts) == 0:
+        # Nothing to sync to, drop everything
+        return np.empty((0, num_channels), dtype=np.int16), len(data)
+
+    # A frame is complete if the next frame start is at least frame_size away.
+    # The last start is measured against the end of the buffer.
+    gaps = np.diff(starts, append=len(data))
+    complete = starts[gaps >= frame_size]
+
+    # Keep the last frame start around if it is still waiting for bytes
+    consumed = int(starts[-1]) if gaps[-1] < frame_size else len(data)
+
+    if len(complete) == 0:
+        return np.empty((0, num_channels), dtype=np.int16), consumed
+
+    first, last = int(complete[0]), int(complete[-1])
+    if last - first == (len(complete) - 1) * frame_size:
+        # Fast path: frames are back to back, a plain reshape is enough
+        frames = data[first : last + frame_size].reshape(-1, num_channels, 2)
+    else:
+        frames = data[complete[:, None] + np.arange(frame_size)].reshape(
+            -1, num_channels, 2
+        )
+
+    # 7 bits from each byte; the start flag is stripped from the high byte
+    high = (frames[:, :, 0] & 0x7F).astype(np.int16)
+    low = (frames[:, :, 1] & 0x7F).astype(np.int16)
+    return (high << 7) | low, consumed
+
+
+def encode_frames(values):
+    """Frame (n_frames, num_channels) raw values the way the firmware does"""
+    frames = np.empty(values.shape + (2,), dtype=np.uint8)
+    frames[:, :, 0] = (values >> 7) & 0x7F
+    frames[:, :, 1] = values & 0x7F
+    # Only the first byte of a frame has the high bit set
+    frames[:, 0, 0] |= 0x80
+    return frames.tobytes()
+
+
+def v2_batch_frames(num_channels):
+    """Frames per v2 batch; each batch holds whole frames"""
+    return max(1, V2_BATCH_SAMPLES // num_channels)
+
+
+def v2_batch_size(num_channels):
+    """Bytes per v2 batch: header, 2 bytes per sample, 2 checksum bytes"""
+    return 1 + 2 * num_channels * v2_batch_frames(num_channels) + 2
+
+
+def v2_checksum(payload):
+    """Fletcher-style pair of 7-bit sums over the rows of payload.
+
+    payload is (n_batches, n_bytes) and holds the 7-bit header and data
+    bytes. Matches the firmware's running s1 += b; s2 += s1 (mod 128).
+    """
+    payload = payload.astype(np.int64)
+    weights = np.arange(payload.shape[1], 0, -1, dtype=np.int64)
+    return payload.sum(axis=1) % 128, (payload @ weights) % 128
+
+
+class V2Decoder:
+    """Decoder for protocol v2 batches, which also counts what went wrong.
+
+    A batch is a header byte (high bit set, 7-bit sequence number), the
+    frames as 7-bit byte pairs, and two 7-bit checksum bytes. Full-length
+    batches with a bad checksum count as corrupt. Headers followed by too
+    few bytes count as truncated: a dropped byte, or a data byte whose high
+    bit flipped and split a batch in two. Gaps in the sequence count as
+    lost, whatever the cause, so they include the corrupt batches. Runs of
+    more than 127 lost batches cannot be told apart from shorter ones.
+    The 0x00 filler the firmware sends between batches is counted apart,
+    as filler_bytes.
+    """
+
+    def __init__(self, num_channels=1):
+        self.num_channels = num_channels
+        self.last_sequence = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.batches_ok = 0
+        self.batches_corrupt = 0
+        self.batches_truncated = 0
+        self.batches_lost = 0
+        self.filler_bytes = 0
+
+    def decode(self, buffer):
+        """Decode every complete batch in buffer, like decode_frames"""
+        num_channels = self.num_channels
+        batch_size = v2_batch_size(num_channels)
+        empty = np.empty((0, num_channels), dtype=np.int16)
+
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        starts = np.flatnonzero(data & 0x80)
+        if len(starts) == 0:
+            self.filler_bytes += len(data) - int(np.count_nonzero(data))
+            return empty, len(data)
+
+        gaps = np.diff(starts, append=len(data))
+        waiting = gaps[-1] < batch_size
+        consumed = int(starts[-1]) if waiting else len(data)
+        # Zero bytes outside complete batches are filler
+        filler = consumed - int(np.count_nonzero(data[:consumed]))
+
+        # Starts followed by too few bytes lost some on the way, or are not
+        # batch starts at all; either way they are not checksum failures
+        truncated = gaps[:-1] < batch_size if waiting else gaps < batch_size
+        self.batches_truncated += int(np.count_nonzero(truncated))
+
+        complete = starts[gaps >= batch_size]
+        if len(complete) == 0:
+            self.filler_bytes += filler
+            return empty, consumed
+
+        batches = data[complete[:, None] + np.arange(batch_size)]
+        self.filler_bytes += filler - (batches.size - int(np.count_nonzero(batches)))
+        batches &= 0x7F
+        s1, s2 = v2_checksum(batches[:, :-2])
+        valid = (s1 == batches[:, -2]) & (s2 == batches[:, -1])
+        self.batches_corrupt += int(np.count_nonzero(~valid))
+        batches = batches[valid]
+        self.batches_ok += len(batches)
+        if len(batches) == 0:
+            return empty, consumed
+
+        # Sequence numbers skipped between consecutive good batches
+        sequence = batches[:, 0].astype(np.int64)
+        previous = np.concatenate(
+            ([sequence[0] - 1 if self.last_sequence is None else self.last_sequence], sequence[:-1])
+        )
+        self.batches_lost += int(((sequence - previous - 1) % V2_SEQUENCE_MODULO).sum())
+        self.last_sequence = int(sequence[-1])
+
+        frames = batches[:, 1:-2].reshape(-1, num_channels, 2).astype(np.int16)
+        return (frames[:, :, 0] << 7) | frames[:, :, 1], consumed
+
+
+def normalize(values):
+    """Convert raw ADC values to float32 in the 0.0-1.0 range"""
+    return values.astype(np.float32) / np.float32(ADC_MAX)
+
+
+class MessageParser:
+    """Splits escape-framed messages out of the serial stream.
+
+    The firmware interleaves replies such as the board type with the sample
+    frames, wrapped in START_ESCAPE_SEQ/END_ESCAPE_SEQ. feed() takes freshly
+    read bytes and returns the bytes that belong to frames plus any complete
+    messages. Only a possible partial escape sequence or an unfinished
+    message (at most MAX_MESSAGE_SIZE bytes) is held back between calls, so
+    old bytes are never scanned twice.
+    """
+
+    def __init__(self):
+        self.pending = b""
+        self.in_message = False
+
+    def feed(self, data):
+        """Return (frame_bytes, messages) for the new data"""
+        buffer = self.pending + bytes(data)
+        self.pending = b""
+        frame_parts = []
+        messages = []
+
+        while True:
+            if self.in_message:
+                end = buffer.find(END_ESCAPE_SEQ, len(START_ESCAPE_SEQ))
+                if end < 0:
+                    if len(buffer) < MAX_MESSAGE_SIZE:
+                        # Wait for the rest of the message
+                        self.pending = buffer
+                        break
+                    # Never terminated, treat it as data from here on
+                    self.in_message = False
+                    frame_parts.append(buffer[: len(START_ESCAPE_SEQ)])
+                    buffer = buffer[len(START_ESCAPE_SEQ) :]
+                    continue
+                messages.append(buffer[len(START_ESCAPE_SEQ) : end])
+                buffer = buffer[end + len(END_ESCAPE_SEQ) :]
+                self.in_message = False
+
+            start = buffer.find(START_ESCAPE_SEQ)
+            if start < 0:
+                # Hold back a start sequence cut off at the end of the data
+                keep = _partial_start(buffer)
+                frame_parts.append(buffer[: len(buffer) - keep])
+                self.pending = buffer[len(buffer) - keep :]
+                break
+            frame_parts.append(buffer[:start])
+            buffer = buffer[start:]
+            self.in_message = True
+
+        return b"".join(frame_parts), messages
+
+
+def _partial_start(buffer):
+    """Length of the longest tail of buffer that starts START_ESCAPE_SEQ"""
+    for length in range(min(len(START_ESCAPE_SEQ) - 1, len(buffer)), 0, -1):
+        if buffer.endswith(START_ESCAPE_SEQ[:length]):
+            return length
+    return 0
@@ -0,0 +1,169 @@
+"""Synthetic EMG for demo mode and load tests.
+
+DemoEMGSource has the interface of ArduinoEMGHandler, but makes its samples
+up: noise around mid-scale whose amplitude follows how hard the player
+"flexes", i.e. ramps up while SPACE is held and relaxes after it is released,
+with a slow burst modulation on top. Samples are produced in vectorized
+blocks from a pre-generated pool of noise, at the configured sample rate,
+whenever someone reads, so there is no thread and no per-sample Python.
+They are quantized to the 10-bit ADC, framed like the firmware's stream and
+decoded with decode_frames, so a load test also exercises the decoder.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import threading
+import time
+
+import numpy as np
+
+from byb_cars.decoder import (
+    ADC_MAX,
+    FIRMWARE_SAMPLE_RATE,
+    decode_frames,
+    encode_frames,
+    normalize,
+)
+from byb_cars.ring_buffer import SampleRingBuffer
+
+
+@dataclass
+class DemoConfig:
+    # Samples per second per channel; raise it to use demo mode as a load test
+    sample_rate: float = FIRMWARE_SAMPLE_RATE
+    num_channels: int = 1
+
+    # Noise amplitude in normalized units (0-1 full scale) at rest and full effort
+    rest_amplitude: float = 0.01
+    max_amplitude: float = 0.2
+    # Time constants of the effort ramp when SPACE is pressed and released
+    attack_time: float = 0.15
+    release_time: float = 0.3
+    # Slow amplitude modulation of a sustained contraction
+    burst_frequency: float = 2.0
+    burst_depth: float = 0.3
+
+    # Noise is drawn this many samples at a time
+    pool_size: int = 8192
+    seed: Optional[int] = None
+
+
+class DemoEMGSource:
+    """Burst-modulated noise that ramps with key presses"""
+
+    def __init__(self, config=None):
+        self.config = config or DemoConfig()
+        self.num_channels = self.config.num_channels
+        self.sample_rate = self.config.sample_rate
+        self.rng = np.random.default_rng(self.config.seed)
+        self.ring = SampleRingBuffer(num_channels=self.num_channels)
+
+        self.key_pressed = False
+        self.effort = 0.0
+        self.start_time = None
+        self._pool = np.empty((0, self.num_channels), dtype=np.float32)
+        self._pool_index = 0
+        # Readers in several threads (game and recorder) may generate at once
+        self._lock = threading.Lock()
+
+    def connect(self):
+        return True
+
+    def start_reading(self):
+        """Start the sample clock"""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        return True
+
+    def stop_reading(self):
+        self.start_time = None
+
+    def disconnect(self):
+        self.stop_reading()
+
+    def set_key_state(self, pressed):
+        """Bring the samples up to now, then ramp towards the new effort"""
+        self._generate()
+        self.key_pressed = pressed
+
+    @property
+    def write_index(self):
+        return self.ring.write_index
+
+    def get_latest_value(self, channel=0):
+        """Get the latest value from the specified channel"""
+        self._generate()
+        latest = self.ring.latest()
+        if len(latest) and 0 <= channel < self.num_channels:
+            return float(latest[0, channel])
+        return 0.0
+
+    def read_since(self, cursor):
+        """Get every sample produced after cursor, as (samples, new_cursor)"""
+        self._generate()
+        return self.ring.read_since(cursor)
+
+    def read_block_since(self, cursor):
+        """Get (samples, timestamps, new_cursor) for samples produced after cursor"""
+        self._generate()
+        return self.ring.read_block_since(cursor)
+
+    def _generate(self):
+        """Write every sample due by now to the ring"""
+        with self._lock:
+            self._generate_locked()
+
+    def _generate_locked(self):
+        if self.start_time is None:
+            return
+        now = time.perf_counter()
+        first = self.ring.write_index
+        n = int((now - self.start_time) * self.sample_rate) - first
+        if n <= 0:
+            return
+        if n > self.ring.capacity:
+            # After a long pause only the newest samples would survive anyway
+            skipped = n - self.ring.capacity
+            self._advance_effort(skipped)
+            self.ring.write_index += skipped
+            first += skipped
+            n = self.ring.capacity
+
+        indices = first + np.arange(n)
+        t = indices / self.sample_rate
+        effort = self._advance_effort(n)
+        config = self.config
+        burst = 1.0 + config.burst_depth * np.sin(2 * np.pi * config.burst_frequency * t)
+        amplitude = config.rest_amplitude + (
+            config.max_amplitude - config.rest_amplitude
+        ) * effort * burst
+        samples = 0.5 + amplitude[:, None] * self._noise(n)
+        np.clip(samples, 0.0, 1.0, out=samples)
+        # Through the same decode path as serial data
+        values = np.rint(samples * ADC_MAX).astype(np.int16)
+        values, _ = decode_frames(encode_frames(values), self.num_channels)
+        self.ring.write(normalize(values), self.start_time + t)
+
+    def _advance_effort(self, n):
+        """Effort for the next n samples, easing towards the key state"""
+        target = 1.0 if self.key_pressed else 0.0
+        tau = self.config.attack_time if self.key_pressed else self.config.release_time
+        decay = np.exp(-np.arange(1, n + 1) / (tau * self.sample_rate))
+        effort = target + (self.effort - target) * decay
+        self.effort = float(effort[-1])
+        return effort
+
+    def _noise(self, n):
+        """Next n rows of standard normal noise from the pool"""
+        parts = []
+        while n > 0:
+            if self._pool_index >= len(self._pool):
+                size = max(self.config.pool_size, n)
+                self._pool = self.rng.standard_normal(
+                    (size, self.num_channels), dtype=np.float32
+                )
+                self._pool_index = 0
+            take = min(n, len(self._pool) - self._pool_index)
+            parts.append(self._pool[self._pool_index : self._pool_index + take])
+            self._pool_index += take
+            n -= take
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
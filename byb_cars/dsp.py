@@ -0,0 +1,187 @@
+"""Streaming EMG envelope: DC removal, rectification and a low-pass envelope.
+
+IIR filters are recursive, so they cannot be written as a single NumPy
+expression over a block the usual way. Instead each cascade of biquads is
+turned into one state-space system, and a block of L samples is filtered
+exactly with two matrix products:
+
+    y = O @ state + T @ x          (O: L x d, T: L x L lower triangular)
+    state = A^L @ state + G @ x    (G: d x L)
+
+O, T and G are built once for the longest block; shorter blocks use slices.
+Every channel is a column, so all channels go through in the same products.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def biquad(kind, cutoff, sample_rate, q=1 / np.sqrt(2)):
+    """Audio EQ cookbook biquad; returns normalized (b, a)"""
+    w0 = 2 * np.pi * cutoff / sample_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+    if kind == "lowpass":
+        b = np.array([(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2])
+    elif kind == "highpass":
+        b = np.array([(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2])
+    else:
+        raise ValueError(f"kind must be 'lowpass' or 'highpass', got {kind!r}")
+    a = np.array([1 + alpha, -2 * cos_w0, 1 - alpha])
+    return b / a[0], a / a[0]
+
+
+def butterworth(kind, order, cutoff, sample_rate):
+    """Butterworth filter of even order as a list of (b, a) biquads"""
+    if order < 2 or order % 2:
+        raise ValueError(f"order must be even and at least 2, got {order}")
+    sections = []
+    for k in range(order // 2):
+        # Pole pairs of the analog prototype set the Q of each section
+        theta = (2 * k + 1) * np.pi / (2 * order)
+        sections.append(biquad(kind, cutoff, sample_rate, q=1 / (2 * np.cos(theta))))
+    return sections
+
+
+def _state_space(sections):
+    """(A, B, C, D) of biquads in series, in transposed direct form II"""
+    A = np.zeros((0, 0))
+    B = np.zeros(0)
+    C = np.zeros(0)
+    D = 1.0
+    for b, a in sections:
+        A2 = np.array([[-a[1], 1.0], [-a[2], 0.0]])
+        B2 = np.array([b[1] - a[1] * b[0], b[2] - a[2] * b[0]])
+        C2 = np.array([1.0, 0.0])
+        D2 = b[0]
+        # Feed the output of what we have so far into the new section
+        n = len(A)
+        combined = np.zeros((n + 2, n + 2))
+        combined[:n, :n] = A
+        combined[n:, :n] = np.outer(B2, C)
+        combined[n:, n:] = A2
+        A = combined
+        B = np.concatenate((B, B2 * D))
+        C = np.concatenate((D2 * C, C2))
+        D = D2 * D
+    return A, B, C, D
+
+
+class SOSFilter:
+    """Stateful cascade of biquads applied to (n_samples, num_channels) blocks"""
+
+    def __init__(self, sections, num_channels=1, block_size=256):
+        self.sections = sections
+        self.num_channels = num_channels
+        self.block_size = block_size
+        A, B, C, D = _state_space(sections)
+        self._A, self._B = A, B
+        order = len(A)
+
+        # Powers of A up to block_size
+        powers = np.empty((block_size + 1, order, order))
+        powers[0] = np.eye(order)
+        for n in range(block_size):
+            powers[n + 1] = A @ powers[n]
+        self._powers = powers
+
+        # Output from the state: O[n] = C A^n
+        self._O = C @ powers[:block_size]
+        # Impulse response h[0] = D, h[m] = C A^(m-1) B, laid out as Toeplitz
+        h = np.concatenate(([D], self._O[: block_size - 1] @ B))
+        lag = np.subtract.outer(np.arange(block_size), np.arange(block_size))
+        self._T = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+        # State from the inputs: G[:, k] = A^(block_size-1-k) B
+        self._G = (powers[block_size - 1 :: -1] @ B).T
+
+        self.state = None
+
+    def reset(self):
+        """Forget the filter state; the next block starts from steady state"""
+        self.state = None
+
+    def _steady_state(self, x0):
+        """State the filter would settle in after a constant input x0"""
+        order = len(self._A)
+        zi = np.linalg.solve(np.eye(order) - self._A, self._B)
+        return np.outer(zi, x0)
+
+    def process(self, block):
+        """Filter a (n_samples, num_channels) block, continuing from the last one"""
+        block = np.asarray(block, dtype=np.float64).reshape(-1, self.num_channels)
+        if self.state is None:
+            if len(block) == 0:
+                return block
+            self.state = self._steady_state(block[0])
+
+        out = np.empty_like(block)
+        size = self.block_size
+        for start in range(0, len(block), size):
+            x = block[start : start + size]
+            n = len(x)
+            out[start : start + n] = self._O[:n] @ self.state + self._T[:n, :n] @ x
+            self.state = self._powers[n] @ self.state + self._G[:, size - n :] @ x
+        return out
+
+
+@dataclass
+class EnvelopeConfig:
+    # DC removal, below the EMG band
+    highpass_hz: float = 20.0
+    highpass_order: int = 2
+
+    # Envelope smoothing: lower is smoother but slower to react
+    lowpass_hz: float = 5.0
+    lowpass_order: int = 2
+
+    # Rectified EMG is small next to the 0-1 input range; full effort should
+    # land around the car's input_mapping_divisor
+    gain: float = 2.0
+
+
+class EMGEnvelope:
+    """DC removal, full-wave rectification and low-pass envelope, per block.
+
+    process() takes every sample that arrived since the last call, as a
+    (n_samples, num_channels) block, and returns the envelope for each of
+    them. Filter state carries over, so block boundaries do not show.
+    """
+
+    def __init__(self, sample_rate, num_channels=1, config=None):
+        self.config = config or EnvelopeConfig()
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        # Cutoffs cannot go above Nyquist at low per-channel rates
+        nyquist = 0.45 * sample_rate
+        self.highpass = SOSFilter(
+            butterworth(
+                "highpass",
+                self.config.highpass_order,
+                min(self.config.highpass_hz, nyquist),
+                sample_rate,
+            ),
+            num_channels,
+        )
+        self.lowpass = SOSFilter(
+            butterworth(
+                "lowpass",
+                self.config.lowpass_order,
+                min(self.config.lowpass_hz, nyquist),
+                sample_rate,
+            ),
+            num_channels,
+        )
+        self.value = np.zeros(num_channels)
+
+    def reset(self):
+        self.highpass.reset()
+        self.lowpass.reset()
+        self.value = np.zeros(self.num_channels)
+
+    def process(self, block):
+        """Envelope of every sample in block; also updates value"""
+        rectified = np.abs(self.highpass.process(block))
+        envelope = self.lowpass.process(rectified) * self.config.gain
+        if len(envelope):
+            self.value = envelope[-1]
+        return envelope
@@ -1,6 +1,10 @@
 from .car import Car
 from .plot import SignalPlot
+from .spectrogram import SpectrogramPlot
+from .reaction import ReactionGame
 from .world import GameWorld
 from .score_manager import ScoreManager, get_username, show_high_scores
+from .calibration_screen import calibrate_player, load_or_calibrate
 
-__all__ = ["Car", "SignalPlot", "GameWorld", "ScoreManager", "get_username", "show_high_scores"]
+__all__ = ["Car", "SignalPlot", "SpectrogramPlot", "ReactionGame", "GameWorld", "ScoreManager", "get_username", "show_high_scores",
+           "calibrate_player", "load_or_calibrate"]
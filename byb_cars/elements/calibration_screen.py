@@ -0,0 +1,90 @@
+import pygame
+import sys
+import time
+from byb_cars import defaults
+from byb_cars.calibration import CalibrationConfig, CalibrationRecorder
+from byb_cars.elements.fonts import render_text
+from byb_cars.elements.layout_config import layout
+
+
+def calibrate_player(screen, input_handler, username: str, config: CalibrationConfig = None):
+    """Record a rest and a maximal contraction window; returns a PlayerCalibration.
+
+    Returns None if the player skips with ESC.
+    """
+    config = config if config is not None else CalibrationConfig()
+    recorder = CalibrationRecorder(config)
+    phases = [
+        (CalibrationRecorder.REST, "Relax your muscle", config.rest_seconds),
+        (CalibrationRecorder.MAX, "Squeeze as hard as you can!", config.max_seconds),
+    ]
+
+    bar_width = layout.input_box_width
+    bar_height = layout.input_box_height // 2
+    bar_x = defaults.WIDTH // 2 - bar_width // 2
+    clock = pygame.time.Clock()
+    peak_envelope = 1e-6
+
+    for phase, instruction, seconds in phases:
+        phase_start = time.perf_counter()
+        duration = config.settle_seconds + seconds
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        input_handler.set_key_state(False)
+                        return None
+                    if event.key == pygame.K_SPACE:
+                        input_handler.set_key_state(True)
+                elif event.type == pygame.KEYUP and event.key == pygame.K_SPACE:
+                    input_handler.set_key_state(False)
+
+            elapsed = time.perf_counter() - phase_start
+            if elapsed >= duration:
+                break
+            snapshot = input_handler.update()
+            if elapsed >= config.settle_seconds:
+                recorder.add(phase, snapshot)
+            peak_envelope = max(peak_envelope, snapshot.envelope)
+
+            screen.fill((0, 0, 0))
+            title = render_text(f"Calibrating {username}", layout.fonts.title_size, layout.fonts.light_color)
+            screen.blit(title, title.get_rect(centerx=defaults.WIDTH // 2, top=layout.highscore_title_top))
+            text = render_text(instruction, layout.fonts.normal_size, layout.fonts.light_color)
+            screen.blit(text, text.get_rect(centerx=defaults.WIDTH // 2, bottom=defaults.HEIGHT // 2 - 40))
+
+            # Time left in this window
+            y = defaults.HEIGHT // 2
+            pygame.draw.rect(screen, layout.fonts.gray_color, (bar_x, y, bar_width, bar_height), 1)
+            pygame.draw.rect(
+                screen,
+                layout.input_box_active_color,
+                (bar_x, y, int(bar_width * min(elapsed / duration, 1.0)), bar_height),
+            )
+
+            # Live envelope, relative to the strongest seen so far
+            y += 2 * bar_height
+            fill = int(bar_width * snapshot.envelope / peak_envelope)
+            pygame.draw.rect(screen, layout.fonts.gray_color, (bar_x, y, bar_width, bar_height), 1)
+            pygame.draw.rect(screen, layout.high_speed_color, (bar_x, y, fill, bar_height))
+
+            hint = render_text("ESC: skip", layout.fonts.small_size, layout.fonts.gray_color)
+            screen.blit(hint, hint.get_rect(centerx=defaults.WIDTH // 2, bottom=defaults.HEIGHT - 50))
+            pygame.display.flip()
+            clock.tick(60)
+
+    input_handler.set_key_state(False)
+    return recorder.result(username)
+
+
+def load_or_calibrate(screen, input_handler, score_manager, username: str, recalibrate=False):
+    """Stored calibration of a returning player, or a new one saved for next time"""
+    calibration = None if recalibrate else score_manager.get_calibration(username)
+    if calibration is None:
+        calibration = calibrate_player(screen, input_handler, username)
+        if calibration is not None:
+            score_manager.set_calibration(calibration)
+    return calibration
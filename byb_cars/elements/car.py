@@ -27,13 +27,23 @@ class Car:
 
         self.img = get_car_img()
         self.speed = self.config.default_speed
+        # PlayerCalibration of the current player; None uses input_mapping_divisor
+        self.calibration = None
 
-    def update(self):
-        # Get input value from InputHandler
-        input_value = self.input_handler.get_value()
+    def update(self, snapshot=None):
+        # Use the tick's InputSnapshot, or ask the InputHandler directly
+        if snapshot is not None:
+            input_value = snapshot.envelope
+        else:
+            input_value = self.input_handler.get_envelope()
 
         # Map input value to speed (adjust ranges as needed)
-        if input_value <= 0:
+        if self.calibration is not None:
+            # From the player's rest level (min_speed) to their full effort (max_speed)
+            mapped_speed = self.config.min_speed + self.calibration.effort(input_value) * (
+                self.config.max_speed - self.config.min_speed
+            )
+        elif input_value <= 0:
             mapped_speed = self.config.min_speed
         else:
             # Map input_value to speed range
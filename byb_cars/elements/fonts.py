@@ -0,0 +1,82 @@
+"""Shared fonts and a cache of rendered text.
+
+pygame.font.SysFont() searches the installed fonts and loads a new Font on
+every call, and Font.render() rasterizes the string again each time. Most
+HUD text is the same from one frame to the next, so draw code asks
+get_font() for a font and render_text() for a surface instead. Both are
+process-wide. Cached surfaces are shared: blit them, never draw on them.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from byb_cars.elements.layout_config import layout
+
+_fonts = {}
+
+
+def _family(family):
+    """The family name fonts and text are cached under; None is the default"""
+    return family if family is not None else layout.fonts.default_font
+
+
+def get_font(size, family=None):
+    """Font of a family (layout's default if None) and size, loaded once"""
+    family = _family(family)
+    key = (family, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(family, size)
+    return font
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size, color, family=None, antialias=True):
+        """Surface of text in the given font and color, rendered on first use"""
+        family = _family(family)
+        key = (text, family, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = get_font(size, family).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats_line(self):
+        """One line for the telemetry overlay"""
+        return (
+            f"Text cache: {self.hit_rate:.1%} hits  {len(self.surfaces)}/{self.max_entries} entries"
+            f"  {len(_fonts)} fonts  {self.evictions} evicted"
+        )
+
+
+# Global instance for easy import
+text_cache = TextCache()
+
+
+def render_text(text, size, color, family=None, antialias=True):
+    """text_cache.render(), for the common case"""
+    return text_cache.render(text, size, color, family, antialias)
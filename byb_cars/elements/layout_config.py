@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple, Dict, Optional
 from byb_cars import defaults
 
@@ -110,7 +110,7 @@ class LayoutConfig:
     # ======================
     # Font configuration
     # ======================
-    fonts: FontConfig = FontConfig()
+    fonts: FontConfig = field(default_factory=FontConfig)
     
     def __post_init__(self):
         # Calculate derived values
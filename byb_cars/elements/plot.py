@@ -1,42 +1,233 @@
 import pygame
 import numpy as np
 from byb_cars import defaults
+from byb_cars.decimation import MinMaxPyramid
+from byb_cars.decoder import FIRMWARE_SAMPLE_RATE
 from byb_cars.elements.layout_config import layout
+from byb_cars.elements.fonts import render_text
 
 
 # Signal Plot class (similar to PyQtGraph implementation in main.py)
 class SignalPlot:
-    def __init__(self, width, height):
+    # Zoom limits and step, in seconds of signal across the plot
+    MIN_WINDOW = 0.1
+    MAX_WINDOW = 300.0
+    ZOOM_STEP = 2.0
+    # "lines" redraws the whole trace every frame; the scroll modes keep it in
+    # a pixel buffer and only rasterize the columns that new samples complete
+    RENDER_MODES = ("lines", "scroll-band", "scroll-line")
+    # Trace layer pixels that let the background through
+    TRANSPARENT = (255, 0, 255)
+
+    def __init__(
+        self, width, height, sample_rate=FIRMWARE_SAMPLE_RATE, window_seconds=2.0, render_mode="lines"
+    ):
+        if render_mode not in self.RENDER_MODES:
+            raise ValueError(f"Unknown render mode {render_mode!r}, expected one of {self.RENDER_MODES}")
         self.width = width
         self.height = height
-        self.buffer_size = 200  # Keep buffer size as it's not a layout parameter
-        self.signal_buffer = np.zeros(self.buffer_size)
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.render_mode = render_mode
+        # Full-rate min/max history; 4**4 * 65536 samples is ~28 minutes at 10 kHz
+        self.pyramid = MinMaxPyramid(capacity=65536, levels=5, factor=4)
+        self.current_value = 0.0
         self.surface = pygame.Surface((width, height))
 
+        # Border, grid, labels, threshold and title only change with the
+        # scale, so they are rendered once and blitted under the trace
+        self.background = None
+        self._background_key = None
+
         # Plot boundaries
         self.plot_width = width - 2 * layout.plot_margin
         self.plot_height = height - 2 * layout.plot_margin
 
         # Y-axis scaling (not layout, but kept here for simplicity)
         self.y_min = 0.0
-        self.y_max = 3.0  # Maximum expected signal value
+        self.y_max = 1.0  # Samples are normalized to 0-1 full scale
+        # Level marked by the threshold line; per-player once calibrated
+        self.threshold = 1.0
+
+        # Per-pixel min/max and the zigzag through them, allocated once; the
+        # x coordinates never change, so only y is written on each draw
+        self._mins = np.empty(self.plot_width, dtype=np.float32)
+        self._maxs = np.empty(self.plot_width, dtype=np.float32)
+        self._points = np.empty((2 * self.plot_width, 2))
+        x_pos = layout.plot_margin + np.arange(self.plot_width)
+        self._points[0::2, 0] = x_pos
+        self._points[1::2, 0] = x_pos
+        # Windows with fewer samples than pixels draw one point per raw
+        # sample instead; x is spread over the plot once per window length
+        self._sample_points = np.empty((self.plot_width, 2))
+        self._sample_points_count = None
+
+        # Scroll modes: the trace layer, one pixel column per `_column_samples`
+        # samples, and how far into the signal it has been drawn
+        self.trace = pygame.Surface((self.plot_width, self.plot_height), 0, 32)
+        self.trace.set_colorkey(self.TRANSPARENT)
+        self._trace_key = None
+        self._column_samples = 1
+        self._drawn_samples = 0
+        self._last_y = None
+        self._rows = np.arange(self.plot_height)
 
-    def update(self, new_value):
-        # Roll buffer and add new value
-        self.signal_buffer = np.roll(self.signal_buffer, -1)
-        self.signal_buffer[-1] = new_value
+    def update(self, samples):
+        """Add the samples that arrived this tick (a block or a single value)"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.size == 0:
+            return
+        self.pyramid.append(samples)
+        self.current_value = float(samples.flat[-1])
 
         # Dynamically adjust y-axis if needed
-        if new_value > self.y_max:
-            self.y_max = new_value * 1.2  # Add 20% headroom
+        peak = float(samples.max())
+        if peak > self.y_max:
+            self.y_max = peak * 1.2  # Add 20% headroom
 
-    def draw(self, surface, x, y):
-        # Clear plot area
-        self.surface.fill(defaults.PLOT_BG)
+    def zoom(self, steps):
+        """Zoom out by ZOOM_STEP per positive step, in per negative step"""
+        window = self.window_seconds * self.ZOOM_STEP**steps
+        longest = min(self.MAX_WINDOW, self.pyramid.history() / self.sample_rate)
+        self.window_seconds = min(max(window, self.MIN_WINDOW), max(longest, self.MIN_WINDOW))
+
+    def _window_label(self):
+        if self.window_seconds < 1.0:
+            return f"{self.window_seconds * 1000:.0f} ms"
+        if self.window_seconds < 60.0:
+            return f"{self.window_seconds:.1f} s"
+        return f"{self.window_seconds / 60:.1f} min"
+
+    def _draw_signal(self):
+        """Draw the signal as one min/max pair per pixel column.
+
+        A zigzag through both extremes traces the envelope at any zoom in a
+        single call, and the coordinates are computed in place.
+        """
+        num_samples = max(1, int(self.window_seconds * self.sample_rate))
+        if num_samples <= self.plot_width:
+            self._draw_samples(num_samples)
+            return
+        first = self.pyramid.fill_window(num_samples, self._mins, self._maxs)
+        if self.plot_width - first < 2:
+            return
+        top = layout.plot_margin
+        bottom = layout.plot_margin + self.plot_height
+        scale = -self.plot_height / self.y_max
+        points = self._points[2 * first :]
+        y_pos = points[:, 1]
+        # Scale values to plot height (flipped, as pygame y increases downward)
+        np.multiply(self._mins[first:], scale, out=points[0::2, 1])
+        np.multiply(self._maxs[first:], scale, out=points[1::2, 1])
+        y_pos += bottom
+        np.clip(y_pos, top, bottom, out=y_pos)  # Clamp to plot area
+        pygame.draw.lines(self.surface, defaults.PLOT_LINE, False, points, 1)
+
+    def _draw_samples(self, num_samples):
+        """Draw the newest num_samples raw samples, one point each"""
+        total = self.pyramid.total_samples
+        samples = self.pyramid.samples(total - num_samples, total)
+        if len(samples) < 2:
+            return
+        if num_samples != self._sample_points_count:
+            self._sample_points[:num_samples, 0] = layout.plot_margin + np.arange(num_samples) * (
+                (self.plot_width - 1) / max(1, num_samples - 1)
+            )
+            self._sample_points_count = num_samples
+        # The newest sample sits at the right edge
+        points = self._sample_points[num_samples - len(samples) : num_samples]
+        y_pos = points[:, 1]
+        np.multiply(samples, -self.plot_height / self.y_max, out=y_pos)
+        y_pos += layout.plot_margin + self.plot_height
+        np.clip(y_pos, layout.plot_margin, layout.plot_margin + self.plot_height, out=y_pos)
+        pygame.draw.lines(self.surface, defaults.PLOT_LINE, False, points, 1)
+
+    def _y_pixels(self, values):
+        """Trace layer rows of values, clamped to the plot"""
+        rows = self.plot_height - np.asarray(values) * (self.plot_height / self.y_max)
+        return np.clip(rows, 0, self.plot_height - 1).astype(np.intp)
+
+    def _rasterize(self, x0, top, bottom):
+        """Fill trace columns x0, x0 + 1, ... from row top to row bottom"""
+        pixels = pygame.surfarray.pixels2d(self.trace)
+        inside = (self._rows >= top[:, None]) & (self._rows <= bottom[:, None])
+        pixels[x0 : x0 + len(top)] = np.where(
+            inside, self.trace.map_rgb(defaults.PLOT_LINE), self.trace.map_rgb(self.TRANSPARENT)
+        )
+        del pixels  # Unlock the surface
+
+    def _rasterize_columns(self, x0, columns):
+        """Draw columns of raw samples, shape (n_columns, _column_samples)"""
+        if self.render_mode == "scroll-band":
+            self._rasterize(x0, self._y_pixels(columns.max(axis=1)), self._y_pixels(columns.min(axis=1)))
+            return
+        # Line: join each column's last sample to the previous one
+        y_pos = self._y_pixels(columns[:, -1])
+        previous = np.empty_like(y_pos)
+        previous[0] = y_pos[0] if self._last_y is None else self._last_y
+        previous[1:] = y_pos[:-1]
+        self._rasterize(x0, np.minimum(previous, y_pos), np.maximum(previous, y_pos))
+        self._last_y = y_pos[-1]
+
+    def _rebuild_trace(self, column_samples):
+        """Redraw the whole trace layer, after a zoom or rescale"""
+        self.trace.fill(self.TRANSPARENT)
+        self._column_samples = column_samples
+        self._last_y = None
+        total = self.pyramid.total_samples
+        if self.render_mode == "scroll-band":
+            # The pyramid reaches back further than the raw samples
+            first = self.pyramid.fill_window(
+                self.plot_width * column_samples, self._mins, self._maxs
+            )
+            if first < self.plot_width:
+                self._rasterize(
+                    first, self._y_pixels(self._maxs[first:]), self._y_pixels(self._mins[first:])
+                )
+            self._drawn_samples = total
+        else:
+            # Start as far back as the raw samples go; _scroll() draws them
+            columns = min(self.plot_width, min(total, self.pyramid.capacity) // column_samples)
+            self._drawn_samples = total - columns * column_samples
+
+    def _scroll(self):
+        """Scroll the trace layer by the columns completed since the last frame"""
+        num_samples = max(1, int(self.window_seconds * self.sample_rate))
+        column_samples = max(1, round(num_samples / self.plot_width))
+        key = (column_samples, self.y_max)
+        if key != self._trace_key:
+            self._rebuild_trace(column_samples)
+            self._trace_key = key
+
+        new_columns = (self.pyramid.total_samples - self._drawn_samples) // column_samples
+        if new_columns > self.plot_width:
+            # Columns that would scroll straight off the plot
+            self._drawn_samples += (new_columns - self.plot_width) * column_samples
+            self._last_y = None
+            new_columns = self.plot_width
+        if new_columns > 0:
+            start = self._drawn_samples
+            stop = start + new_columns * column_samples
+            samples = self.pyramid.samples(start, stop)
+            self._drawn_samples = stop
+            if len(samples) < stop - start:
+                # The raw samples were overwritten during a long stall
+                self._trace_key = None
+            else:
+                self.trace.scroll(-new_columns, 0)
+                self._rasterize_columns(
+                    self.plot_width - new_columns, samples.reshape(new_columns, column_samples)
+                )
+        self.surface.blit(self.trace, (layout.plot_margin, layout.plot_margin))
+
+    def _render_background(self):
+        """The parts of the plot that only depend on its size and scale"""
+        background = pygame.Surface((self.width, self.height))
+        background.fill(defaults.PLOT_BG)
 
         # Draw border
         pygame.draw.rect(
-            self.surface,
+            background,
             (0, 0, 0),
             (layout.plot_margin, layout.plot_margin, self.plot_width, self.plot_height),
             1,
@@ -46,7 +237,7 @@ class SignalPlot:
         for i in range(1, layout.plot_grid_lines):
             y_pos = layout.plot_margin + i * self.plot_height // layout.plot_grid_lines
             pygame.draw.line(
-                self.surface,
+                background,
                 defaults.PLOT_GRID,
                 (layout.plot_margin, y_pos),
                 (layout.plot_margin + self.plot_width, y_pos),
@@ -54,60 +245,55 @@ class SignalPlot:
             )
 
             # Add y-axis labels
-            font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.small_size)
             value = self.y_max * (layout.plot_grid_lines - i) / layout.plot_grid_lines
-            label = font.render(f"{value:.1f}", True, layout.fonts.normal_color)
-            self.surface.blit(label, (layout.plot_margin - 5, y_pos - layout.plot_label_y_offset))
+            label = render_text(f"{value:.1f}", layout.fonts.small_size, layout.fonts.normal_color)
+            background.blit(label, (layout.plot_margin - 5, y_pos - layout.plot_label_y_offset))
 
-        # Draw threshold line at 1.0
-        threshold_value = 1.0  # Keep this as it's a business logic parameter
+        # Draw threshold line
         threshold_y = (
             layout.plot_margin + self.plot_height 
-            - (threshold_value / self.y_max * self.plot_height)
+            - (self.threshold / self.y_max * self.plot_height)
         )
         pygame.draw.line(
-            self.surface,
+            background,
             defaults.THRESHOLD_LINE,
             (layout.plot_margin, threshold_y),
             (layout.plot_margin + self.plot_width, threshold_y),
             1,
         )
 
-        # Draw signal line
-        points = []
-        for i in range(self.buffer_size):
-            x_pos = layout.plot_margin + i * self.plot_width / (self.buffer_size - 1)
-            # Scale value to plot height (flipped, as pygame y increases downward)
-            y_pos = (
-                layout.plot_margin
-                + self.plot_height
-                - (self.signal_buffer[i] / self.y_max * self.plot_height)
-            )
-            y_pos = min(
-                layout.plot_margin + self.plot_height, max(layout.plot_margin, y_pos)
-            )  # Clamp to plot area
-            points.append((x_pos, y_pos))
-
-        # Draw signal line
-        if len(points) > 1:
-            pygame.draw.lines(self.surface, defaults.PLOT_LINE, False, points, 2)
-
-        # Add title and labels
-        font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.normal_size)
-        title = font.render("EMG Signal", True, layout.fonts.normal_color)
-        self.surface.blit(
+        # Add title
+        title = render_text(
+            f"EMG Signal ({self._window_label()})", layout.fonts.normal_size, layout.fonts.normal_color
+        )
+        background.blit(
             title, 
             (self.width // 2 - title.get_width() // 2, layout.plot_title_y_offset)
         )
+        return background
+
+    def draw(self, surface, x, y):
+        # Rebuild the background only when the scale, threshold, zoom or size changed
+        key = (self.width, self.height, self.y_max, self.threshold, self._window_label())
+        if key != self._background_key:
+            self.background = self._render_background()
+            self._background_key = key
+        self.surface.blit(self.background, (0, 0))
+
+        # Draw signal
+        if self.render_mode == "lines":
+            self._draw_signal()
+        else:
+            self._scroll()
 
         # Current value
-        if len(self.signal_buffer) > 0:
-            current_value = self.signal_buffer[-1]
-            value_text = font.render(f"Current: {current_value:.2f}", True, layout.fonts.normal_color)
-            self.surface.blit(
-                value_text, 
-                (self.width - layout.plot_value_x_offset, layout.plot_title_y_offset)
-            )
+        value_text = render_text(
+            f"Current: {self.current_value:.2f}", layout.fonts.normal_size, layout.fonts.normal_color
+        )
+        self.surface.blit(
+            value_text, 
+            (self.width - layout.plot_value_x_offset, layout.plot_title_y_offset)
+        )
 
         # Blit the plot surface onto the main surface
         surface.blit(self.surface, (x, y))
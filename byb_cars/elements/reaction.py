@@ -0,0 +1,158 @@
+import pygame
+import random
+from dataclasses import dataclass
+from typing import Optional
+from byb_cars import defaults
+from byb_cars.elements.fonts import render_text
+from byb_cars.elements.layout_config import layout
+from byb_cars.onset import OnsetConfig, OnsetDetector
+
+
+@dataclass
+class ReactionConfig:
+    # Trials per round
+    trials: int = 5
+    # Random wait between "Get ready" and the GO cue, so it cannot be anticipated
+    min_foreperiod: float = 1.5
+    max_foreperiod: float = 4.0
+    # Onsets faster than this after the cue are anticipations, not reactions
+    min_latency: float = 0.08
+    # Give up on a trial after this long without an onset
+    timeout: float = 2.0
+    # How long each trial's result stays on screen
+    result_seconds: float = 1.5
+    # Channel whose onsets count
+    channel: int = 0
+
+    # Cue and text
+    cue_radius: int = 90
+    cue_color: tuple = (0, 200, 0)
+    background_color: tuple = (30, 30, 40)
+    big_font_size: int = 64
+
+
+# Reaction-time mode: a GO cue appears after a random wait and the player
+# flexes as fast as possible. Latency runs from the frame that showed the cue
+# to the timestamp of the first sample over the onset threshold.
+class ReactionGame:
+    CALIBRATING = "calibrating"
+    WAITING = "waiting"
+    GO = "go"
+    RESULT = "result"
+    DONE = "done"
+
+    def __init__(self, sample_rate, num_channels=1, config=None, onset=None):
+        self.config = config or ReactionConfig()
+        self.detector = OnsetDetector(sample_rate, num_channels, onset or OnsetConfig())
+        self.reset()
+
+    def reset(self):
+        """Recalibrate the rest level and start a new round"""
+        self.latencies = []
+        self.message = ""
+        self.state = self.CALIBRATING
+        self.state_time = None
+        self.go_at = None  # When the cue is due, time.perf_counter()
+        self.cue_time: Optional[float] = None  # When the cue reached the screen
+        self.detector.calibrate()
+
+    def _enter(self, state, now):
+        self.state = state
+        self.state_time = now
+        if state == self.WAITING:
+            self.go_at = now + random.uniform(self.config.min_foreperiod, self.config.max_foreperiod)
+            self.cue_time = None
+
+    def update(self, snapshot):
+        """Run the detector over the tick's samples and advance the trial"""
+        now = snapshot.time
+        onsets = [
+            event
+            for event in self.detector.process(snapshot.samples, snapshot.timestamps)
+            if event.active and event.channel == self.config.channel
+        ]
+
+        if self.state == self.CALIBRATING:
+            if self.detector.calibrated:
+                self._enter(self.WAITING, now)
+        elif self.state == self.WAITING:
+            if onsets:
+                self.message = "Too early!"
+                self._enter(self.RESULT, now)
+            elif now >= self.go_at:
+                self._enter(self.GO, now)
+        elif self.state == self.GO:
+            if self.cue_time is None:
+                # The cue has not been flipped to the screen yet
+                if onsets:
+                    self.message = "Too early!"
+                    self._enter(self.RESULT, now)
+                return
+            if onsets:
+                latency = onsets[0].time - self.cue_time
+                if latency < self.config.min_latency:
+                    self.message = "Too early!"
+                else:
+                    self.latencies.append(latency)
+                    self.message = f"{latency * 1000:.1f} ms"
+                self._enter(self.RESULT, now)
+            elif now - self.cue_time > self.config.timeout:
+                self.message = "Missed!"
+                self._enter(self.RESULT, now)
+        elif self.state == self.RESULT:
+            if now - self.state_time >= self.config.result_seconds:
+                if len(self.latencies) >= self.config.trials:
+                    self._enter(self.DONE, now)
+                else:
+                    self._enter(self.WAITING, now)
+
+    def presented(self, flip_time):
+        """Call right after display.flip(); stamps the frame that first shows the cue"""
+        if self.state == self.GO and self.cue_time is None:
+            self.cue_time = flip_time
+
+    @property
+    def mean_latency(self):
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def best_latency(self):
+        return min(self.latencies) if self.latencies else None
+
+    def _blit_centered(self, surface, text, size, color, y):
+        rendered = render_text(text, size, color)
+        surface.blit(rendered, (defaults.WIDTH // 2 - rendered.get_width() // 2, y))
+
+    def draw(self, surface, game_height):
+        surface.fill(self.config.background_color, (0, 0, defaults.WIDTH, game_height))
+        center_y = game_height // 2
+        light = layout.fonts.light_color
+
+        if self.state == self.CALIBRATING:
+            self._blit_centered(surface, "Relax...", self.config.big_font_size, light, center_y - 40)
+            self._blit_centered(surface, "Measuring resting level", layout.fonts.normal_size, light, center_y + 40)
+        elif self.state == self.WAITING:
+            self._blit_centered(surface, "Get ready", self.config.big_font_size, light, center_y - 40)
+        elif self.state == self.GO:
+            pygame.draw.circle(
+                surface, self.config.cue_color, (defaults.WIDTH // 2, center_y), self.config.cue_radius
+            )
+            self._blit_centered(surface, "GO!", self.config.big_font_size, light, center_y - 30)
+        elif self.state == self.RESULT:
+            self._blit_centered(surface, self.message, self.config.big_font_size, light, center_y - 40)
+        elif self.state == self.DONE:
+            self._blit_centered(
+                surface, f"Mean: {self.mean_latency * 1000:.1f} ms", self.config.big_font_size, light, center_y - 60
+            )
+            self._blit_centered(
+                surface, f"Best: {self.best_latency * 1000:.1f} ms", layout.fonts.normal_size, light, center_y + 20
+            )
+            self._blit_centered(surface, "R: play again", layout.fonts.normal_size, light, center_y + 60)
+
+        trial = min(len(self.latencies) + 1, self.config.trials)
+        if self.state != self.DONE:
+            self._blit_centered(
+                surface, f"Trial {trial}/{self.config.trials}", layout.fonts.normal_size, light, layout.timer_y
+            )
@@ -0,0 +1,336 @@
+import math
+
+import numpy as np
+
+# Grid cells around a point's own cell that can hold a point closer than the
+# disc radius: a 5x5 block without its corners
+_NEIGHBORS = [(dy, dx) for dy in range(-2, 3) for dx in range(-2, 3) if abs(dy) + abs(dx) < 4]
+
+
+# Scenery sorted by world position, so drawing only touches what is on screen
+class SceneryIndex:
+    """Sprites at world positions, stored as sorted x / y / sprite-id columns.
+
+    y is the world position a sprite sits at (the same units as
+    GameWorld.position). A sprite is drawn at screen row position - y, so the
+    ones on screen are a contiguous run of the sorted y column, found by
+    bisection.
+    """
+
+    def __init__(self, xs, ys, sprite_ids, sprites):
+        order = np.argsort(ys, kind="stable")
+        self.xs = np.asarray(xs, dtype=np.int32)[order]
+        self.ys = np.asarray(ys, dtype=np.int64)[order]
+        self.sprite_ids = np.asarray(sprite_ids, dtype=np.int16)[order]
+        self.sprites = list(sprites)
+        self.max_height = max((sprite.get_height() for sprite in self.sprites), default=0)
+
+    def __len__(self):
+        return len(self.ys)
+
+    def visible(self, position, view_height):
+        """Index range of sprites at least partly inside screen rows [0, view_height)"""
+        # On screen when -height < position - y < view_height
+        start = int(np.searchsorted(self.ys, position - view_height, side="right"))
+        stop = int(np.searchsorted(self.ys, position + self.max_height, side="left"))
+        return start, stop
+
+    def draw(self, surface, position, view_height):
+        """Blit the visible sprites; returns how many were drawn"""
+        start, stop = self.visible(position, view_height)
+        sprites = self.sprites
+        screen_ys = (position - self.ys[start:stop]).tolist()
+        surface.blits(
+            [
+                (sprites[sprite_id], (x, screen_y))
+                for x, screen_y, sprite_id in zip(
+                    self.xs[start:stop].tolist(), screen_ys, self.sprite_ids[start:stop].tolist()
+                )
+                if screen_y > -sprites[sprite_id].get_height()
+            ],
+            False,
+        )
+        return stop - start
+
+
+class _DiscGrid:
+    """Points in a rectangle, no two closer than radius, hashed on a uniform grid.
+
+    Cells are radius/sqrt(2) wide, so each holds at most one point and a
+    candidate is checked against the 21 cells around its own, not against
+    every point.
+    """
+
+    def __init__(self, x_range, y_range, radius):
+        self.x0, self.x1 = x_range
+        self.y0, self.y1 = y_range
+        self.radius = radius
+        self.cell = radius / math.sqrt(2)
+        self.cols = max(1, math.ceil((self.x1 - self.x0) / self.cell))
+        self.rows = max(1, math.ceil((self.y1 - self.y0) / self.cell))
+        # Point id per cell, flattened, with two cells of padding on every side so
+        # neighbor lookups never go out of bounds
+        self.stride = self.cols + 4
+        self.grid = np.full((self.rows + 4) * self.stride, -1, dtype=np.int64)
+        self.neighbors = np.array([dy * self.stride + dx for dy, dx in _NEIGHBORS])
+        # Empty cells hold -1, which picks a sentinel point infinitely far away
+        self.xs = np.full(self.rows * self.cols + 1, np.inf)
+        self.ys = np.full(self.rows * self.cols + 1, np.inf)
+        self.count = 0
+
+    def _cells(self, xs, ys):
+        # Flat grid index including the padding, for points inside the
+        # rectangle; its far edges belong to the last cells
+        col = np.minimum(((xs - self.x0) / self.cell).astype(np.int64), self.cols - 1)
+        row = np.minimum(((ys - self.y0) / self.cell).astype(np.int64), self.rows - 1)
+        return (row + 2) * self.stride + col + 2
+
+    def insert(self, xs, ys):
+        """Add points that free() accepted and that are radius apart; returns their ids"""
+        ids = np.arange(self.count, self.count + len(xs))
+        self.xs[ids] = xs
+        self.ys[ids] = ys
+        self.grid[self._cells(xs, ys)] = ids
+        self.count += len(ids)
+        return ids
+
+    def free(self, xs, ys):
+        """Mask of candidates inside the rectangle and at least radius from every point"""
+        ok = (xs >= self.x0) & (xs <= self.x1) & (ys >= self.y0) & (ys <= self.y1)
+        inside_xs, inside_ys = xs[ok], ys[ok]
+        near = self.grid[self._cells(inside_xs, inside_ys)[:, None] + self.neighbors]
+        distances = (self.xs[near] - inside_xs[:, None]) ** 2 + (self.ys[near] - inside_ys[:, None]) ** 2
+        ok[ok] = distances.min(axis=1) >= self.radius**2
+        return ok
+
+    def points(self):
+        return self.xs[: self.count], self.ys[: self.count]
+
+
+def _thin(xs, ys, radius):
+    """Candidates sorted by y, without any within radius of an earlier one"""
+    order = np.argsort(ys)
+    xs, ys = xs[order], ys[order]
+    keep = np.ones(len(xs), dtype=bool)
+    # Only pairs less than radius apart in y can clash
+    shift = 1
+    while shift < len(ys) and (ys[shift:] - ys[:-shift] < radius).any():
+        clash = (xs[shift:] - xs[:-shift]) ** 2 + (ys[shift:] - ys[:-shift]) ** 2
+        keep[shift:] &= clash >= radius**2
+        shift += 1
+    return xs[keep], ys[keep]
+
+
+def poisson_disc(rng, x_range, y_range, radius, k=30, seed_spacing=2):
+    """Bridson's Poisson-disc sampling of a rectangle.
+
+    Returns (xs, ys) of points no two closer than radius, spread until k
+    tries around each point find no room for another. All active points
+    draw candidates at once, and seeds every seed_spacing radii along y keep
+    the active front wide on long rectangles, so the number of rounds does
+    not grow with length.
+    """
+    grid = _DiscGrid(x_range, y_range, radius)
+    y0, y1 = y_range
+
+    # Seeds at least one radius apart along y
+    spacing = seed_spacing * radius
+    starts = y0 + spacing * np.arange(max(1, math.ceil((y1 - y0) / spacing)))
+    seed_ys = np.minimum(starts + rng.uniform(0, spacing - radius, len(starts)), y1)
+    active = grid.insert(rng.uniform(*x_range, len(starts)), seed_ys)
+
+    while len(active):
+        # Each active point proposes its first free candidate, uniform over the
+        # annulus [radius, 2 radius). A few tries usually find one; only points
+        # that found none draw the rest of their k.
+        new_xs = np.empty(len(active))
+        new_ys = np.empty(len(active))
+        found = np.zeros(len(active), dtype=bool)
+        pending = np.arange(len(active))
+        for tries in (min(4, k), k - min(4, k)):
+            if tries == 0 or len(pending) == 0:
+                continue
+            angles = rng.uniform(0, 2 * np.pi, (len(pending), tries))
+            distances = radius * np.sqrt(rng.uniform(1, 4, (len(pending), tries)))
+            cand_xs = grid.xs[active[pending], None] + distances * np.cos(angles)
+            cand_ys = grid.ys[active[pending], None] + distances * np.sin(angles)
+            ok = grid.free(cand_xs, cand_ys)
+            hit = ok.any(axis=1)
+            first = ok.argmax(axis=1)[hit]
+            new_xs[pending[hit]] = cand_xs[hit, first]
+            new_ys[pending[hit]] = cand_ys[hit, first]
+            found[pending[hit]] = True
+            pending = pending[~hit]
+
+        # Points with no free candidate are done; proposals from neighboring
+        # points can clash with each other
+        active = active[found]
+        new_xs, new_ys = _thin(new_xs[found], new_ys[found], radius)
+        active = np.concatenate((active, grid.insert(new_xs, new_ys)))
+
+    return grid.points()
+
+
+def _throw(rng, grid, x_range, y_range, count, max_rounds):
+    # Add up to count random points in the given ranges to grid
+    added_xs, added_ys = [], []
+    missing = count
+    for _ in range(max_rounds):
+        if missing <= 0:
+            break
+        cand_xs = rng.uniform(*x_range, 2 * missing)
+        cand_ys = rng.uniform(*y_range, 2 * missing)
+        ok = grid.free(cand_xs, cand_ys)
+        new_xs, new_ys = _thin(cand_xs[ok], cand_ys[ok], grid.radius)
+        # Thinning sorts by y: take a random subset, not the lowest
+        chosen = rng.permutation(len(new_xs))[:missing]
+        grid.insert(new_xs[chosen], new_ys[chosen])
+        added_xs.append(new_xs[chosen])
+        added_ys.append(new_ys[chosen])
+        missing -= len(chosen)
+    return np.concatenate(added_xs or [[]]), np.concatenate(added_ys or [[]])
+
+
+def dart_throw(rng, x_range, y_range, radius, count, max_rounds=16):
+    """Up to count points uniform over a rectangle, no two closer than radius.
+
+    Random sequential addition: each round throws twice as many uniform
+    candidates as points are missing and keeps the free ones. Much cheaper
+    than a full Poisson-disc fill while the rectangle is far from full;
+    returns fewer than count if max_rounds do not find room for them all.
+    """
+    grid = _DiscGrid(x_range, y_range, radius)
+    _throw(rng, grid, x_range, y_range, count, max_rounds)
+    return grid.points()
+
+
+def fill_gap(rng, strips, y_range, radius, xs, ys, count=None, max_rounds=16):
+    """New points in y_range of the strips, radius from each other and from (xs, ys).
+
+    Throws count points, split between the strips by width, or with count
+    None as many as max_rounds of darts find room for.
+    """
+    y0, y1 = y_range
+    counts = [None] * len(strips)
+    if count is not None:
+        widths = np.array([high - low for low, high in strips], dtype=float)
+        counts = rng.multinomial(count, widths / widths.sum())
+    added = []
+    for (x0, x1), strip_count in zip(strips, counts):
+        # Existing points within radius of the gap constrain it
+        grid = _DiscGrid((x0 - radius, x1 + radius), (y0 - radius, y1 + radius), radius)
+        near = (xs >= grid.x0) & (xs <= grid.x1) & (ys >= grid.y0) & (ys <= grid.y1)
+        grid.insert(xs[near], ys[near])
+        if strip_count is None:
+            strip_count = grid.rows * grid.cols
+        added.append(_throw(rng, grid, (x0, x1), y_range, strip_count, max_rounds))
+    return np.concatenate([xs for xs, _ in added]), np.concatenate([ys for _, ys in added])
+
+
+def tree_distance(sprites, spacing=4 / 3):
+    """Closest two trees may be, center to center: spacing times the largest sprite side"""
+    return spacing * max(max(sprite.get_size()) for sprite in sprites)
+
+
+def scatter_points(rng, strips, y_range, radius, count=None):
+    """Centers (xs, ys) in vertical strips, at least radius apart.
+
+    count points are thrown at random, split between the strips by width.
+    If the strips are too full for that to succeed, or count is None, the
+    strips are filled with Poisson-disc sampling and count points picked
+    from the fill. A shortfall is printed, never silently dropped.
+    """
+    if count is not None:
+        widths = np.array([high - low for low, high in strips], dtype=float)
+        counts = rng.multinomial(count, widths / widths.sum())
+        thrown = [dart_throw(rng, strip, y_range, radius, n) for strip, n in zip(strips, counts)]
+        if sum(len(ys) for _, ys in thrown) == count:
+            return np.concatenate([xs for xs, _ in thrown]), np.concatenate([ys for _, ys in thrown])
+
+    filled = [poisson_disc(rng, strip, y_range, radius) for strip in strips]
+    xs = np.concatenate([xs for xs, _ in filled])
+    ys = np.concatenate([ys for _, ys in filled])
+    if count is not None:
+        if count > len(ys):
+            print(f"Only {len(ys)} of {count} trees fit at this spacing")
+        else:
+            chosen = rng.choice(len(ys), count, replace=False)
+            xs, ys = xs[chosen], ys[chosen]
+    return xs, ys
+
+
+def far_from(xs, ys, other_xs, other_ys, radius):
+    """Mask of points at least radius from every other point, compared pairwise"""
+    distances = (xs[:, None] - other_xs) ** 2 + (ys[:, None] - other_ys) ** 2
+    return (distances >= radius**2).all(axis=1)
+
+
+def place_trees(rng, centers, ys, sprites):
+    """SceneryIndex of randomly chosen sprites centered on the given points"""
+    sprite_ids = rng.integers(0, len(sprites), len(ys))
+    half_widths = np.array([sprite.get_width() // 2 for sprite in sprites])
+    xs = centers.astype(np.int64) - half_widths[sprite_ids]
+    return SceneryIndex(xs, ys.astype(np.int64), sprite_ids, sprites)
+
+
+def scatter_trees(seed, strips, y_range, sprites, count=None, radius=None):
+    """SceneryIndex of non-overlapping trees in vertical strips.
+
+    strips are (min, max) ranges for tree centers. Trees are at least radius
+    apart, tree_distance(sprites) by default; see scatter_points for how
+    count is met. The same seed always gives the same trees.
+    """
+    rng = np.random.default_rng(seed)
+    radius = radius if radius is not None else tree_distance(sprites)
+    centers, ys = scatter_points(rng, strips, y_range, radius, count)
+    return place_trees(rng, centers, ys, sprites)
+
+
+class SceneryChunks:
+    """Scenery of an endless track, generated a chunk at a time around the view.
+
+    The track is cut into chunk_length slices of world position. generate(index)
+    returns the SceneryIndex for [index * chunk_length, (index + 1) * chunk_length).
+    update() calls it for chunks in the view and for the next `ahead` chunks,
+    and drops chunks once they are behind the view, so memory and per-frame
+    work do not depend on how far the player has driven. Call update() from
+    the game update, not the draw: a chunk is then generated well before it
+    is drawn. generate must be deterministic for the track to look the same
+    when driven again.
+    """
+
+    def __init__(self, chunk_length, generate, max_height, ahead=1):
+        self.chunk_length = chunk_length
+        self.generate = generate
+        self.max_height = max_height
+        self.ahead = ahead
+        self.chunks = {}
+        self.generated = 0
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+    def _span(self, position, view_height):
+        # Chunks holding world positions that can be on screen, from the bottom up
+        first = max(0, int((position - view_height) // self.chunk_length))
+        last = max(0, int((position + self.max_height) // self.chunk_length))
+        return first, last
+
+    def update(self, position, view_height):
+        """Generate the chunks in and just ahead of the view, drop those behind it"""
+        first, last = self._span(position, view_height)
+        for index in [index for index in self.chunks if index < first]:
+            del self.chunks[index]
+        for index in range(first, last + self.ahead + 1):
+            if index not in self.chunks:
+                self.chunks[index] = self.generate(index)
+                self.generated += 1
+
+    def draw(self, surface, position, view_height):
+        """Blit the visible sprites of the chunks update() generated; returns how many were drawn"""
+        first, last = self._span(position, view_height)
+        return sum(
+            self.chunks[index].draw(surface, position, view_height)
+            for index in range(first, last + 1)
+            if index in self.chunks
+        )
@@ -1,11 +1,13 @@
 import json
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from dataclasses import dataclass, field, asdict
 import pygame
 import sys
 import time
 from byb_cars import defaults
+from byb_cars.calibration import PlayerCalibration
+from byb_cars.elements.fonts import render_text
 from byb_cars.elements.layout_config import layout
 
 @dataclass
@@ -18,6 +20,8 @@ class Score:
 @dataclass
 class ScoreConfig:
     scores_file: str = "scores.json"
+    # Per-player calibrations, kept next to the scores
+    calibrations_file: str = "calibrations.json"
     max_displayed_scores: int = 23
 
     # Text input
@@ -34,6 +38,8 @@ class ScoreManager:
         # Store scores in the project root directory
         self.scores_path = Path(__file__).parent.parent.parent / scores_file
         self.scores = self.load_scores()
+        self.calibrations_path = self.scores_path.with_name(self.score_config.calibrations_file)
+        self.calibrations = self.load_calibrations()
         
     def load_scores(self) -> List[Score]:
         """Load scores from the scores file."""
@@ -75,6 +81,36 @@ class ScoreManager:
         """Get all scores sorted from best to worst."""
         return sorted(self.scores, key=lambda score: score.time)
 
+    def load_calibrations(self) -> Dict[str, PlayerCalibration]:
+        """Load per-player calibrations, keyed by username."""
+        try:
+            if self.calibrations_path.exists():
+                with open(self.calibrations_path, 'r') as f:
+                    data = json.load(f)
+                    return {entry["username"]: PlayerCalibration(**entry) for entry in data}
+            return {}
+        except Exception as e:
+            print(f"Error loading calibrations: {e}")
+            return {}
+
+    def save_calibrations(self):
+        """Save per-player calibrations to their file."""
+        try:
+            with open(self.calibrations_path, 'w') as f:
+                json.dump([asdict(c) for c in self.calibrations.values()], f, indent=2)
+        except Exception as e:
+            print(f"Error saving calibrations: {e}")
+
+    def get_calibration(self, username: str) -> Optional[PlayerCalibration]:
+        """Get the stored calibration for a user, if any."""
+        return self.calibrations.get(username)
+
+    def set_calibration(self, calibration: PlayerCalibration):
+        """Store a user's calibration, replacing the previous one."""
+        self.calibrations[calibration.username] = calibration
+        self.save_calibrations()
+        print(f"Saved calibration for {calibration.username}")
+
 
 def get_username(screen, score_config: ScoreConfig = None) -> str:
     """Show a text input dialog to get the username."""
@@ -91,9 +127,7 @@ def get_username(screen, score_config: ScoreConfig = None) -> str:
     color = color_inactive
     active = True
     text = ""
-    font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.subtitle_size)
-    prompt_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.subtitle_size)
-    prompt = prompt_font.render("Enter your name:", True, layout.fonts.light_color)
+    prompt = render_text("Enter your name:", layout.fonts.subtitle_size, layout.fonts.light_color)
     
     # Create a semi-transparent overlay
     overlay = pygame.Surface((defaults.WIDTH, defaults.HEIGHT))
@@ -135,7 +169,7 @@ def get_username(screen, score_config: ScoreConfig = None) -> str:
         pygame.draw.rect(screen, color, input_box, border_radius=5)
         
         # Render the text
-        txt_surface = font.render(text, True, layout.fonts.normal_color)
+        txt_surface = render_text(text, layout.fonts.subtitle_size, layout.fonts.normal_color)
         # Ensure text is centered in the input box
         text_rect = txt_surface.get_rect(center=input_box.center)
         screen.blit(txt_surface, text_rect)
@@ -154,11 +188,8 @@ def show_high_scores(screen, score_manager: ScoreManager):
     overlay.fill((0, 0, 0))
     overlay.set_alpha(180)
     
-    title_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.title_size)
-    score_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.normal_size)
-    
     # Title
-    title = title_font.render("HIGH SCORES", True, layout.fonts.light_color)
+    title = render_text("HIGH SCORES", layout.fonts.title_size, layout.fonts.light_color)
     title_rect = title.get_rect(centerx=defaults.WIDTH // 2, top=layout.highscore_title_top)
     
     # Get scores to display
@@ -185,13 +216,13 @@ def show_high_scores(screen, score_manager: ScoreManager):
             y_pos = title_rect.bottom + 50
             for i, score in enumerate(display_scores):
                 rank_text = f"{i+1}."
-                rank_surf = score_font.render(rank_text, True, layout.fonts.light_color)
+                rank_surf = render_text(rank_text, layout.fonts.normal_size, layout.fonts.light_color)
                 
                 name_text = f"{score.username}"
-                name_surf = score_font.render(name_text, True, layout.fonts.light_color)
+                name_surf = render_text(name_text, layout.fonts.normal_size, layout.fonts.light_color)
                 
                 time_text = f"{score.time:.2f}s"
-                time_surf = score_font.render(time_text, True, layout.fonts.light_color)
+                time_surf = render_text(time_text, layout.fonts.normal_size, layout.fonts.light_color)
                 
                 # Position the text components
                 screen.blit(rank_surf, (defaults.WIDTH // 4 - 20, y_pos))
@@ -200,12 +231,12 @@ def show_high_scores(screen, score_manager: ScoreManager):
                 
                 y_pos += 40
         else:
-            no_scores = score_font.render("No scores yet!", True, layout.fonts.light_color)
+            no_scores = render_text("No scores yet!", layout.fonts.normal_size, layout.fonts.light_color)
             no_scores_rect = no_scores.get_rect(center=(defaults.WIDTH // 2, defaults.HEIGHT // 2))
             screen.blit(no_scores, no_scores_rect)
         
         # Draw instructions
-        instruction = score_font.render("Press any key to return", True, layout.fonts.normal_color)
+        instruction = render_text("Press any key to return", layout.fonts.normal_size, layout.fonts.normal_color)
         instruction_rect = instruction.get_rect(centerx=defaults.WIDTH // 2, bottom=defaults.HEIGHT - 50)
         screen.blit(instruction, instruction_rect)
         
@@ -0,0 +1,125 @@
+import pygame
+import numpy as np
+from byb_cars import defaults
+from byb_cars.elements.layout_config import layout
+from byb_cars.elements.fonts import render_text
+from byb_cars.spectrum import EMGSpectrum
+
+
+# Scrolling spectrogram, drawn in place of the signal plot
+class SpectrogramPlot:
+    # Colours span this many dB below the recent peak
+    DYNAMIC_RANGE_DB = 50.0
+    # How fast the peak reference falls when the signal gets quieter
+    PEAK_DECAY_DB = 0.05  # per spectral frame
+    # Dark blue through cyan and yellow to white
+    COLORMAP = ((0.0, (10, 10, 40)), (0.35, (0, 90, 200)), (0.6, (0, 220, 220)),
+                (0.85, (250, 230, 40)), (1.0, (255, 255, 255)))
+    MEDIAN_COLOR = (255, 0, 0)
+
+    def __init__(self, width, height, sample_rate, num_channels=1, config=None):
+        self.width = width
+        self.height = height
+        self.spectrum = EMGSpectrum(sample_rate, num_channels, config)
+        self.surface = pygame.Surface((width, height))
+
+        # Plot boundaries
+        self.plot_width = width - 2 * layout.plot_margin
+        self.plot_height = height - 2 * layout.plot_margin
+
+        # One pixel column per spectral frame of channel 0; row 0 is the top
+        # of the band, so each row shows the bin under it
+        self.image = pygame.Surface((self.plot_width, self.plot_height), 0, 32)
+        self.image.fill(self.COLORMAP[0][1])
+        band = self.spectrum.band
+        n_bins = band.stop - band.start
+        self._row_bins = band.stop - 1 - (np.arange(self.plot_height) * n_bins) // self.plot_height
+        positions, colors = zip(*self.COLORMAP)
+        levels = np.linspace(0, 1, 256)
+        rgb = np.stack([np.interp(levels, positions, channel) for channel in zip(*colors)], axis=1)
+        self._palette = np.array([self.image.map_rgb(tuple(c)) for c in rgb.astype(int)])
+        self._median_pixel = self.image.map_rgb(self.MEDIAN_COLOR)
+        self.reference_db = None
+
+        self.background = self._render_background()
+        self.labels = self._render_labels()
+
+    def update(self, samples):
+        """Transform the samples that arrived this tick, shape (n_samples, num_channels)"""
+        power = self.spectrum.process(samples)
+        if len(power) == 0:
+            return
+        power = power[-self.plot_width :, 0]
+        medians, _ = self.spectrum.band_frequencies(power)
+        db = 10 * np.log10(power[:, self._row_bins] + 1e-20)
+
+        # Follow the loudest recent frame, falling back slowly after it
+        peaks = db.max(axis=1)
+        for peak in peaks:
+            if self.reference_db is None or peak > self.reference_db:
+                self.reference_db = peak
+            else:
+                self.reference_db -= self.PEAK_DECAY_DB
+        floor = self.reference_db - self.DYNAMIC_RANGE_DB
+        levels = np.clip((db - floor) * (255 / self.DYNAMIC_RANGE_DB), 0, 255).astype(np.intp)
+        columns = self._palette[levels]
+
+        # Mark the median frequency of every frame
+        rows = np.searchsorted(-self.spectrum.frequencies[self._row_bins], -medians)
+        marked = np.flatnonzero(~np.isnan(medians))
+        columns[marked, np.minimum(rows[marked], self.plot_height - 1)] = self._median_pixel
+
+        new_columns = len(columns)
+        self.image.scroll(-new_columns, 0)
+        pixels = pygame.surfarray.pixels2d(self.image)
+        pixels[self.plot_width - new_columns :] = columns
+        del pixels  # Unlock the surface
+
+    def _render_background(self):
+        """Fill and border under the image"""
+        background = pygame.Surface((self.width, self.height))
+        background.fill(defaults.PLOT_BG)
+        pygame.draw.rect(
+            background,
+            (0, 0, 0),
+            (layout.plot_margin - 1, layout.plot_margin - 1, self.plot_width + 2, self.plot_height + 2),
+            1,
+        )
+        return background
+
+    def _render_labels(self):
+        """Title and frequency labels, drawn over the image"""
+        labels = []
+        for i in range(1, layout.plot_grid_lines):
+            row = i * self.plot_height // layout.plot_grid_lines
+            frequency = self.spectrum.frequencies[self._row_bins[row]]
+            label = render_text(f"{frequency:.0f}", layout.fonts.small_size, layout.fonts.light_color)
+            labels.append(
+                (label, (layout.plot_margin + 2, layout.plot_margin + row - layout.plot_label_y_offset))
+            )
+        title = render_text("EMG Spectrum (Hz)", layout.fonts.normal_size, layout.fonts.light_color)
+        labels.append(
+            (title, (self.width // 2 - title.get_width() // 2, layout.plot_title_y_offset))
+        )
+        return labels
+
+    def draw(self, surface, x, y):
+        self.surface.blit(self.background, (0, 0))
+        self.surface.blit(self.image, (layout.plot_margin, layout.plot_margin))
+        self.surface.blits(self.labels, False)
+
+        # Median frequency falls as the muscle fatigues
+        median = self.spectrum.median_frequency[0]
+        mean = self.spectrum.mean_frequency[0]
+        if not np.isnan(median):
+            text = render_text(
+                f"Median: {median:.0f} Hz  Mean: {mean:.0f} Hz",
+                layout.fonts.normal_size,
+                layout.fonts.light_color,
+            )
+            self.surface.blit(
+                text,
+                (self.width - text.get_width() - layout.plot_margin, layout.plot_title_y_offset)
+            )
+
+        surface.blit(self.surface, (x, y))
@@ -1,10 +1,19 @@
+import numpy as np
 import pygame
-import random
 import time
 from dataclasses import dataclass
 from byb_cars import defaults
 from byb_cars.elements.handle_assets import get_tree_imgs
+from byb_cars.elements.fonts import render_text
 from byb_cars.elements.layout_config import layout
+from byb_cars.elements.scenery import (
+    SceneryChunks,
+    far_from,
+    fill_gap,
+    place_trees,
+    scatter_points,
+    tree_distance,
+)
 
 
 @dataclass
@@ -20,11 +29,14 @@ class WorldConfig:
     road_width_fraction: float = 1/3  # Road width as a fraction of screen width
     
     # World elements
-    num_trees: int = 30
+    num_trees: int = 30  # Over the race track; None fills the verges as densely as the spacing allows
     tree_min_side_offset: int = 50
     tree_min_road_offset: int = 10
     tree_height: int = 120
     
+    # Scenery is generated in chunks of this much track, just ahead of the car
+    chunk_length: int = 2000
+
     # Road tile configuration
     tile_size: int = 100
     num_tiles: int = 10
@@ -55,8 +67,11 @@ world_config = WorldConfig()
 
 # World manages all game world elements including road, trees, and race lines
 class GameWorld:
-    def __init__(self, game_height=None):
+    def __init__(self, game_height=None, seed=None):
         self.game_height = game_height or layout.game_height
+        # Scenery seed: the same seed gives the same trees, None a new layout every race
+        self.seed = seed
+        self.track_seed = None
 
 
         # Track distance calculation - increased for more stable experience
@@ -73,14 +88,19 @@ class GameWorld:
         self.road_surface = self.create_road()
         self.road_height = self.road_surface.get_height()
 
+        # Grass and road composed once into a strip that scrolls with two blits
+        self.background = self.create_background()
+        self.background_height = self.background.get_height()
+
         # Start and finish line positions - positive = distance from start
         self.start_line_position = 500  # This is a game parameter, not layout
         self.finish_line_position = self.start_line_position + self.track_distance
 
         self.tree_imgs = get_tree_imgs(world_config.tree_height)
 
-        # Create trees - 120 is a game parameter, not layout
-        self.trees = self.generate_trees()
+        # Trees are generated chunk by chunk as the car approaches them
+        self.tree_distance = tree_distance(self.tree_imgs)
+        self.scenery = self.create_scenery()
 
         # Race state
         self.race_started = False
@@ -93,6 +113,7 @@ class GameWorld:
 
         # World position - increases as we move forward through the world
         self.position = 0
+        self.scenery.update(self.position, self.game_height)
 
         # Store the car's screen position for line crossing calculations
         self.car_screen_y = None
@@ -106,6 +127,9 @@ class GameWorld:
             world_config.start_finish_line_height, 
             size=world_config.checkerboard_size
         )
+        self.line_labels = {
+            line_type: self.create_line_label(line_type.upper()) for line_type in ('start', 'finish')
+        }
 
         print(
             f"Track setup: Start at {self.start_line_position}, Finish at {self.finish_line_position}"
@@ -146,64 +170,95 @@ class GameWorld:
             (self.road_width - edge_offset - edge_width, 0, edge_width, surface.get_height()),
         )
 
-        return surface
-
-    def generate_trees(self):
-        trees = []
-        # Create a large enough world to include finish line
-        world_length = self.finish_line_position + 1000
-        
-        # Try to place trees with minimum spacing
-        attempts = 0
-        max_attempts = 100  # Prevent infinite loops
-        
-        for _ in range(world_config.num_trees):
-            # Choose a random tree image
-            img = random.choice(self.tree_imgs)
-            img_width = img.get_width()
-            img_height = img.get_height()
-            
-            # Set minimum distance between trees
-            min_distance = int(4/3 * max(img_width, img_height))
-            
-            valid_position = False
-            attempts = 0
-            
-            while not valid_position and attempts < max_attempts:
-                # Choose which side of the road
-                if random.random() < 0.5:
-                    # Left side
-                    x = random.randint(
-                        world_config.tree_min_side_offset, 
-                        self.road_left - world_config.tree_min_side_offset
-                    )
-                    x -= img_width//2
-                else:
-                    # Right side
-                    x = random.randint(
-                        self.road_right + world_config.tree_min_road_offset, 
-                        defaults.WIDTH - world_config.tree_min_side_offset
-                    )
-                    x -= img_width//2
-                
-                # Distribute trees evenly through world length
-                y = random.randint(0, world_length)
-                
-                # Check distance from all existing trees
-                valid_position = True
-                for tx, ty, _ in trees:
-                    distance = ((x - tx) ** 2 + (y - ty) ** 2) ** 0.5
-                    if distance < min_distance:
-                        valid_position = False
-                        break
-                
-                attempts += 1
-            
-            # If we found a valid position, add the tree
-            if valid_position:
-                trees.append((x, y, img))
+        return surface.convert()
+
+    def create_background(self):
+        # Grass either side of whole road tiles, at least as tall as the game
+        # area, converted to the display format so blits need no conversion
+        tiles = -(-self.game_height // self.road_height)
+        surface = pygame.Surface((defaults.WIDTH, tiles * self.road_height))
+        surface.fill(defaults.GRASS_GREEN)
+        for i in range(tiles):
+            surface.blit(self.road_surface, (self.road_left, i * self.road_height))
+        return surface.convert()
+
+    def create_line_label(self, text):
+        # Start/finish text and its semi-transparent background
+        text = render_text(text, world_config.start_finish_font_size, (255, 255, 255))
+        text_bg = pygame.Surface(
+            (text.get_width() + 2*world_config.text_bg_padding,
+             text.get_height() + 2*world_config.text_bg_padding)
+        ).convert()
+        text_bg.fill((0, 0, 0))
+        text_bg.set_alpha(world_config.text_bg_alpha)  # Semi-transparent
+        return text, text_bg
+
+    def create_scenery(self):
+        # Chunks are seeded from (track seed, chunk index), so a track can be
+        # regenerated piece by piece in any order
+        self.track_seed = self.seed if self.seed is not None else int(np.random.SeedSequence().entropy)
+        self.chunk_points = {}
+        return SceneryChunks(
+            world_config.chunk_length,
+            self.generate_trees,
+            max(img.get_height() for img in self.tree_imgs),
+        )
 
-        return trees
+    def tree_strips(self):
+        # Ranges of tree centers on the verges either side of the road
+        return [
+            (world_config.tree_min_side_offset, self.road_left - world_config.tree_min_side_offset),
+            (self.road_right + world_config.tree_min_road_offset, defaults.WIDTH - world_config.tree_min_side_offset),
+        ]
+
+    def trees_per_chunk(self):
+        if world_config.num_trees is None:
+            return None
+        # Spread num_trees over the race track, from the start to past the finish line
+        return round(world_config.num_trees * world_config.chunk_length / (self.finish_line_position + 1000))
+
+    def tree_points(self, chunk):
+        # Tree centers scattered over the whole chunk, before the trees that
+        # crowd the next chunk are dropped; kept for the chunk after this one
+        points = self.chunk_points.get(chunk)
+        if points is None:
+            start = chunk * world_config.chunk_length
+            points = scatter_points(
+                np.random.default_rng([self.track_seed, chunk]),
+                self.tree_strips(),
+                (start, start + world_config.chunk_length),
+                self.tree_distance,
+                self.trees_per_chunk(),
+            )
+        return points
+
+    def generate_trees(self, chunk):
+        # Trees of one chunk, without those too close to the next chunk's
+        # trees. Both chunks' points come from their own seeds, so the result
+        # does not depend on which chunks were generated before.
+        xs, ys = self.tree_points(chunk)
+        next_xs, next_ys = self.tree_points(chunk + 1)
+        self.chunk_points = {chunk + 1: (next_xs, next_ys)}
+        keep = far_from(xs, ys, next_xs, next_ys, self.tree_distance)
+
+        # Put back as many trees as were dropped (or, filling densely, as many
+        # as fit) in the chunk's last tree_distance, so the seam has no gap
+        count = self.trees_per_chunk()
+        dropped = None if count is None else int((~keep).sum())
+        end = (chunk + 1) * world_config.chunk_length
+        gap_xs, gap_ys = fill_gap(
+            np.random.default_rng([self.track_seed, chunk, 1]),
+            self.tree_strips(),
+            (end - self.tree_distance, end),
+            self.tree_distance,
+            np.concatenate((xs[keep], next_xs)),
+            np.concatenate((ys[keep], next_ys)),
+            dropped,
+        )
+        rng = np.random.default_rng([self.track_seed, chunk, 2])
+        return place_trees(
+            rng, np.concatenate((xs[keep], gap_xs)), np.concatenate((ys[keep], gap_ys)), self.tree_imgs
+        )
 
     def reset(self):
         self.race_started = False
@@ -213,11 +268,16 @@ class GameWorld:
         self.current_time = 0
         self.passed_start_line = False
         self.position = 0
+        self.scenery = self.create_scenery()
+        self.scenery.update(self.position, self.game_height)
 
     def update(self, speed):
         # Update world position
         self.position += speed
 
+        # Generate scenery coming into view here, so draw() only draws
+        self.scenery.update(self.position, self.game_height)
+
         # We need car_screen_y to be set for proper line crossing detection
         # (This will be set when draw() is called)
         if self.car_screen_y is None:
@@ -261,30 +321,8 @@ class GameWorld:
 
         game_area_height = self.game_height
 
-        # Fill entire game area with sky blue (to avoid any previous draws)
-        surface.fill(defaults.SKY_BLUE, (0, 0, defaults.WIDTH, game_area_height))
-
-        # Draw grass background
-        pygame.draw.rect(
-            surface, defaults.GRASS_GREEN, (0, 0, self.road_left, game_area_height)
-        )
-        pygame.draw.rect(
-            surface,
-            defaults.GRASS_GREEN,
-            (self.road_right, 0, defaults.WIDTH - self.road_right, game_area_height),
-        )
-
-        # Draw road - moving downward with improved tiling
-        road_offset = int(self.position % self.road_height)
-
-        # Draw one additional tile above the viewport to avoid gaps
-        y_start = road_offset - self.road_height
-
-        # Draw multiple copies of the road to fill the screen
-        current_y = y_start
-        while current_y < game_area_height:
-            surface.blit(self.road_surface, (self.road_left, current_y))
-            current_y += self.road_height
+        # Draw grass and road - moving downward, wrapping around the background strip
+        self.draw_background(surface)
 
         # Draw start and finish lines as checkerboards
         for line_type in ['start', 'finish']:
@@ -298,18 +336,9 @@ class GameWorld:
                     (self.road_left, y)
                 )
 
-                # Add text
-                font = pygame.font.SysFont(layout.fonts.default_font, world_config.start_finish_font_size)
-                text = font.render(line_type.upper(), True, (255, 255, 255))
-                
-                # Add a background to make text more visible
-                text_bg = pygame.Surface(
-                    (text.get_width() + 2*world_config.text_bg_padding,
-                     text.get_height() + 2*world_config.text_bg_padding)
-                )
-                text_bg.fill((0, 0, 0))
-                text_bg.set_alpha(world_config.text_bg_alpha)  # Semi-transparent
-                
+                # Add text, over a background to make it more visible
+                text, text_bg = self.line_labels[line_type]
+
                 # Calculate x position for centered text
                 text_x = self.road_left + self.road_width / 2 - text.get_width() / 2
                 text_y = y - world_config.text_y_offset
@@ -322,19 +351,23 @@ class GameWorld:
                 )
                 surface.blit(text, (text_x, text_y))
 
-    # Draw trees - all trees move downward as position increases
-        for x, pos, img in self.trees:
-            # Tree appears on screen based on its position relative to world position
-            screen_y = self.position - pos
+        # Draw trees - all trees move downward as position increases
+        self.scenery.draw(surface, self.position, game_area_height)
 
-            # Only draw if on screen
-            if -img.get_height() < screen_y < game_area_height:
-                surface.blit(img, (x, screen_y))
+    def draw_background(self, surface):
+        # The strip's bottom rows fill the top of the screen, then the strip
+        # starts again from its top: at most two blits
+        offset = int(self.position % self.background_height)
+        surface.blit(
+            self.background,
+            (0, 0),
+            (0, self.background_height - offset, defaults.WIDTH, min(offset, self.game_height)),
+        )
+        if offset < self.game_height:
+            surface.blit(self.background, (0, offset), (0, 0, defaults.WIDTH, self.game_height - offset))
 
     def draw_timer(self, surface):
         # Draw race information at the top of the screen
-        font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.title_size)
-
         # Draw current time or final time
         if self.race_finished:
             finish_time = self.finish_time - self.start_time
@@ -350,7 +383,7 @@ class GameWorld:
             time_text = "Ready to start"
             time_color = layout.fonts.info_color
 
-        time_surface = font.render(time_text, True, time_color)
+        time_surface = render_text(time_text, layout.fonts.title_size, time_color)
         surface.blit(
             time_surface, (defaults.WIDTH // 2 - time_surface.get_width() // 2, layout.timer_y)
         )
@@ -358,7 +391,7 @@ class GameWorld:
         # Draw best time if available
         if self.best_time is not None:
             best_text = f"Best: {self.best_time:.2f}s"
-            best_surface = font.render(best_text, True, layout.fonts.normal_color)
+            best_surface = render_text(best_text, layout.fonts.title_size, layout.fonts.normal_color)
             surface.blit(
                 best_surface, (defaults.WIDTH - best_surface.get_width() - layout.best_time_x_padding, layout.best_time_y)
             )
@@ -379,8 +412,7 @@ class GameWorld:
             indicator_radius,
         )
 
-        status_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.small_size)
-        start_text = status_font.render("Start", True, layout.fonts.normal_color)
+        start_text = render_text("Start", layout.fonts.small_size, layout.fonts.normal_color)
         surface.blit(
             start_text,
             (defaults.WIDTH // 2 - x_offset + indicator_radius + padding, 
@@ -395,7 +427,7 @@ class GameWorld:
             indicator_radius,
         )
 
-        finish_text = status_font.render("Finish", True, layout.fonts.normal_color)
+        finish_text = render_text("Finish", layout.fonts.small_size, layout.fonts.normal_color)
         surface.blit(
             finish_text,
             (defaults.WIDTH // 2 + x_offset + indicator_radius + padding, 
@@ -426,4 +458,4 @@ class GameWorld:
                         surface, colors[1], (col * size, row * size, size, size)
                     )
 
-        return surface
+        return surface.convert()
@@ -0,0 +1,60 @@
+"""One read of the input per game tick, shared by everything that needs it.
+
+InputHandler.update() pulls the samples that arrived since the last tick
+once, wraps them in an InputSnapshot and publishes it on an InputBus. The car,
+the plot, the recorder and the telemetry all see the same snapshot, so they
+agree on the value for the tick and the source is read once however many
+consumers there are.
+"""
+from dataclasses import dataclass
+from typing import Callable, List
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class InputSnapshot:
+    tick: int  # Game ticks since the bus was created
+    time: float  # time.perf_counter() when the input was pulled
+    samples: np.ndarray  # (n_samples, num_channels) that arrived this tick, read-only
+    timestamps: np.ndarray  # One time.perf_counter() timestamp per sample, read-only
+    value: float  # Latest raw value of channel 0
+    envelope: float  # Latest EMG envelope of channel 0
+
+    @property
+    def latency(self):
+        """Age of the newest sample when the tick started, in seconds"""
+        if len(self.timestamps) == 0:
+            return float("nan")
+        return self.time - float(self.timestamps[-1])
+
+
+class InputBus:
+    """Fans each tick's InputSnapshot out to subscribers, in subscription order"""
+
+    def __init__(self):
+        self.subscribers: List[Callable[[InputSnapshot], None]] = []
+        self.tick = 0
+        self.latest = None
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) on every tick"""
+        self.subscribers = self.subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        self.subscribers = [c for c in self.subscribers if c is not callback]
+
+    def publish(self, time, samples, timestamps, value, envelope):
+        """Freeze the tick's input into a snapshot and hand it to every subscriber.
+
+        samples and timestamps are shared, not copied: they are flagged
+        read-only so that no subscriber can change what the others see.
+        """
+        samples.flags.writeable = False
+        timestamps.flags.writeable = False
+        snapshot = InputSnapshot(self.tick, time, samples, timestamps, value, envelope)
+        self.tick += 1
+        self.latest = snapshot
+        for callback in self.subscribers:
+            callback(snapshot)
+        return snapshot
@@ -1,26 +1,108 @@
+from concurrent.futures import Future, TimeoutError
 from typing import Optional
+import multiprocessing
 import numpy as np
 import threading
 import serial
 import time
 
+from byb_cars.decoder import (
+    END_ESCAPE_SEQ,
+    FIRMWARE_SAMPLE_RATE,
+    START_ESCAPE_SEQ,
+    MessageParser,
+    V2Decoder,
+    decode_frames,
+    normalize,
+    v2_batch_frames,
+    v2_batch_size,
+)
+from byb_cars.demo_source import DemoConfig, DemoEMGSource
+from byb_cars.dsp import EMGEnvelope, EnvelopeConfig
+from byb_cars.input_bus import InputBus
+from byb_cars.recording import ReplaySource, SessionRecorder
+from byb_cars.ring_buffer import SampleRingBuffer, SharedSampleRingBuffer
+from byb_cars.telemetry import HealthCounters, SharedHealthCounters
+from byb_cars.timing import SampleClock
+
+
+READ_MODES = ("blocking", "poll")
+PROTOCOLS = (1, 2)
+# Seconds between recorder reads, well inside the 6.5 s the sample ring holds
+RECORD_INTERVAL = 0.1
 
-class ArduinoEMGHandler:
-    """Handler for Arduino EMG shield serial communication"""
 
-    def __init__(self, port="/dev/ttyACM0", baud_rate=230400):
+class ArduinoEMGHandler:
+    """Handler for Arduino EMG shield serial communication
+
+    read_mode "blocking" sleeps in the serial driver until bytes arrive, then
+    waits latency_target seconds so that one wakeup picks up a whole batch:
+    higher values mean fewer syscalls and wakeups, lower values less latency.
+    read_mode "poll" checks the port every millisecond.
+
+    connect() waits up to board_timeout seconds for the board to answer the
+    board type query; with board_timeout=None it does not wait.
+
+    protocol=2 asks the board for checksummed, sequence-numbered batches and
+    falls back to the plain v1 frames if the firmware does not answer.
+    batches_lost and batches_corrupt then count what went wrong on the line.
+
+    Samples are timestamped by sample_clock, which fits the board's sample
+    clock against read times, rather than with the time of the read.
+
+    health holds the acquisition counters (see telemetry.HEALTH_FIELDS); pass
+    a SharedHealthCounters to make them visible to another process.
+    """
+
+    # How long a blocking read waits before checking whether to stop
+    IDLE_TIMEOUT = 0.1
+    # The board resets when the port opens, so the query is repeated
+    BOARD_QUERY_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        port="/dev/ttyACM0",
+        baud_rate=230400,
+        ring=None,
+        read_mode="blocking",
+        latency_target=0.005,
+        board_timeout=3.0,
+        protocol=1,
+        health=None,
+    ):
+        if read_mode not in READ_MODES:
+            raise ValueError(f"read_mode must be one of {READ_MODES}, got {read_mode!r}")
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"protocol must be one of {PROTOCOLS}, got {protocol!r}")
         self.port = port
         self.baud_rate = baud_rate
+        self.read_mode = read_mode
+        self.latency_target = latency_target
+        self.board_timeout = board_timeout
+        self.protocol = protocol
+        # What the board actually speaks, set once negotiated
+        self.protocol_version = 1
+        self.board_type = None
         self.serial = None
         self.running = False
         self.thread = None
-        self.num_channels = 1
-        self.latest_values = [0.0] * self.num_channels
-        self.lock = threading.Lock()
+        # Every decoded sample ends up here, normalized to 0.0-1.0
+        self.ring = ring or SampleRingBuffer(num_channels=1)
+        self.num_channels = self.ring.num_channels
+        self.v2_decoder = V2Decoder(self.num_channels)
+        self.health = health or HealthCounters()
 
         # Constants from Arduino firmware
-        self.START_ESCAPE_SEQ = bytes([255, 255, 1, 1, 128, 255])
-        self.END_ESCAPE_SEQ = bytes([255, 255, 1, 1, 129, 255])
+        self.START_ESCAPE_SEQ = START_ESCAPE_SEQ
+        self.END_ESCAPE_SEQ = END_ESCAPE_SEQ
+
+        # Stream state, shared by connect() and the reader thread
+        self.parser = MessageParser()
+        self.message_callbacks = []
+        self._buffer = bytearray()
+        self.sample_clock = SampleClock(FIRMWARE_SAMPLE_RATE / self.num_channels)
+        # Frames the board has sent since the clock was reset, counting lost ones
+        self.frame_index = 0
 
     def connect(self):
         """Connect to the Arduino device"""
@@ -31,19 +113,143 @@ class ArduinoEMGHandler:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1,
+                timeout=self.IDLE_TIMEOUT if self.read_mode == "blocking" else 1,
             )
             if not self.serial.is_open:
                 self.serial.open()
             # Flush input buffer
             self.serial.reset_input_buffer()
-            # Query board type to ensure communication
-            self.send_command("b:1")
-            return True
+            self.parser = MessageParser()
+            self._buffer = bytearray()
+            self._reset_clock()
         except Exception as e:
             print(f"Failed to connect to Arduino: {e}")
             return False
 
+        # Query board type to ensure communication
+        self.protocol_version = 1
+        if self.board_timeout is None:
+            self.send_command("b:1")
+            return True
+        reply = self.query_board_type(self.board_timeout)
+        if reply is None:
+            print(f"Failed to connect to Arduino: no reply from board on {self.port}")
+            self.serial.close()
+            self.serial = None
+            return False
+        if self.protocol == 2 and not self.negotiate_protocol(2, self.board_timeout):
+            print("Board did not accept protocol v2, falling back to v1")
+        return True
+
+    def negotiate_protocol(self, version, timeout=3.0):
+        """Ask the board to switch framing with p:<version> and wait for PROTO:.
+
+        Returns True if the board switched. Firmware without the command
+        ignores it and keeps sending v1 frames.
+        """
+        future = self.wait_for_message(b"PROTO:")
+        self.send_command(f"p:{version}")
+        try:
+            reply = self._wait(future, timeout)
+        finally:
+            self.remove_message_callback(future.on_message)
+        if reply != b"PROTO:%d;" % version:
+            return False
+
+        # Bytes of the old framing still in the buffer would not decode
+        self._buffer = bytearray()
+        self.protocol_version = version
+        self.v2_decoder = V2Decoder(self.num_channels)
+        self._reset_clock()
+        return True
+
+    def _reset_clock(self):
+        """Start timestamping afresh, e.g. when the frame rate changes"""
+        self.sample_clock.reset(FIRMWARE_SAMPLE_RATE / self.num_channels)
+        self.frame_index = 0
+
+    def _wait(self, future, timeout):
+        """Result of future, pumping the port if no reader thread is running"""
+        deadline = time.perf_counter() + timeout
+        while not future.done():
+            if time.perf_counter() > deadline:
+                return None
+            if self.running:
+                time.sleep(0.01)
+            else:
+                self._process(self._read_available())
+                if self.read_mode == "poll":
+                    time.sleep(0.001)
+        return future.result()
+
+    def query_board_type(self, timeout=3.0):
+        """Ask for the board type and wait for the HWT:<type>; reply.
+
+        Returns the board type, or None if there was no reply in time.
+        """
+        future = self.wait_for_message(b"HWT:")
+        deadline = time.perf_counter() + timeout
+        next_query = 0.0
+        try:
+            while not future.done():
+                now = time.perf_counter()
+                if now > deadline:
+                    return None
+                if now >= next_query:
+                    self.send_command("b:1")
+                    next_query = now + self.BOARD_QUERY_INTERVAL
+                if self.running:
+                    # The reader thread resolves the future
+                    time.sleep(0.01)
+                else:
+                    self._process(self._read_available())
+                    if self.read_mode == "poll":
+                        time.sleep(0.001)
+        finally:
+            self.remove_message_callback(future.on_message)
+
+        reply = future.result()
+        self.board_type = reply[len(b"HWT:") :].rstrip(b";").decode("ascii", "replace")
+        return self.board_type
+
+    @property
+    def sample_rate(self):
+        """Nominal frames per second at the current number of channels"""
+        return FIRMWARE_SAMPLE_RATE / self.num_channels
+
+    @property
+    def batches_lost(self):
+        """Protocol v2 batches missing from the sequence, including corrupt ones"""
+        return self.v2_decoder.batches_lost
+
+    @property
+    def batches_corrupt(self):
+        """Protocol v2 full-length batches dropped for a bad checksum"""
+        return self.v2_decoder.batches_corrupt
+
+    def add_message_callback(self, callback):
+        """Call callback(message_bytes) for every message from the board"""
+        self.message_callbacks = self.message_callbacks + [callback]
+
+    def remove_message_callback(self, callback):
+        self.message_callbacks = [c for c in self.message_callbacks if c is not callback]
+
+    def wait_for_message(self, prefix):
+        """Future resolved with the next message starting with prefix.
+
+        Remove future.on_message with remove_message_callback() when giving up.
+        """
+        future = Future()
+
+        def on_message(message):
+            if message.startswith(prefix) and not future.done():
+                future.set_result(message)
+                self.remove_message_callback(on_message)
+
+        future.on_message = on_message
+        self.add_message_callback(on_message)
+        return future
+
     def disconnect(self):
         """Disconnect from the Arduino device"""
         self.stop_reading()
@@ -71,92 +277,109 @@ class ArduinoEMGHandler:
         """Set the number of channels to read"""
         if 1 <= num_channels <= 6:
             self.num_channels = num_channels
-            with self.lock:
-                self.latest_values = [0.0] * self.num_channels
+            self.v2_decoder.num_channels = num_channels
+            if self.ring.num_channels != num_channels:
+                self.ring = SampleRingBuffer(num_channels=num_channels)
+            self._reset_clock()
             return self.send_command(f"c:{num_channels}")
         return False
 
     def get_latest_value(self, channel=0):
         """Get the latest value from the specified channel"""
-        with self.lock:
-            if 0 <= channel < len(self.latest_values):
-                return self.latest_values[channel]
-            return 0.0
+        latest = self.ring.latest()
+        if len(latest) and 0 <= channel < self.ring.num_channels:
+            return float(latest[0, channel])
+        return 0.0
+
+    def read_since(self, cursor):
+        """Get every sample decoded after cursor, see SampleRingBuffer.read_since"""
+        return self.ring.read_since(cursor)
+
+    def read_block_since(self, cursor):
+        """Get (samples, timestamps, new_cursor) for samples decoded after cursor"""
+        return self.ring.read_block_since(cursor)
 
     def _read_thread(self):
         """Thread function to continuously read data"""
-        buffer = bytearray()
-
         while self.running:
             try:
-                if self.serial.in_waiting > 0:
-                    data = self.serial.read(self.serial.in_waiting)
-                    buffer.extend(data)
-
-                    # Process buffer for complete frames
-                    while len(buffer) >= 2 * self.num_channels:
-                        # Check if we have a start-of-frame marker (first bit of first byte is 1)
-                        if buffer[0] & 0x80:
-                            # We have a complete frame
-                            frame_values = []
-
-                            for i in range(self.num_channels):
-                                if len(buffer) < 2 * (i + 1):
-                                    break
-
-                                # Extract the 15-bit ADC value
-                                # First 7 bits from first byte and 8 bits from second byte
-                                high_byte = (
-                                    buffer[2 * i] & 0x7F
-                                )  # Remove start bit flag
-                                low_byte = buffer[2 * i + 1] & 0x7F
-                                value = (high_byte << 7) | low_byte
-
-                                # Normalize value to 0.0-1.0 range (Arduino ADC is 10-bit: 0-1023)
-                                normalized_value = value / 1023.0
-                                frame_values.append(normalized_value)
-
-                            if len(frame_values) == self.num_channels:
-                                # Store the latest values
-                                with self.lock:
-                                    self.latest_values = frame_values
-
-                                # Remove the processed frame from buffer
-                                buffer = buffer[2 * self.num_channels :]
-                            else:
-                                # Incomplete frame, try again later
-                                break
-                        else:
-                            # Not at start of frame, remove first byte and try again
-                            buffer.pop(0)
-
-                # Check for response messages (escape sequences)
-                start_index = self._find_subsequence(buffer, self.START_ESCAPE_SEQ)
-                if start_index >= 0:
-                    end_index = self._find_subsequence(buffer, self.END_ESCAPE_SEQ)
-                    if end_index > start_index:
-                        # Extract the message
-                        message = buffer[
-                            start_index + len(self.START_ESCAPE_SEQ) : end_index
-                        ]
-                        # Remove the processed message from buffer
-                        buffer = buffer[end_index + len(self.END_ESCAPE_SEQ) :]
-
-                time.sleep(0.001)  # Small delay to prevent CPU hogging
+                data = self._read_available()
+                if data:
+                    self._process(data)
+                    # Whatever arrived while we were decoding
+                    self.health.set("backlog_bytes", self.serial.in_waiting)
+
+                if self.read_mode == "poll":
+                    time.sleep(0.001)  # Small delay to prevent CPU hogging
 
             except Exception as e:
+                self.health.add("exceptions")
                 print(f"Error reading data: {e}")
                 time.sleep(0.1)  # Longer delay after error
 
-    def _find_subsequence(self, sequence, subsequence):
-        """Find a subsequence in a sequence"""
-        if not subsequence or len(subsequence) > len(sequence):
-            return -1
-
-        for i in range(len(sequence) - len(subsequence) + 1):
-            if sequence[i : i + len(subsequence)] == subsequence:
-                return i
-        return -1
+    def _process(self, data):
+        """Dispatch replies and decode frames from freshly read bytes"""
+        if not data:
+            return
+        health = self.health
+        health.add("bytes_read", len(data))
+        health.add("read_calls")
+        if len(data) > health.get("max_read_size"):
+            health.set("max_read_size", len(data))
+
+        # Take replies (escape sequences) out before they can pass for frames
+        frame_bytes, messages = self.parser.feed(data)
+        for message in messages:
+            for callback in self.message_callbacks:
+                callback(message)
+
+        # Decode every complete frame in the buffer in one go
+        self._buffer.extend(frame_bytes)
+        if self.protocol_version == 2:
+            decoder = self.v2_decoder
+            lost, ok, filler = decoder.batches_lost, decoder.batches_ok, decoder.filler_bytes
+            values, consumed = decoder.decode(self._buffer)
+            # Lost batches still took time on the board
+            lost = decoder.batches_lost - lost
+            self.frame_index += lost * v2_batch_frames(self.num_channels)
+            used = (decoder.batches_ok - ok) * v2_batch_size(self.num_channels)
+            # The firmware's filler between batches is expected, not a resync
+            used += decoder.filler_bytes - filler
+            health.set("batches_lost", decoder.batches_lost)
+            health.set("batches_corrupt", decoder.batches_corrupt)
+        else:
+            values, consumed = decode_frames(self._buffer, self.num_channels)
+            used = len(values) * 2 * self.num_channels
+        del self._buffer[:consumed]
+        # Bytes thrown away rather than decoded
+        health.add("resync_bytes", consumed - used)
+        health.add("frames_decoded", len(values))
+
+        if len(values):
+            # The newest frame had arrived by now
+            now = time.perf_counter()
+            self.sample_clock.update(self.frame_index + len(values) - 1, now)
+            timestamps = self.sample_clock.timestamps(self.frame_index, len(values))
+            self.frame_index += len(values)
+            self.ring.write(normalize(values), timestamps)
+
+    def _read_available(self):
+        """Read the bytes waiting on the port, according to read_mode"""
+        if self.read_mode == "poll":
+            waiting = self.serial.in_waiting
+            return self.serial.read(waiting) if waiting > 0 else b""
+
+        # Blocks in select() until the first byte is there
+        data = self.serial.read(1)
+        if not data:
+            return data
+        if self.latency_target > 0:
+            # Let the rest of the batch arrive before waking up again
+            time.sleep(self.latency_target)
+        waiting = self.serial.in_waiting
+        if waiting > 0:
+            data += self.serial.read(waiting)
+        return data
 
     def start_reading(self):
         """Start reading data in a separate thread"""
@@ -175,24 +398,207 @@ class ArduinoEMGHandler:
     def stop_reading(self):
         """Stop reading data"""
         self.running = False
+        if self.thread and self.serial and hasattr(self.serial, "cancel_read"):
+            # Wake up a blocking read instead of waiting for its timeout
+            self.serial.cancel_read()
         if self.thread:
             self.thread.join(timeout=1.0)
             self.thread = None
 
 
+def _acquisition_main(
+    port, baud_rate, ring_name, health_name, connected, stop, handler_kwargs
+):
+    """Entry point of the acquisition process"""
+    ring = SharedSampleRingBuffer.attach(ring_name)
+    health = SharedHealthCounters.attach(health_name)
+    handler = ArduinoEMGHandler(
+        port=port, baud_rate=baud_rate, ring=ring, health=health, **handler_kwargs
+    )
+    try:
+        if not handler.connect():
+            return
+        if ring.num_channels > 1:
+            handler.set_channels(ring.num_channels)
+        handler.start_reading()
+        connected.set()
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handler.disconnect()
+        ring.close()
+        health.close()
+
+
+class EMGAcquisitionProcess:
+    """Runs ArduinoEMGHandler in a separate process.
+
+    Serial reading and decoding get their own interpreter and core. Samples
+    come back through a SharedSampleRingBuffer, so reading them needs no
+    pickling, queues or locks. Offers the same interface as ArduinoEMGHandler.
+    """
+
+    def __init__(
+        self,
+        port="/dev/ttyACM0",
+        baud_rate=230400,
+        num_channels=1,
+        capacity=65536,
+        **handler_kwargs,
+    ):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.num_channels = num_channels
+        # Passed on to ArduinoEMGHandler in the acquisition process
+        self.handler_kwargs = handler_kwargs
+        self.ring = SharedSampleRingBuffer(capacity, num_channels)
+        self.health = SharedHealthCounters()
+
+        # Spawn rather than fork: the parent has SDL and its threads running
+        self._context = multiprocessing.get_context("spawn")
+        self.connected = self._context.Event()
+        self.stop = self._context.Event()
+        self.process = None
+
+    def connect(self, timeout=10.0):
+        """Start the acquisition process and wait until it is connected"""
+        if self.process is None:
+            self.process = self._context.Process(
+                target=_acquisition_main,
+                args=(
+                    self.port,
+                    self.baud_rate,
+                    self.ring.name,
+                    self.health.name,
+                    self.connected,
+                    self.stop,
+                    self.handler_kwargs,
+                ),
+                daemon=True,
+            )
+            self.process.start()
+
+        deadline = time.perf_counter() + timeout
+        while not self.connected.wait(0.05):
+            if not self.process.is_alive() or time.perf_counter() > deadline:
+                print(f"Acquisition process failed to connect to Arduino on {self.port}")
+                return False
+        return True
+
+    @property
+    def sample_rate(self):
+        """Nominal frames per second at the current number of channels"""
+        return FIRMWARE_SAMPLE_RATE / self.num_channels
+
+    def start_reading(self):
+        """The process reads as soon as it is connected"""
+        return self.connect()
+
+    def stop_reading(self):
+        """Stop the acquisition process"""
+        if self.process is None:
+            return
+        self.stop.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process = None
+
+    def disconnect(self):
+        """Stop the process and release the shared ring and counters"""
+        self.stop_reading()
+        self.ring.close()
+        self.health.close()
+
+    def get_latest_value(self, channel=0):
+        """Get the latest value from the specified channel"""
+        latest = self.ring.latest()
+        if len(latest) and 0 <= channel < self.ring.num_channels:
+            return float(latest[0, channel])
+        return 0.0
+
+    def read_since(self, cursor):
+        """Get every sample decoded after cursor, see SampleRingBuffer.read_since"""
+        return self.ring.read_since(cursor)
+
+    def read_block_since(self, cursor):
+        """Get (samples, timestamps, new_cursor) for samples decoded after cursor"""
+        return self.ring.read_block_since(cursor)
+
+
 class InputHandler:
-    def __init__(self, demo_mode: bool = True, port: Optional[str] = None):
+    def __init__(
+        self,
+        demo_mode: bool = True,
+        port: Optional[str] = None,
+        acquisition_process: bool = False,
+        read_mode: str = "blocking",
+        read_latency: float = 0.005,
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_speed: float = 1.0,
+        protocol: int = 1,
+        envelope: Optional[EnvelopeConfig] = None,
+        demo: Optional[DemoConfig] = None,
+    ):
         self.demo_mode = demo_mode
         self.port = port
+        self.acquisition_process = acquisition_process
+        self.read_mode = read_mode
+        self.read_latency = read_latency
+        self.protocol = protocol
         self.emg_handler = None
-        self.key_pressed = False
 
-        if not demo_mode and port:
+        if replay:
+            # A recorded session stands in for the Arduino
+            self.demo_mode = False
+            self.emg_handler = ReplaySource(replay, speed=replay_speed)
+            self.emg_handler.start_reading()
+        elif demo_mode:
+            # Synthetic EMG, driven by the SPACE key
+            self.emg_handler = DemoEMGSource(demo)
+            self.emg_handler.start_reading()
+        elif port:
             self._setup_arduino()
 
+        # update() reads the source once per tick and publishes on the bus
+        self.bus = InputBus()
+        self._cursor = 0
+        self._last_value = 0.0
+
+        # Samples run through the envelope filters once per frame
+        self.envelope = None
+        if self.emg_handler:
+            self.envelope = EMGEnvelope(
+                self.emg_handler.sample_rate, self.emg_handler.num_channels, envelope
+            )
+
+        # The recorder reads the source with its own cursor, in its own
+        # thread, so screens that stop calling update() leave no holes
+        self.recorder = None
+        self._record_thread = None
+        if record:
+            num_channels = self.emg_handler.num_channels if self.emg_handler else 1
+            self.recorder = SessionRecorder(record, num_channels=num_channels)
+        if self.recorder and self.emg_handler:
+            self._record_cursor = 0
+            self._record_stop = threading.Event()
+            self._record_thread = threading.Thread(target=self._record_loop, daemon=True)
+            self._record_thread.start()
+
     def _setup_arduino(self):
         try:
-            self.emg_handler = ArduinoEMGHandler(port=self.port)
+            handler_kwargs = dict(
+                read_mode=self.read_mode,
+                latency_target=self.read_latency,
+                protocol=self.protocol,
+            )
+            if self.acquisition_process:
+                self.emg_handler = EMGAcquisitionProcess(port=self.port, **handler_kwargs)
+            else:
+                self.emg_handler = ArduinoEMGHandler(port=self.port, **handler_kwargs)
             if not self.emg_handler.connect():
                 raise RuntimeError(f"Failed to connect to Arduino on port {self.port}")
 
@@ -204,24 +610,109 @@ class InputHandler:
 
     def set_key_state(self, pressed: bool):
         """Update the key press state for demo mode."""
-        self.key_pressed = pressed
-
-    def get_value(self) -> float:
         if self.demo_mode:
-            # In demo mode, return biased random values based on key press
-            if self.key_pressed:
-                # When key is pressed, generate positive values with higher mean
-                return np.random.normal(2.0, 0.5)
-            else:
-                # When key is not pressed, generate values around zero
-                return np.random.normal(0.0, 0.2)
-        else:
-            # Read from Arduino EMG handler
-            if not self.emg_handler:
-                raise RuntimeError("Arduino not initialized")
-            # Get the latest value from channel 0
-            return self.emg_handler.get_latest_value(0)
+            self.emg_handler.set_key_state(pressed)
 
-    def __del__(self):
+    def get_value(self) -> float:
+        if not self.emg_handler:
+            raise RuntimeError("Arduino not initialized")
+        # Get the latest value from channel 0
+        return self.emg_handler.get_latest_value(0)
+
+    def get_envelope(self, channel: int = 0) -> float:
+        """Latest EMG envelope, updated by update()"""
+        if not self.envelope or not 0 <= channel < self.envelope.num_channels:
+            return 0.0
+        return float(self.envelope.value[channel])
+
+    def read_since(self, cursor: int):
+        """Get every sample that arrived after cursor.
+
+        Returns (samples, new_cursor), where samples has shape
+        (n_samples, num_channels). Pass 0 on the first call and the returned
+        cursor afterwards.
+        """
+        if not self.emg_handler:
+            raise RuntimeError("Arduino not initialized")
+        return self.emg_handler.read_since(cursor)
+
+    def read_block_since(self, cursor: int):
+        """Like read_since, but returns (samples, timestamps, new_cursor).
+
+        Timestamps are time.perf_counter() seconds, one per sample.
+        """
+        if not self.emg_handler:
+            raise RuntimeError("Arduino not initialized")
+        return self.emg_handler.read_block_since(cursor)
+
+    @property
+    def sample_rate(self) -> float:
+        """Samples per second per channel of the current source"""
+        if not self.emg_handler:
+            return FIRMWARE_SAMPLE_RATE
+        return self.emg_handler.sample_rate
+
+    @property
+    def num_channels(self) -> int:
+        if not self.emg_handler:
+            return 1
+        return self.emg_handler.num_channels
+
+    @property
+    def health(self):
+        """Acquisition HealthCounters, None for the demo source and replay"""
+        return getattr(self.emg_handler, "health", None)
+
+    @property
+    def sample_clock(self):
+        """SampleClock behind the timestamps, None unless read in this process.
+
+        Its rate and drift_ppm properties tell how fast the board really samples.
+        """
+        return getattr(self.emg_handler, "sample_clock", None)
+
+    def update(self):
+        """Once per frame: read the new samples once and publish them on bus.
+
+        Returns the InputSnapshot every subscriber received.
+        """
+        now = time.perf_counter()
+        samples, timestamps, self._cursor = self.read_block_since(self._cursor)
+        if len(samples):
+            self._last_value = float(samples[-1, 0])
+        if self.envelope:
+            self.envelope.process(samples)
+        return self.bus.publish(
+            now, samples, timestamps, self._last_value, self.get_envelope()
+        )
+
+    def _record_loop(self):
+        while not self._record_stop.wait(RECORD_INTERVAL):
+            self._record_new_samples()
+        self._record_new_samples()
+
+    def _record_new_samples(self):
+        """Append everything since the recorder's cursor, reporting overruns"""
+        cursor = self._record_cursor
+        samples, timestamps, self._record_cursor = self.emg_handler.read_block_since(cursor)
+        missed = self._record_cursor - cursor - len(samples)
+        if missed > 0:
+            self.recorder.samples_missed += missed
+            print(f"Recording fell behind: {missed} samples lost")
+        self.recorder.append(samples, timestamps)
+
+    def close(self):
+        """Release the Arduino connection and finish the recording"""
+        if getattr(self, "_record_thread", None):
+            self._record_stop.set()
+            self._record_thread.join()
+            self._record_thread = None
+        if getattr(self, "recorder", None):
+            self.recorder.close()
+            self.recorder = None
         if self.emg_handler:
             self.emg_handler.disconnect()
+            self.emg_handler = None
+
+    def __del__(self):
+        self.close()
@@ -12,8 +12,21 @@ from typing import List, Dict, Optional
 
 # Import the InputHandler
 from byb_cars.input_handler import InputHandler
-from byb_cars.elements import Car, SignalPlot, GameWorld, ScoreManager, get_username, show_high_scores
+from byb_cars.demo_source import DemoConfig
+from byb_cars.telemetry import HealthMonitor
+from byb_cars.elements import (
+    Car,
+    SignalPlot,
+    SpectrogramPlot,
+    ReactionGame,
+    GameWorld,
+    ScoreManager,
+    get_username,
+    show_high_scores,
+    load_or_calibrate,
+)
 from byb_cars import defaults
+from byb_cars.elements.fonts import get_font, render_text, text_cache
 from byb_cars.elements.layout_config import layout
 
 
@@ -45,182 +58,384 @@ class MainConfig:
 main_config = MainConfig()
 
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(description="Scrolling Road with EMG Control")
-parser.add_argument(
-    "--demo",
-    action="store_true",
-    help="Run in demo mode with keyboard control instead of EMG",
-)
-parser.add_argument(
-    "--port",
-    type=str,
-    default=None,
-    help="Serial port for Arduino (e.g., COM3 on Windows, /dev/ttyACM0 on Linux)",
-)
-args = parser.parse_args()
-
-# Determine if we're running in demo mode
-demo_mode = True if args.demo else (args.port is None)
-
-# Initialize configuration
-config = MainConfig()
-
-# Initialize score manager
-score_manager = ScoreManager()
-print(f"Loaded {len(score_manager.scores)} scores")
-
-# Initialize Pygame
-pygame.init()
-
-# Screen dimensions
-screen = pygame.display.set_mode((layout.screen_width, layout.screen_height))
-pygame.display.set_caption("Scrolling Road with Car")
-
-# Get initial username
-current_username = get_username(screen)
-user_best_time = score_manager.get_best_time(current_username)
-print(f"Best time for {current_username}: {user_best_time}")
-
-# Initialize InputHandler with command line parameters
-input_handler = InputHandler(demo_mode=demo_mode, port=args.port)
-
-# Print status message
-if demo_mode:
-    print("Running in demo mode - use SPACEBAR to control")
-else:
-    print(f"Connected to Arduino on port: {args.port}")
-
-# Calculate positions based on config
-car_screen_y = defaults.HEIGHT - config.car_offset_from_bottom
-plot_y = defaults.HEIGHT - config.plot_height
-
-# Create the car at a fixed screen position (centered, in lower part of screen)
-car = Car(layout.screen_width // 2, layout.car_screen_y, input_handler)
-
-# Create the game world - get user's best time if available
-user_best_time = score_manager.get_best_time(current_username)
-game_world = GameWorld(game_height=defaults.HEIGHT - config.game_height_offset)
-if user_best_time is not None:
-    game_world.best_time = user_best_time
-    print(f"Loaded best time for {current_username}: {user_best_time}")
-
-# Create the signal plot
-signal_plot = SignalPlot(layout.screen_width, layout.plot_height)
-
-# Game loop
-running = True
-clock = pygame.time.Clock()
-show_scores = False
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_q:
-                running = False
-            elif event.key == pygame.K_r:
-                # Reset race and potentially get new username
-                game_world.reset()
-                # Remove the score saved flag so new scores will be saved
-                if hasattr(game_world, '_score_saved'):
-                    delattr(game_world, '_score_saved')
-                current_username = get_username(screen)
-                # Update user's best time
-                user_best_time = score_manager.get_best_time(current_username)
-                if user_best_time is not None:
-                    game_world.best_time = user_best_time
-            elif event.key == pygame.K_h:
-                # Show high scores
-                show_high_scores(screen, score_manager)
-            elif event.key == pygame.K_SPACE:
-                # Set key_pressed to True when space is pressed
-                input_handler.set_key_state(True)
-        elif event.type == pygame.KEYUP:
-            if event.key == pygame.K_SPACE:
-                # Set key_pressed to False when space is released
-                input_handler.set_key_state(False)
-
-    # Handle high score display
-    if show_scores:
-        show_high_scores(screen, score_manager)
-        show_scores = False
-        continue
-
-    # Get input value and update signal plot
-    input_value = input_handler.get_value()
-    signal_plot.update(input_value)
-
-    # Update car speed based on input
-    current_speed = car.update()
-
-    # Update game world with car speed
-    game_world.update(current_speed)
-
-    # Check if race just finished and save score
-    if game_world.race_finished and game_world.finish_time and not hasattr(game_world, '_score_saved'):
-        finish_time = game_world.finish_time - game_world.start_time
-        score_manager.add_score(current_username, finish_time)
-        # Mark that we've saved this score
-        game_world._score_saved = True
-
-    # Clear screen
-    screen.fill(defaults.SKY_BLUE)
-
-    # Draw game world
-    game_world.draw(screen, layout.car_screen_y)
-
-    # Draw car
-    car.draw(screen)
-
-    # Draw timer and race status
-    game_world.draw_timer(screen)
-
-    # Show debug info
-    debug_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.debug_size)
-    debug_text = f"Position: {game_world.position:.1f}"
-    # Activate for debug
-    # debug = debug_font.render(debug_text, True, layout.fonts.normal_color)
-    # screen.blit(debug, layout.debug_text_pos)
-
-    # Draw separator line
-    pygame.draw.line(
-        screen,
-        layout.separator_line_color,
-        (0, layout.separator_line_y),
-        (layout.screen_width, layout.separator_line_y),
-        layout.separator_line_width,
-    )
-
-    # Draw signal plot at the bottom of the screen
-    signal_plot.draw(screen, 0, layout.plot_y)
-
-    # Show speed
-    font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.normal_size)
-    speed_text = f"Speed: {current_speed:.1f}"
-    text_surface = font.render(speed_text, True, layout.fonts.normal_color)
-    screen.blit(text_surface, layout.speed_text_pos)
-
-    # Show current user (use the configured position)
-    user_text = f"User: {current_username}"
-    user_surface = font.render(user_text, True, layout.fonts.normal_color)
-    screen.blit(
-        user_surface, (defaults.WIDTH - user_surface.get_width() - layout.user_text_x_padding, layout.user_text_y)
-    )
-
-    # Show controls
-    controls_font = pygame.font.SysFont(layout.fonts.default_font, layout.fonts.small_size)
-    if input_handler.demo_mode:
-        controls_text = "R: Reset | H: Ranking | Q: Quit"
+def main():
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Scrolling Road with EMG Control")
+    parser.add_argument(
+        "--mode",
+        choices=["race", "reaction"],
+        default="race",
+        help="Race the car, or measure reaction times to a GO cue",
+    )
+    parser.add_argument(
+        "--no-calibration",
+        action="store_true",
+        help="Skip per-player calibration and use the fixed envelope-to-speed mapping",
+    )
+    parser.add_argument(
+        "--demo",
+        action="store_true",
+        help="Run in demo mode with keyboard control instead of EMG",
+    )
+    parser.add_argument(
+        "--demo-rate",
+        type=float,
+        default=10000,
+        help="Synthetic samples per second per channel in demo mode (raise for load tests)",
+    )
+    parser.add_argument(
+        "--demo-channels",
+        type=int,
+        default=1,
+        help="Number of synthetic channels in demo mode",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the demo mode signal generator",
+    )
+    parser.add_argument(
+        "--track-seed",
+        type=int,
+        default=None,
+        help="Seed for the trees along the track (default: a new layout every race)",
+    )
+    parser.add_argument(
+        "--port",
+        type=str,
+        default=None,
+        help="Serial port for Arduino (e.g., COM3 on Windows, /dev/ttyACM0 on Linux)",
+    )
+    parser.add_argument(
+        "--acquisition-process",
+        action="store_true",
+        help="Read the Arduino in a separate process instead of a thread",
+    )
+    parser.add_argument(
+        "--read-mode",
+        choices=["blocking", "poll"],
+        default="blocking",
+        help="Wait for serial data in the driver (blocking) or check every 1 ms (poll)",
+    )
+    parser.add_argument(
+        "--read-latency",
+        type=float,
+        default=0.005,
+        help="Seconds to batch serial data per wakeup in blocking mode",
+    )
+    parser.add_argument(
+        "--protocol",
+        type=int,
+        choices=[1, 2],
+        default=1,
+        help="Serial framing: 2 adds sequence numbers and checksums (needs updated firmware)",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        help="Record every input sample with timestamps to this session file",
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        help="Play back a recorded session file instead of reading the Arduino",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Playback speed for --replay, as a multiple of real time",
+    )
+    parser.add_argument(
+        "--plot-mode",
+        choices=list(SignalPlot.RENDER_MODES),
+        default="lines",
+        help="Redraw the signal trace every frame (lines) or scroll a pixel buffer "
+        "and draw only new columns, as a min/max band or a line",
+    )
+    parser.add_argument(
+        "--spectrogram",
+        action="store_true",
+        help="Show the EMG spectrogram instead of the signal plot from the start (toggle with S)",
+    )
+    parser.add_argument(
+        "--telemetry",
+        action="store_true",
+        help="Show acquisition health on screen from the start (toggle with F3)",
+    )
+    parser.add_argument(
+        "--telemetry-csv",
+        type=str,
+        default=None,
+        help="Append acquisition health counters to this CSV file periodically",
+    )
+    parser.add_argument(
+        "--telemetry-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between rows of --telemetry-csv",
+    )
+    args = parser.parse_args()
+
+    # Determine if we're running in demo mode
+    demo_mode = True if args.demo else (args.port is None and args.replay is None)
+
+    # Initialize configuration
+    config = MainConfig()
+
+    # Initialize score manager
+    score_manager = ScoreManager()
+    print(f"Loaded {len(score_manager.scores)} scores")
+
+    # Initialize Pygame
+    pygame.init()
+
+    # Screen dimensions
+    screen = pygame.display.set_mode((layout.screen_width, layout.screen_height))
+    pygame.display.set_caption("Scrolling Road with Car")
+
+    # Get initial username
+    current_username = get_username(screen)
+    user_best_time = score_manager.get_best_time(current_username)
+    print(f"Best time for {current_username}: {user_best_time}")
+
+    # Initialize InputHandler with command line parameters
+    input_handler = InputHandler(
+        demo_mode=demo_mode,
+        port=args.port,
+        acquisition_process=args.acquisition_process,
+        read_mode=args.read_mode,
+        read_latency=args.read_latency,
+        record=args.record,
+        replay=args.replay,
+        replay_speed=args.replay_speed,
+        protocol=args.protocol,
+        demo=DemoConfig(
+            sample_rate=args.demo_rate, num_channels=args.demo_channels, seed=args.seed
+        ),
+    )
+
+    # Print status message
+    if demo_mode:
+        print("Running in demo mode - use SPACEBAR to control")
+    elif args.replay:
+        print(f"Replaying session: {args.replay}")
     else:
-        controls_text = "R: Reset | H: Ranking | Q: Quit"
-    controls_surface = controls_font.render(controls_text, True, layout.fonts.normal_color)
-    screen.blit(controls_surface, layout.controls_text_pos)
+        print(f"Connected to Arduino on port: {args.port}")
+
+    # Calculate positions based on config
+    car_screen_y = defaults.HEIGHT - config.car_offset_from_bottom
+    plot_y = defaults.HEIGHT - config.plot_height
+
+    # Create the car at a fixed screen position (centered, in lower part of screen)
+    car = Car(layout.screen_width // 2, layout.car_screen_y, input_handler)
+
+    # Create the game world - get user's best time if available
+    user_best_time = score_manager.get_best_time(current_username)
+    game_world = GameWorld(game_height=defaults.HEIGHT - config.game_height_offset, seed=args.track_seed)
+    if user_best_time is not None:
+        game_world.best_time = user_best_time
+        print(f"Loaded best time for {current_username}: {user_best_time}")
+
+    # Create the signal plot
+    signal_plot = SignalPlot(
+        layout.screen_width,
+        layout.plot_height,
+        sample_rate=input_handler.sample_rate,
+        render_mode=args.plot_mode,
+    )
 
-    # Update display
-    pygame.display.flip()
-    clock.tick(main_config.fps)
+    # Per-player envelope-to-speed mapping: loaded for returning players,
+    # recorded for new ones
+    def apply_calibration(recalibrate=False):
+        calibration = None
+        if not args.no_calibration:
+            calibration = load_or_calibrate(
+                screen, input_handler, score_manager, current_username, recalibrate
+            )
+        car.calibration = calibration
+        signal_plot.threshold = calibration.raw_threshold if calibration else 1.0
+
+    apply_calibration()
+
+    # Spectrogram and median frequency, for watching fatigue; shares the plot area
+    spectrogram = SpectrogramPlot(
+        layout.screen_width,
+        layout.plot_height,
+        input_handler.sample_rate,
+        num_channels=input_handler.num_channels,
+    )
+    show_spectrogram = args.spectrogram
+
+    # Reaction-time mode measures from the cue frame to the onset sample
+    reaction = None
+    if args.mode == "reaction":
+        reaction = ReactionGame(input_handler.sample_rate, num_channels=input_handler.num_channels)
+
+    # Acquisition health, for the overlay and post-mortems
+    health_monitor = HealthMonitor(
+        input_handler.health,
+        csv_path=args.telemetry_csv,
+        csv_interval=args.telemetry_interval,
+    )
+    show_health = args.telemetry
+    input_handler.bus.subscribe(health_monitor.on_input)
+
+    # Game loop
+    running = True
+    clock = pygame.time.Clock()
+    show_scores = False
 
-pygame.quit()
-sys.exit()
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    running = False
+                elif event.key == pygame.K_r and reaction:
+                    # New round of reaction trials, after recalibrating
+                    reaction.reset()
+                elif event.key == pygame.K_r:
+                    # Reset race and potentially get new username
+                    game_world.reset()
+                    # Remove the score saved flag so new scores will be saved
+                    if hasattr(game_world, '_score_saved'):
+                        delattr(game_world, '_score_saved')
+                    current_username = get_username(screen)
+                    # Update user's best time
+                    user_best_time = score_manager.get_best_time(current_username)
+                    if user_best_time is not None:
+                        game_world.best_time = user_best_time
+                    apply_calibration()
+                elif event.key == pygame.K_c:
+                    # Record a new calibration for the current player
+                    apply_calibration(recalibrate=True)
+                elif event.key == pygame.K_h:
+                    # Show high scores
+                    show_high_scores(screen, score_manager)
+                elif event.key == pygame.K_F3:
+                    # Toggle the acquisition health overlay
+                    show_health = not show_health
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    # Zoom the signal plot in
+                    signal_plot.zoom(-1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    # Zoom the signal plot out
+                    signal_plot.zoom(1)
+                elif event.key == pygame.K_s:
+                    # Switch the plot area between the signal and its spectrogram
+                    show_spectrogram = not show_spectrogram
+                elif event.key == pygame.K_SPACE:
+                    # Flex the demo signal while space is held
+                    input_handler.set_key_state(True)
+            elif event.type == pygame.KEYUP:
+                if event.key == pygame.K_SPACE:
+                    # Relax the demo signal when space is released
+                    input_handler.set_key_state(False)
+
+        # Handle high score display
+        if show_scores:
+            show_high_scores(screen, score_manager)
+            show_scores = False
+            continue
+
+        # Read the input once for this tick; every consumer gets the same snapshot
+        snapshot = input_handler.update()
+        health_monitor.update(clock.get_time() / 1000)
+        signal_plot.update(snapshot.samples[:, 0])
+        spectrogram.update(snapshot.samples)
+
+        # Update car speed based on input
+        current_speed = car.update(snapshot)
+
+        if reaction:
+            reaction.update(snapshot)
+        else:
+            # Update game world with car speed
+            game_world.update(current_speed)
+
+        # Check if race just finished and save score
+        if game_world.race_finished and game_world.finish_time and not hasattr(game_world, '_score_saved'):
+            finish_time = game_world.finish_time - game_world.start_time
+            score_manager.add_score(current_username, finish_time)
+            # Mark that we've saved this score
+            game_world._score_saved = True
+
+        # Clear screen
+        screen.fill(defaults.SKY_BLUE)
+
+        if reaction:
+            # Draw the cue or the latest result
+            reaction.draw(screen, layout.separator_line_y)
+        else:
+            # Draw game world
+            game_world.draw(screen, layout.car_screen_y)
+
+            # Draw car
+            car.draw(screen)
+
+            # Draw timer and race status
+            game_world.draw_timer(screen)
+
+        # Show debug info
+        debug_text = f"Position: {game_world.position:.1f}"
+        if show_health:
+            x, y = layout.debug_text_pos
+            for line in [debug_text] + health_monitor.lines() + [text_cache.stats_line()]:
+                debug = render_text(line, layout.fonts.debug_size, layout.fonts.normal_color)
+                screen.blit(debug, (x, y))
+                y += get_font(layout.fonts.debug_size).get_linesize()
+
+        # Draw separator line
+        pygame.draw.line(
+            screen,
+            layout.separator_line_color,
+            (0, layout.separator_line_y),
+            (layout.screen_width, layout.separator_line_y),
+            layout.separator_line_width,
+        )
+
+        # Draw signal plot at the bottom of the screen
+        if show_spectrogram:
+            spectrogram.draw(screen, 0, layout.plot_y)
+        else:
+            signal_plot.draw(screen, 0, layout.plot_y)
+
+        # Show speed
+        speed_text = f"Speed: {current_speed:.1f}"
+        text_surface = render_text(speed_text, layout.fonts.normal_size, layout.fonts.normal_color)
+        screen.blit(text_surface, layout.speed_text_pos)
+
+        # Show current user (use the configured position)
+        user_text = f"User: {current_username}"
+        user_surface = render_text(user_text, layout.fonts.normal_size, layout.fonts.normal_color)
+        screen.blit(
+            user_surface, (defaults.WIDTH - user_surface.get_width() - layout.user_text_x_padding, layout.user_text_y)
+        )
+
+        # Show controls
+        if input_handler.demo_mode:
+            controls_text = "R: Reset | C: Calibrate | H: Ranking | Q: Quit"
+        else:
+            controls_text = "R: Reset | C: Calibrate | H: Ranking | Q: Quit"
+        controls_surface = render_text(controls_text, layout.fonts.small_size, layout.fonts.normal_color)
+        screen.blit(controls_surface, layout.controls_text_pos)
+
+        # Update display
+        pygame.display.flip()
+        if reaction:
+            reaction.presented(time.perf_counter())
+        clock.tick(main_config.fps)
+
+    health_monitor.close()
+    input_handler.close()
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
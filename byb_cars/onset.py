@@ -0,0 +1,150 @@
+"""Sample-accurate muscle onset detection.
+
+OnsetDetector follows a fast envelope of each channel (20 Hz high-pass,
+rectification, 50 Hz low-pass) and compares it with the resting level:
+a channel switches on when the envelope rises `on_sd` standard deviations
+above the rest mean and off only once it falls back below `off_sd`, so noise
+around a single threshold does not chatter. Every switch is reported as an
+OnsetEvent carrying the reconstructed timestamp of the sample that crossed,
+not the time of the game frame that processed it.
+"""
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from byb_cars.dsp import SOSFilter, butterworth
+
+
+@dataclass
+class OnsetConfig:
+    # Detection envelope: much faster than the one driving the car
+    highpass_hz: float = 20.0
+    lowpass_hz: float = 50.0
+
+    # Hysteresis, in rest standard deviations above the rest mean
+    on_sd: float = 4.0
+    off_sd: float = 2.0
+
+    # Resting signal collected by calibrate()
+    calibration_seconds: float = 2.0
+    # Filter settling time skipped before calibrating
+    settle_seconds: float = 0.2
+
+
+@dataclass(frozen=True)
+class OnsetEvent:
+    time: float  # time.perf_counter() timestamp of the crossing sample
+    sample: int  # Index of that sample since the detector was created
+    channel: int
+    active: bool  # True for an onset, False for the return to rest
+    level: float  # Detection envelope at the crossing, in rest SDs above rest
+
+
+class OnsetDetector:
+    """Hysteresis onset detector over (n_samples, num_channels) blocks"""
+
+    def __init__(self, sample_rate, num_channels=1, config=None):
+        self.config = config or OnsetConfig()
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        nyquist = 0.45 * sample_rate
+        self.highpass = SOSFilter(
+            butterworth("highpass", 2, min(self.config.highpass_hz, nyquist), sample_rate),
+            num_channels,
+        )
+        self.lowpass = SOSFilter(
+            butterworth("lowpass", 2, min(self.config.lowpass_hz, nyquist), sample_rate),
+            num_channels,
+        )
+        self.samples_seen = 0
+        self.active = np.zeros(num_channels, dtype=bool)
+
+        # Rest level; nothing is detected until calibrated
+        self.rest_mean = None
+        self.rest_sd = None
+        self._calibration_start = None
+        self._calibration_sum = np.zeros(num_channels)
+        self._calibration_sum_sq = np.zeros(num_channels)
+        self._calibration_count = 0
+
+    @property
+    def calibrated(self):
+        return self.rest_mean is not None
+
+    @property
+    def calibrating(self):
+        return self._calibration_start is not None
+
+    def calibrate(self):
+        """Measure the rest level over the next calibration_seconds of samples"""
+        # Not calibrated again until the new rest level is in
+        self.rest_mean = None
+        self.rest_sd = None
+        settle = int(self.config.settle_seconds * self.sample_rate)
+        self._calibration_start = max(self.samples_seen, settle)
+        self._calibration_sum[:] = 0
+        self._calibration_sum_sq[:] = 0
+        self._calibration_count = 0
+        self.active[:] = False
+
+    def set_rest(self, mean, sd):
+        """Use a rest level measured elsewhere"""
+        self.rest_mean = np.broadcast_to(np.asarray(mean, dtype=float), (self.num_channels,)).copy()
+        self.rest_sd = np.broadcast_to(np.asarray(sd, dtype=float), (self.num_channels,)).copy()
+        self._calibration_start = None
+
+    def process(self, samples, timestamps) -> List[OnsetEvent]:
+        """Detect onsets and offsets in a block; timestamps has one entry per sample"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1, self.num_channels)
+        first = self.samples_seen
+        self.samples_seen += len(samples)
+        if len(samples) == 0:
+            return []
+        envelope = self.lowpass.process(np.abs(self.highpass.process(samples)))
+
+        if self.calibrating:
+            self._accumulate_rest(envelope, first)
+            return []
+        if not self.calibrated:
+            return []
+        return self._detect(envelope, np.asarray(timestamps), first)
+
+    def _accumulate_rest(self, envelope, first):
+        skip = max(0, self._calibration_start - first)
+        rest = envelope[skip:]
+        self._calibration_sum += rest.sum(axis=0)
+        self._calibration_sum_sq += (rest.astype(np.float64) ** 2).sum(axis=0)
+        self._calibration_count += len(rest)
+        if self._calibration_count >= self.config.calibration_seconds * self.sample_rate:
+            mean = self._calibration_sum / self._calibration_count
+            variance = self._calibration_sum_sq / self._calibration_count - mean**2
+            self.set_rest(mean, np.sqrt(np.maximum(variance, 1e-12)))
+
+    def _detect(self, envelope, timestamps, first):
+        """Run the hysteresis over the block, one vectorized pass for all channels"""
+        level = (envelope - self.rest_mean) / self.rest_sd
+        # Each sample either sets the state, resets it or keeps the previous
+        # one; carry the last decision forward with a running maximum
+        decided = (level > self.config.on_sd) | (level < self.config.off_sd)
+        rows = np.arange(1, len(level) + 1)[:, None]
+        last = np.maximum.accumulate(np.where(decided, rows, 0), axis=0)
+        state = np.where(
+            last > 0,
+            level[np.maximum(last - 1, 0), np.arange(self.num_channels)] > self.config.on_sd,
+            self.active,
+        )
+
+        previous = np.vstack((self.active[None, :], state[:-1]))
+        changed = np.argwhere(state != previous)
+        self.active = state[-1].copy()
+        return [
+            OnsetEvent(
+                time=float(timestamps[i]),
+                sample=first + int(i),
+                channel=int(channel),
+                active=bool(state[i, channel]),
+                level=float(level[i, channel]),
+            )
+            for i, channel in changed
+        ]
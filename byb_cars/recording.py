@@ -0,0 +1,267 @@
+"""Session recording and replay.
+
+A session file is a 64-byte header followed by fixed-size chunks, so the
+whole file maps onto a NumPy structured array with ``np.memmap``:
+
+    header:  magic, version, num_channels, chunk_samples,
+             wall-clock and perf_counter time at the start of the recording
+    chunk:   count      int64                      samples used in this chunk
+             t_first    float64                    timestamp of first sample
+             t_last     float64                    timestamp of last sample
+             timestamps float64[chunk_samples]     perf_counter seconds
+             samples    float32[chunk_samples, num_channels]
+
+Chunks are only ever appended and every chunk but the last is full, so the
+count/t_first/t_last fields double as the chunk index. Readers touch
+those fields and the chunks they actually play back, nothing else.
+"""
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"BYBSESS1"
+VERSION = 1
+HEADER_SIZE = 64
+# magic, version, num_channels, chunk_samples, wall time, perf_counter time
+HEADER_FORMAT = "<8sIIIxxxxdd"
+
+
+def chunk_dtype(num_channels, chunk_samples):
+    """Structured dtype of one on-disk chunk"""
+    return np.dtype(
+        [
+            ("count", "<i8"),
+            ("t_first", "<f8"),
+            ("t_last", "<f8"),
+            ("timestamps", "<f8", (chunk_samples,)),
+            ("samples", "<f4", (chunk_samples, num_channels)),
+        ]
+    )
+
+
+class SessionRecorder:
+    """Append samples and their timestamps to a session file"""
+
+    def __init__(self, path, num_channels=1, chunk_samples=4096):
+        self.path = Path(path)
+        self.num_channels = num_channels
+        self.chunk_samples = chunk_samples
+        self.file = open(self.path, "wb")
+        self.file.write(
+            struct.pack(
+                HEADER_FORMAT,
+                MAGIC,
+                VERSION,
+                num_channels,
+                chunk_samples,
+                time.time(),
+                time.perf_counter(),
+            ).ljust(HEADER_SIZE, b"\0")
+        )
+        # The chunk being filled, written out once full
+        self.chunk = np.zeros((), dtype=chunk_dtype(num_channels, chunk_samples))
+        self.samples_written = 0
+        # Samples the source overwrote before they could be recorded
+        self.samples_missed = 0
+
+    def append(self, samples, timestamps):
+        """Record a (n_samples, num_channels) block with one timestamp per sample"""
+        samples = np.asarray(samples).reshape(-1, self.num_channels)
+        while len(samples):
+            count = int(self.chunk["count"])
+            n = min(len(samples), self.chunk_samples - count)
+            self.chunk["samples"][count : count + n] = samples[:n]
+            self.chunk["timestamps"][count : count + n] = timestamps[:n]
+            self.chunk["count"] = count + n
+            samples, timestamps = samples[n:], timestamps[n:]
+            self.samples_written += n
+            if count + n == self.chunk_samples:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        count = int(self.chunk["count"])
+        self.chunk["t_first"] = self.chunk["timestamps"][0]
+        self.chunk["t_last"] = self.chunk["timestamps"][count - 1]
+        self.file.write(self.chunk.tobytes())
+        # A crash then loses at most the chunk being filled
+        self.file.flush()
+        self.chunk = np.zeros((), dtype=self.chunk.dtype)
+
+    def close(self):
+        """Write the last partial chunk and close the file"""
+        if self.file is None:
+            return
+        if self.chunk["count"] > 0:
+            self._write_chunk()
+        self.file.close()
+        self.file = None
+
+
+class SessionReader:
+    """Random access to a session file through np.memmap"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        magic, version, num_channels, chunk_samples, wall_time, perf_time = struct.unpack(
+            HEADER_FORMAT, header[: struct.calcsize(HEADER_FORMAT)]
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a BYB Cars session file")
+
+        self.num_channels = num_channels
+        self.chunk_samples = chunk_samples
+        self.wall_time = wall_time
+        self.perf_time = perf_time
+
+        dtype = chunk_dtype(num_channels, chunk_samples)
+        # Ignore a chunk cut short by a crash
+        num_chunks = (self.path.stat().st_size - HEADER_SIZE) // dtype.itemsize
+        if num_chunks == 0:
+            raise ValueError(f"{self.path} holds no samples")
+        self.chunks = np.memmap(
+            self.path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(num_chunks,)
+        )
+        # The chunk index: only these fields are read up front
+        self.t_first = np.array(self.chunks["t_first"])
+        last_count = int(self.chunks["count"][-1])
+        self.num_samples = (num_chunks - 1) * chunk_samples + last_count
+
+    @property
+    def start_time(self):
+        return float(self.t_first[0])
+
+    @property
+    def end_time(self):
+        return float(self.chunks["t_last"][-1])
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def index_at(self, t):
+        """Number of samples with a timestamp at or before t"""
+        chunk = int(np.searchsorted(self.t_first, t, side="right")) - 1
+        if chunk < 0:
+            return 0
+        count = int(self.chunks["count"][chunk])
+        timestamps = self.chunks["timestamps"][chunk, :count]
+        return chunk * self.chunk_samples + int(np.searchsorted(timestamps, t, side="right"))
+
+    def read(self, start, stop):
+        """Copy samples and timestamps for sample indices [start, stop)"""
+        start, stop = max(start, 0), min(stop, self.num_samples)
+        samples = np.empty((max(stop - start, 0), self.num_channels), dtype=np.float32)
+        timestamps = np.empty(len(samples))
+        position = start
+        while position < stop:
+            chunk, offset = divmod(position, self.chunk_samples)
+            n = min(stop - position, self.chunk_samples - offset)
+            out = slice(position - start, position - start + n)
+            samples[out] = self.chunks["samples"][chunk, offset : offset + n]
+            timestamps[out] = self.chunks["timestamps"][chunk, offset : offset + n]
+            position += n
+        return samples, timestamps
+
+
+class ReplaySource:
+    """Plays a session file back with the interface of ArduinoEMGHandler.
+
+    Samples become available as their recorded timestamps come up, at speed
+    times real time. Timestamps handed out are shifted to the current
+    perf_counter clock. Only the chunks being played are paged in.
+    """
+
+    # Largest block handed out at once, like the capacity of the sample ring
+    MAX_BLOCK = 65536
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.reader = SessionReader(path)
+        self.num_channels = self.reader.num_channels
+        self.speed = speed
+        self.loop = loop
+        self.start_time = None
+
+    def connect(self):
+        return True
+
+    def start_reading(self):
+        """Start the playback clock"""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        return True
+
+    def stop_reading(self):
+        self.start_time = None
+
+    def disconnect(self):
+        self.stop_reading()
+
+    @property
+    def sample_rate(self):
+        """Average samples per second of the recording"""
+        duration = self.reader.duration
+        if duration <= 0:
+            return float(self.reader.num_samples)
+        return (self.reader.num_samples - 1) / duration
+
+    @property
+    def write_index(self):
+        """Total number of samples played so far, counting loops"""
+        if self.start_time is None:
+            return 0
+        elapsed = (time.perf_counter() - self.start_time) * self.speed
+        duration = self.reader.duration
+        if not self.loop or duration <= 0:
+            return self.reader.index_at(self.reader.start_time + elapsed)
+        lap, offset = divmod(elapsed, duration)
+        return int(lap) * self.reader.num_samples + self.reader.index_at(
+            self.reader.start_time + offset
+        )
+
+    def get_latest_value(self, channel=0):
+        """Get the latest value from the specified channel"""
+        index = self.write_index
+        if index == 0 or not 0 <= channel < self.num_channels:
+            return 0.0
+        samples, _ = self.reader.read(*self._lap_range(index - 1, index))
+        return float(samples[0, channel]) if len(samples) else 0.0
+
+    def read_since(self, cursor):
+        """Get every sample played after cursor, as (samples, new_cursor)"""
+        samples, _, cursor = self.read_block_since(cursor)
+        return samples, cursor
+
+    def read_block_since(self, cursor):
+        """Get (samples, timestamps, new_cursor) for samples played after cursor"""
+        write_index = self.write_index
+        cursor = max(cursor, write_index - self.MAX_BLOCK)
+        blocks = []
+        while cursor < write_index:
+            # Split at loop boundaries
+            lap = cursor // self.reader.num_samples
+            stop = min(write_index, (lap + 1) * self.reader.num_samples)
+            samples, timestamps = self.reader.read(*self._lap_range(cursor, stop))
+            blocks.append((samples, self._playback_time(timestamps, lap)))
+            cursor = stop
+
+        if not blocks:
+            return np.empty((0, self.num_channels), np.float32), np.empty(0), write_index
+        if len(blocks) == 1:
+            return blocks[0][0], blocks[0][1], write_index
+        samples, timestamps = zip(*blocks)
+        return np.concatenate(samples), np.concatenate(timestamps), write_index
+
+    def _lap_range(self, start, stop):
+        """Map global indices within one lap onto file indices"""
+        lap = start // self.reader.num_samples
+        offset = lap * self.reader.num_samples
+        return start - offset, stop - offset
+
+    def _playback_time(self, timestamps, lap):
+        """Map recorded timestamps onto the playback perf_counter clock"""
+        recorded = lap * self.reader.duration + timestamps - self.reader.start_time
+        return self.start_time + recorded / self.speed
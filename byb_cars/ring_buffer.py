@@ -0,0 +1,202 @@
+from multiprocessing import shared_memory
+import time
+
+import numpy as np
+
+# Shared ring layout: a small int64 header, the sample block, then timestamps
+HEADER_SIZE = 64
+_WRITE_INDEX, _CAPACITY, _NUM_CHANNELS, _WRITING = range(4)
+
+
+class SampleRingBuffer:
+    """Fixed-capacity ring of samples for one producer and one or more readers.
+
+    The producer writes whole blocks and only then advances ``write_index``,
+    the total number of samples ever written. Readers keep their own cursor
+    (a previous ``write_index``) and call ``read_since`` to get everything new.
+    No lock is taken: a reader that falls more than ``capacity`` samples
+    behind loses the oldest samples instead of blocking the producer. Before
+    it overwrites anything the producer publishes the index its block will
+    end at, and copying readers check it after the copy, so samples torn by
+    a concurrent write are dropped rather than returned.
+    Every sample also carries a host timestamp in ``time.perf_counter()``
+    seconds.
+    """
+
+    def __init__(self, capacity=65536, num_channels=1, dtype=np.float32, buffer=None):
+        self.capacity = capacity
+        self.num_channels = num_channels
+        if buffer is None:
+            buffer = bytearray(self.nbytes(capacity, num_channels, dtype))
+
+        # The write index lives in the buffer too, so that another process
+        # mapping the same memory sees it advance
+        self._header = np.ndarray((4,), dtype=np.int64, buffer=buffer)
+        self._header[_CAPACITY] = capacity
+        self._header[_NUM_CHANNELS] = num_channels
+        self.data = np.ndarray(
+            (capacity, num_channels), dtype=dtype, buffer=buffer, offset=HEADER_SIZE
+        )
+        self.timestamps = np.ndarray(
+            (capacity,),
+            dtype=np.float64,
+            buffer=buffer,
+            offset=self._timestamps_offset(capacity, num_channels, dtype),
+        )
+
+    @staticmethod
+    def _timestamps_offset(capacity, num_channels, dtype):
+        data_size = capacity * num_channels * np.dtype(dtype).itemsize
+        # Keep the float64 timestamps 8-byte aligned
+        return HEADER_SIZE + (data_size + 7) // 8 * 8
+
+    @classmethod
+    def nbytes(cls, capacity, num_channels, dtype=np.float32):
+        """Size of the buffer backing a ring of this shape"""
+        return cls._timestamps_offset(capacity, num_channels, dtype) + capacity * 8
+
+    @property
+    def write_index(self):
+        """Total number of samples written so far"""
+        return int(self._header[_WRITE_INDEX])
+
+    @write_index.setter
+    def write_index(self, value):
+        self._header[_WRITE_INDEX] = value
+
+    def write(self, block, timestamps=None):
+        """Append a (n_samples, num_channels) block.
+
+        timestamps holds one time.perf_counter() value per sample; when it is
+        None the whole block is stamped with the current time.
+        """
+        block = np.asarray(block, dtype=self.data.dtype).reshape(-1, self.num_channels)
+        n = len(block)
+        if n == 0:
+            return
+        if timestamps is None:
+            timestamps = np.full(n, time.perf_counter())
+        if n > self.capacity:
+            # Only the newest samples fit
+            block = block[-self.capacity :]
+            timestamps = timestamps[-self.capacity :]
+
+        # Readers drop whatever this block is about to overwrite
+        self._header[_WRITING] = self.write_index + n
+        start = (self.write_index + n - len(block)) % self.capacity
+        first = min(len(block), self.capacity - start)
+        rest = len(block) - first
+        self.data[start : start + first] = block[:first]
+        self.data[:rest] = block[first:]
+        self.timestamps[start : start + first] = timestamps[:first]
+        self.timestamps[:rest] = timestamps[first:]
+
+        # Publish only once the samples are in place
+        self.write_index += n
+
+    def read_since(self, cursor, copy=False):
+        """Return (samples, new_cursor) with every sample written after cursor.
+
+        The samples are a view into the ring when they do not wrap around and
+        copy is False, otherwise a single contiguous copy. Views are only valid
+        until the producer laps them, so consume them before the next frame.
+        """
+        write_index = self.write_index
+        # Skip samples that have already been overwritten
+        cursor = max(cursor, write_index - self.capacity)
+        samples = self._read(self.data, cursor, write_index, copy)
+        return samples, write_index
+
+    def read_block_since(self, cursor, copy=False):
+        """Like read_since, but returns (samples, timestamps, new_cursor).
+
+        As there, views are only valid until the producer laps them; pass
+        copy=True to keep the samples or to read in another thread.
+        """
+        write_index = self.write_index
+        cursor = max(cursor, write_index - self.capacity)
+        samples = self._read(self.data, cursor, write_index, copy)
+        timestamps = self._read(self.timestamps, cursor, write_index, copy)
+        # Either read may have been trimmed by an overrun
+        n = min(len(samples), len(timestamps))
+        return samples[len(samples) - n :], timestamps[len(timestamps) - n :], write_index
+
+    def _read(self, array, cursor, write_index, copy):
+        """Entries of array between cursor and write_index.
+
+        A view cannot be checked for later writes, so only copies are trimmed.
+        """
+        n = write_index - cursor
+        if n <= 0:
+            return array[:0]
+
+        start = cursor % self.capacity
+        if start + n <= self.capacity:
+            values = array[start : start + n]
+            if not copy:
+                return values
+            values = values.copy()
+        else:
+            values = np.concatenate((array[start:], array[: start + n - self.capacity]))
+
+        # Drop anything the producer overwrote, or started to, while we were
+        # copying; the write index alone misses a write still in progress
+        written = max(int(self._header[_WRITING]), self.write_index)
+        overrun = written - self.capacity - cursor
+        if overrun > 0:
+            values = values[overrun:]
+        return values
+
+    def latest(self, n=1):
+        """Return a copy of the last n samples (fewer if not written yet)"""
+        samples, _ = self.read_since(self.write_index - n, copy=True)
+        return samples
+
+
+class SharedSampleRingBuffer(SampleRingBuffer):
+    """SampleRingBuffer backed by multiprocessing.shared_memory.
+
+    The process that creates the ring owns the segment and unlinks it on
+    close(); other processes attach by name and get the same lock-free
+    single-producer semantics, with the write index acting as the sequence
+    counter.
+    """
+
+    def __init__(self, capacity=65536, num_channels=1, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=self.nbytes(capacity, num_channels)
+            )
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            # Take the shape from the header written by the owner
+            header = np.ndarray((3,), dtype=np.int64, buffer=self.shm.buf)
+            capacity = int(header[_CAPACITY])
+            num_channels = int(header[_NUM_CHANNELS])
+            del header
+
+        super().__init__(capacity, num_channels, buffer=self.shm.buf)
+
+    @classmethod
+    def attach(cls, name):
+        """Map a ring created by another process"""
+        return cls(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        """Release the mapping, and the segment itself if we own it"""
+        if self.shm is None:
+            return
+        # Views on the segment must go before it can be closed
+        self._header = None
+        self.data = None
+        self.timestamps = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
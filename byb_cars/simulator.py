@@ -0,0 +1,284 @@
+"""Virtual Arduino that speaks the arduino_code.ino serial protocol over a pty.
+
+Run ``byb-cars-sim`` and pass the printed port to ``byb-cars --port``.
+Linux/macOS only, as it needs a pseudo-terminal.
+"""
+import argparse
+import errno
+import os
+import threading
+import time
+import tty
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from byb_cars.decoder import (
+    END_ESCAPE_SEQ,
+    FIRMWARE_SAMPLE_RATE,
+    START_ESCAPE_SEQ,
+    V2_SEQUENCE_MODULO,
+    encode_frames,
+    v2_batch_frames,
+    v2_checksum,
+)
+
+# Constants from Arduino firmware
+SHIELD_TYPE = b"HWT:MUSCLESS;"
+MAX_CHANNELS = 6
+
+
+@dataclass
+class SimulatorConfig:
+    # Total ADC samples per second, split across channels like the firmware does
+    sample_rate: float = FIRMWARE_SAMPLE_RATE
+    num_channels: int = 1
+    baud_rate: int = 230400
+    # Cap the byte rate at what the serial line could carry (10 bits per byte)
+    line_limit: bool = True
+
+    # Probability for each byte to be dropped or to get a bit flipped
+    corruption_rate: float = 0.0
+
+    # How often bytes are pushed into the pty, like USB packets
+    packet_interval: float = 0.001
+    seed: Optional[int] = None
+
+
+class VirtualArduino:
+    """Stand-in for the Backyard Brains shield on a pseudo-terminal"""
+
+    def __init__(self, config=None):
+        self.config = config or SimulatorConfig()
+        self.num_channels = self.config.num_channels
+        self.rng = np.random.default_rng(self.config.seed)
+
+        self.master_fd, self.slave_fd = os.openpty()
+        # No echo or line editing, like a real serial port
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+
+        self.running = False
+        self.thread = None
+        self.command_buffer = bytearray()
+        self.pending_message = b""
+        self.sample_index = 0
+        self.protocol_version = 1
+        self.sequence = 0
+        self.unsent_values = None  # v2 frames waiting for a full batch
+
+        # Counters
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.bytes_dropped = 0
+        self.bytes_corrupted = 0
+
+    @property
+    def frame_rate(self):
+        """Frames per second at the current number of channels"""
+        rate = self.config.sample_rate / self.num_channels
+        if self.config.line_limit:
+            line_rate = self.config.baud_rate / 10 / (2 * self.num_channels)
+            rate = min(rate, line_rate)
+        return rate
+
+    def start(self):
+        """Start streaming in a background thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def close(self):
+        self.stop()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def _run(self):
+        last_time = next_time = time.perf_counter()
+        frames_owed = 0.0
+        while self.running:
+            self._handle_commands()
+
+            # Accumulate fractional frames so any rate is met on average
+            now = time.perf_counter()
+            frames_owed += (now - last_time) * self.frame_rate
+            last_time = now
+            num_frames = int(frames_owed)
+            frames_owed -= num_frames
+
+            data = self.pending_message + self._encode(num_frames)
+            self.pending_message = b""
+            self._write(self._corrupt(data))
+            self.frames_sent += num_frames
+
+            next_time += self.config.packet_interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def _handle_commands(self):
+        """Answer commands sent by the host"""
+        try:
+            self.command_buffer.extend(os.read(self.master_fd, 1024))
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EIO):
+                raise
+
+        while b"\n" in self.command_buffer:
+            line, _, rest = bytes(self.command_buffer).partition(b"\n")
+            self.command_buffer = bytearray(rest)
+            for command in line.split(b";"):
+                name, _, value = command.partition(b":")
+                name = name.strip()
+                if name == b"c" and value.strip().isdigit():
+                    self._set_channels(int(value))
+                elif name == b"b":
+                    self._send_message(SHIELD_TYPE)
+                elif name == b"p" and value.strip() in (b"1", b"2"):
+                    self.protocol_version = int(value)
+                    self.unsent_values = None
+                    self._send_message(b"PROTO:%d;" % self.protocol_version)
+
+    def _send_message(self, message):
+        """Queue an escape-framed reply ahead of the next frames"""
+        self.pending_message += START_ESCAPE_SEQ + message + END_ESCAPE_SEQ
+
+    def _set_channels(self, num_channels):
+        if 1 <= num_channels <= MAX_CHANNELS:
+            self.num_channels = num_channels
+            self.unsent_values = None
+
+    def _signal(self, num_frames):
+        """Synthetic EMG around mid-scale: noise bursts every couple of seconds"""
+        t = (self.sample_index + np.arange(num_frames)) / self.frame_rate
+        self.sample_index += num_frames
+        envelope = 20 + 200 * np.clip(np.sin(2 * np.pi * 0.4 * t), 0, None)
+        noise = self.rng.standard_normal((num_frames, self.num_channels))
+        values = 512 + envelope[:, None] * noise
+        return np.clip(values, 0, 1023).astype(np.int16)
+
+    def _encode(self, num_frames):
+        """Frame samples the way the firmware does"""
+        if num_frames <= 0:
+            return b""
+        values = self._signal(num_frames)
+        if self.protocol_version == 2:
+            return self._encode_v2(values)
+        return encode_frames(values)
+
+    def _encode_v2(self, values):
+        """Pack whole batches of frames; the remainder waits for more"""
+        if self.unsent_values is not None:
+            values = np.concatenate((self.unsent_values, values))
+        frames_per_batch = v2_batch_frames(self.num_channels)
+        num_batches = len(values) // frames_per_batch
+        self.unsent_values = values[num_batches * frames_per_batch :]
+        if num_batches == 0:
+            return b""
+
+        values = values[: num_batches * frames_per_batch].reshape(num_batches, -1)
+        batches = np.empty((num_batches, 1 + 2 * values.shape[1] + 2), dtype=np.uint8)
+        batches[:, 0] = (self.sequence + np.arange(num_batches)) % V2_SEQUENCE_MODULO
+        batches[:, 1:-2:2] = (values >> 7) & 0x7F
+        batches[:, 2:-2:2] = values & 0x7F
+        batches[:, -2], batches[:, -1] = v2_checksum(batches[:, :-2])
+        # Only the header byte has the high bit set
+        batches[:, 0] |= 0x80
+        self.sequence = (self.sequence + num_batches) % V2_SEQUENCE_MODULO
+        return batches.tobytes()
+
+    def _corrupt(self, data):
+        """Drop bytes and flip bits with probability corruption_rate per byte"""
+        if not data or self.config.corruption_rate <= 0:
+            return data
+        array = np.frombuffer(data, dtype=np.uint8).copy()
+        hit = np.flatnonzero(self.rng.random(len(array)) < self.config.corruption_rate)
+        if len(hit) == 0:
+            return data
+        self.bytes_corrupted += len(hit)
+        drop = self.rng.random(len(hit)) < 0.5
+        flipped = hit[~drop]
+        array[flipped] ^= (1 << self.rng.integers(0, 8, len(flipped))).astype(np.uint8)
+        return np.delete(array, hit[drop]).tobytes()
+
+    def _write(self, data):
+        """Write without blocking; whatever does not fit is lost, like on a UART"""
+        if not data:
+            return
+        try:
+            written = os.write(self.master_fd, data)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EIO):
+                raise
+            written = 0
+        self.bytes_sent += written
+        self.bytes_dropped += len(data) - written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Virtual Backyard Brains EMG shield")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=FIRMWARE_SAMPLE_RATE,
+        help="Total samples per second across channels (default: 10000)",
+    )
+    parser.add_argument("--channels", type=int, default=1, help="Initial number of channels")
+    parser.add_argument(
+        "--corrupt",
+        type=float,
+        default=0.0,
+        help="Probability for each byte to be dropped or bit-flipped",
+    )
+    parser.add_argument(
+        "--no-line-limit",
+        action="store_true",
+        help="Stream faster than 230400 baud could carry",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    arduino = VirtualArduino(
+        SimulatorConfig(
+            sample_rate=args.rate,
+            num_channels=args.channels,
+            corruption_rate=args.corrupt,
+            line_limit=not args.no_line_limit,
+            seed=args.seed,
+        )
+    )
+    arduino.start()
+    print(f"Virtual Arduino on {arduino.port}")
+    print(f"Run: byb-cars --port {arduino.port}")
+
+    try:
+        last_bytes = 0
+        while True:
+            time.sleep(1.0)
+            rate = arduino.bytes_sent - last_bytes
+            last_bytes = arduino.bytes_sent
+            print(
+                f"{arduino.frame_rate:.0f} frames/s x {arduino.num_channels} ch, "
+                f"{rate} bytes/s sent, {arduino.bytes_dropped} dropped, "
+                f"{arduino.bytes_corrupted} corrupted"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        arduino.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Streaming EMG power spectrum and median/mean frequency.
+
+EMGSpectrum cuts the incoming samples into overlapping Hann-windowed frames
+and transforms every frame that a block completes with one batched rfft
+across frames and channels. From each spectrum it takes the median and mean
+frequency over the EMG band. As a muscle fatigues, its conduction velocity
+drops and both frequencies slide down, which the time-domain plot cannot show.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+@dataclass
+class SpectrumConfig:
+    # Frame length and the step between frame starts, in seconds; 25 ms steps
+    # over 100 ms frames is 75% overlap
+    window_seconds: float = 0.1
+    hop_seconds: float = 0.025
+
+    # Band used for the median and mean frequency, and shown by the spectrogram
+    min_frequency: float = 20.0
+    max_frequency: float = 500.0
+
+
+class EMGSpectrum:
+    """Overlapping windowed FFTs of a stream of (n_samples, num_channels) blocks.
+
+    process() returns the power spectra of the frames the block completed, as
+    (n_frames, num_channels, n_bins), and updates median_frequency and
+    mean_frequency with the newest frame. The frequency of each bin is in
+    frequencies.
+    """
+
+    def __init__(self, sample_rate, num_channels=1, config=None):
+        self.config = config or SpectrumConfig()
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.window_size = max(8, int(round(self.config.window_seconds * sample_rate)))
+        self.hop = max(1, int(round(self.config.hop_seconds * sample_rate)))
+        self.window = np.hanning(self.window_size).astype(np.float32)
+
+        self.frequencies = np.fft.rfftfreq(self.window_size, 1 / sample_rate)
+        # Metric band, clamped to what the sample rate can represent
+        self.band = slice(
+            int(np.searchsorted(self.frequencies, self.config.min_frequency)),
+            max(2, int(np.searchsorted(self.frequencies, self.config.max_frequency, side="right"))),
+        )
+        self._band_frequencies = self.frequencies[self.band]
+
+        # Samples not yet covered by a full frame, and the frames of a block
+        self._buffer = np.zeros((4 * self.window_size, num_channels), dtype=np.float32)
+        self._filled = 0
+        self._next_start = 0
+        self._frames = np.empty((0, num_channels, self.window_size), dtype=np.float32)
+        self.frames_total = 0
+
+        self.median_frequency = np.full(num_channels, np.nan)
+        self.mean_frequency = np.full(num_channels, np.nan)
+
+    def reset(self):
+        self._filled = 0
+        self._next_start = 0
+        self.frames_total = 0
+        self.median_frequency[:] = np.nan
+        self.mean_frequency[:] = np.nan
+
+    def process(self, block):
+        """Power spectra of the frames completed by block"""
+        block = np.asarray(block, dtype=np.float32).reshape(-1, self.num_channels)
+        self._append(block)
+
+        available = self._filled - self._next_start - self.window_size
+        if available < 0:
+            return np.empty((0, self.num_channels, len(self.frequencies)))
+        n_frames = available // self.hop + 1
+        if len(self._frames) < n_frames:
+            self._frames = np.empty((n_frames, self.num_channels, self.window_size), dtype=np.float32)
+        frames = self._frames[:n_frames]
+
+        # (n_frames, num_channels, window_size) views into the buffer
+        stop = self._next_start + (n_frames - 1) * self.hop + self.window_size
+        views = sliding_window_view(
+            self._buffer[self._next_start : stop], self.window_size, axis=0
+        )[:: self.hop]
+        np.subtract(views, views.mean(axis=-1, keepdims=True), out=frames)
+        frames *= self.window
+        spectra = np.fft.rfft(frames, axis=-1)
+        power = spectra.real**2 + spectra.imag**2
+        self._next_start += n_frames * self.hop
+        self.frames_total += n_frames
+
+        self.median_frequency, self.mean_frequency = self.band_frequencies(power[-1])
+        return power
+
+    def _append(self, block):
+        """Add block to the buffer, dropping samples no frame needs any more"""
+        n = len(block)
+        if self._filled + n > len(self._buffer):
+            keep = self._filled - self._next_start
+            if keep + n > len(self._buffer):
+                # Larger than anything seen so far: grow instead of shifting
+                grown = np.zeros((2 * (keep + n), self.num_channels), dtype=np.float32)
+                grown[:keep] = self._buffer[self._next_start : self._filled]
+                self._buffer = grown
+            else:
+                self._buffer[:keep] = self._buffer[self._next_start : self._filled]
+            self._filled = keep
+            self._next_start = 0
+        self._buffer[self._filled : self._filled + n] = block
+        self._filled += n
+
+    def band_frequencies(self, power):
+        """(median, mean) frequency over the band of spectra shaped (..., n_bins)"""
+        band = power[..., self.band]
+        total = band.sum(axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (band @ self._band_frequencies) / total
+        # First bin where the cumulative power reaches half of the total
+        cumulative = np.cumsum(band, axis=-1)
+        index = np.minimum((cumulative < total[..., None] / 2).sum(axis=-1), band.shape[-1] - 1)
+        median = np.where(total > 0, self._band_frequencies[index], np.nan)
+        return median, mean
@@ -0,0 +1,212 @@
+"""Acquisition health counters and the monitor that turns them into rates.
+
+The reader thread (or acquisition process) is the only writer of a
+HealthCounters block and only ever adds to or overwrites single int64 slots,
+so the game can read it at any time without a lock. A torn read costs at
+most one slightly stale number on the overlay.
+"""
+from multiprocessing import shared_memory
+import csv
+import os
+import time
+
+import numpy as np
+
+HEALTH_FIELDS = (
+    "bytes_read",  # bytes returned by serial reads
+    "read_calls",  # reads that returned data
+    "max_read_size",  # largest single read, in bytes
+    "frames_decoded",  # frames written to the sample ring
+    "resync_bytes",  # bytes dropped while looking for a frame start, v2 filler excluded
+    "backlog_bytes",  # bytes waiting in the driver after the last decode
+    "batches_lost",  # protocol v2 sequence gaps
+    "batches_corrupt",  # protocol v2 full-length batches failing the checksum
+    "exceptions",  # errors caught by the reader loop
+)
+_INDEX = {name: i for i, name in enumerate(HEALTH_FIELDS)}
+
+
+class HealthCounters:
+    """Named int64 counters for one writer and any number of readers"""
+
+    def __init__(self, buffer=None):
+        if buffer is None:
+            buffer = bytearray(self.nbytes())
+        self.values = np.ndarray((len(HEALTH_FIELDS),), dtype=np.int64, buffer=buffer)
+
+    @staticmethod
+    def nbytes():
+        return len(HEALTH_FIELDS) * 8
+
+    def add(self, name, n=1):
+        self.values[_INDEX[name]] += n
+
+    def set(self, name, value):
+        self.values[_INDEX[name]] = value
+
+    def get(self, name):
+        return int(self.values[_INDEX[name]])
+
+    def snapshot(self):
+        """Copy of every counter, as a dict"""
+        return dict(zip(HEALTH_FIELDS, self.values.tolist()))
+
+
+class SharedHealthCounters(HealthCounters):
+    """HealthCounters in multiprocessing.shared_memory, like SharedSampleRingBuffer"""
+
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.nbytes())
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        super().__init__(self.shm.buf)
+        if self.owner:
+            self.values[:] = 0
+
+    @classmethod
+    def attach(cls, name):
+        return cls(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        """Release the mapping, and the segment itself if we own it"""
+        if self.shm is None:
+            return
+        self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+
+class HealthMonitor:
+    """Rates over the last window and a periodic CSV dump.
+
+    Call update() once per game frame with the frame time. counters may be
+    None (demo mode, replay), in which case only the frame times are shown.
+    Subscribe on_input to the InputBus to also track input latency.
+    """
+
+    # Counters shown as per-second rates
+    RATE_FIELDS = ("bytes_read", "frames_decoded", "resync_bytes", "read_calls")
+
+    def __init__(self, counters=None, csv_path=None, csv_interval=5.0, window=1.0):
+        self.counters = counters
+        self.window = window
+        self.csv_interval = csv_interval
+        self.rates = {}
+        self.max_frame_time = 0.0
+        self.input_latency = float("nan")
+        self.samples_per_tick = 0
+
+        now = time.perf_counter()
+        self._start_time = now
+        self._window_start = now
+        self._window_snapshot = self._snapshot()
+        self._window_max_frame = 0.0
+        self._window_frames = 0
+        self._next_dump = now + csv_interval
+
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path:
+            # Append, so earlier runs stay in the log; the header goes in a new file only
+            new_file = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self.csv_file = open(csv_path, "a", newline="")
+            self.csv_writer = csv.writer(self.csv_file)
+            if new_file:
+                self.csv_writer.writerow(
+                    ["wall_time", "elapsed"]
+                    + list(HEALTH_FIELDS)
+                    + [f"{name}_per_s" for name in self.RATE_FIELDS]
+                    + ["fps", "max_frame_ms", "input_latency_ms"]
+                )
+
+    def on_input(self, snapshot):
+        """InputBus subscriber: age of the newest sample and samples per tick"""
+        self.samples_per_tick = len(snapshot.samples)
+        if self.samples_per_tick:
+            self.input_latency = snapshot.latency
+
+    def _snapshot(self):
+        return self.counters.snapshot() if self.counters is not None else {}
+
+    def update(self, frame_time=None):
+        """Account for one game frame; frame_time in seconds"""
+        if frame_time is not None:
+            self._window_max_frame = max(self._window_max_frame, frame_time)
+        self._window_frames += 1
+
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            snapshot = self._snapshot()
+            self.rates = {
+                name: (snapshot[name] - self._window_snapshot[name]) / elapsed
+                for name in self.RATE_FIELDS
+                if name in snapshot
+            }
+            self.rates["fps"] = self._window_frames / elapsed
+            self.max_frame_time = self._window_max_frame
+            self._window_snapshot = snapshot
+            self._window_start = now
+            self._window_max_frame = 0.0
+            self._window_frames = 0
+
+        if self.csv_writer and now >= self._next_dump:
+            self._next_dump = now + self.csv_interval
+            self._dump(now)
+
+    def _dump(self, now):
+        snapshot = self._snapshot()
+        self.csv_writer.writerow(
+            [f"{time.time():.3f}", f"{now - self._start_time:.3f}"]
+            + [snapshot.get(name, "") for name in HEALTH_FIELDS]
+            + [f"{self.rates.get(name, 0.0):.1f}" for name in self.RATE_FIELDS]
+            + [
+                f"{self.rates.get('fps', 0.0):.1f}",
+                f"{self.max_frame_time * 1000:.1f}",
+                f"{self.input_latency * 1000:.2f}",
+            ]
+        )
+        self.csv_file.flush()
+
+    def lines(self):
+        """Text lines for the on-screen overlay"""
+        rates = self.rates
+        lines = [
+            f"FPS: {rates.get('fps', 0.0):.0f}  worst frame: {self.max_frame_time * 1000:.1f} ms",
+            f"Input: {self.samples_per_tick} samples/tick, "
+            f"latency {self.input_latency * 1000:.1f} ms",
+        ]
+        if self.counters is None:
+            return lines
+        counters = self.counters.snapshot()
+        read_calls = max(counters["read_calls"], 1)
+        lines += [
+            f"Serial: {rates.get('bytes_read', 0.0):.0f} B/s in "
+            f"{rates.get('read_calls', 0.0):.0f} reads/s "
+            f"(avg {counters['bytes_read'] / read_calls:.0f} B, max {counters['max_read_size']} B)",
+            f"Frames: {rates.get('frames_decoded', 0.0):.0f}/s  "
+            f"resync drops: {rates.get('resync_bytes', 0.0):.0f} B/s "
+            f"({counters['resync_bytes']} total)",
+            f"Backlog: {counters['backlog_bytes']} B  exceptions: {counters['exceptions']}",
+        ]
+        if counters["batches_lost"] or counters["batches_corrupt"]:
+            lines.append(
+                f"Batches lost: {counters['batches_lost']}  corrupt: {counters['batches_corrupt']}"
+            )
+        return lines
+
+    def close(self):
+        if self.csv_file:
+            self._dump(time.perf_counter())
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
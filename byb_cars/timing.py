@@ -0,0 +1,138 @@
+"""Reconstruction of per-sample timestamps from serial read times.
+
+The shield samples on its own crystal, which runs a little off nominal and
+drifts with temperature. The host only sees when a read call returned, which
+is later than when the samples were taken by a varying amount: USB packet
+scheduling, the read latency target, and the odd stall of the reader thread.
+SampleClock fits the sample counter against those read times and turns
+sample indices into ``time.perf_counter()`` seconds.
+"""
+import numpy as np
+
+
+class SampleClock:
+    """Online linear fit of read time against cumulative sample index.
+
+    Each update() says "sample index k had arrived by read time t". The fit
+    is an exponentially weighted least-squares line, so old observations fade
+    out after roughly ``memory`` updates and slow drift of the board clock is
+    followed over long sessions. Reads further than ``outlier_sigma``
+    standard deviations (and at least ``min_tolerance`` seconds) off the line
+    are stalls and do not move the fit. Too many outliers in a row mean the
+    stream lost samples, and the fit starts over.
+
+    Read times are upper bounds on arrival, so the line is shifted down to the
+    lower envelope of recent residuals: timestamps estimate when samples
+    reached the host, not when the read returned.
+    """
+
+    WARMUP = 8  # Updates before the fitted slope is trusted
+    MAX_OUTLIERS = 20  # Consecutive outliers before starting over
+    ENVELOPE_RISE = 1e-5  # Seconds per update the lower envelope relaxes by
+
+    def __init__(self, nominal_rate, memory=2000, outlier_sigma=4.0, min_tolerance=0.002):
+        self.memory = memory
+        self.outlier_sigma = outlier_sigma
+        self.min_tolerance = min_tolerance
+        self.outliers_total = 0
+        self._last_stamp = None
+        self.reset(nominal_rate)
+
+    def reset(self, nominal_rate=None):
+        """Forget every observation, optionally with a new nominal rate"""
+        if nominal_rate is not None:
+            self.nominal_rate = float(nominal_rate)
+        self.updates = 0
+        self.outliers = 0
+        self._weight = 0.0
+        # Weighted means and (co)variance of index and time
+        self._mean_k = 0.0
+        self._mean_t = 0.0
+        self._var_k = 0.0
+        self._cov_kt = 0.0
+        self._var_residual = 0.0
+        self._envelope = 0.0
+        self._last_k = None
+        self._last_t = None
+
+    @property
+    def period(self):
+        """Seconds per sample"""
+        if self.updates < self.WARMUP or self._var_k <= 0:
+            return 1.0 / self.nominal_rate
+        return self._cov_kt / self._var_k
+
+    @property
+    def rate(self):
+        """Estimated samples per second of the board clock"""
+        return 1.0 / self.period
+
+    @property
+    def drift_ppm(self):
+        """How far the board clock is off nominal, in parts per million"""
+        return (self.rate / self.nominal_rate - 1.0) * 1e6
+
+    def update(self, k, t):
+        """Record that sample index k had arrived by time t"""
+        if self.updates < self.WARMUP:
+            self._accept(k, t)
+            return
+
+        deviation = t - self._fit(k) - self._envelope
+        tolerance = max(self.outlier_sigma * np.sqrt(self._var_residual), self.min_tolerance)
+        if abs(deviation) > tolerance:
+            # A stalled read, or samples lost on the way
+            self.outliers += 1
+            self.outliers_total += 1
+            if self.outliers > self.MAX_OUTLIERS:
+                self.reset()
+            return
+        self.outliers = 0
+        self._accept(k, t)
+
+    def _accept(self, k, t):
+        self.updates += 1
+        self._last_k, self._last_t = k, t
+
+        # Exponentially weighted mean and covariance updates
+        self._weight = self._weight * (1.0 - 1.0 / self.memory) + 1.0
+        alpha = 1.0 / self._weight
+        dk = k - self._mean_k
+        dt = t - self._mean_t
+        self._mean_k += alpha * dk
+        self._mean_t += alpha * dt
+        self._var_k = (1.0 - alpha) * (self._var_k + alpha * dk * dk)
+        self._cov_kt = (1.0 - alpha) * (self._cov_kt + alpha * dk * dt)
+        if self.updates <= self.WARMUP:
+            return
+
+        # Spread of the residuals around their lower envelope
+        residual = t - self._fit(k)
+        self._var_residual += alpha * ((residual - self._envelope) ** 2 - self._var_residual)
+        self._envelope = min(residual, self._envelope + self.ENVELOPE_RISE)
+
+    def _fit(self, k):
+        """Read time the line predicts for sample index k"""
+        if self.updates < self.WARMUP:
+            # Not enough points for a slope, go by the latest read
+            return self._last_t + (k - self._last_k) / self.nominal_rate
+        return self._mean_t + (k - self._mean_k) * self.period
+
+    def timestamps(self, first, n):
+        """Estimated arrival times of samples first .. first + n - 1.
+
+        Meant to be called once per block, in order: a block never starts
+        before the previous one ended, even when the fit moves back a little.
+        """
+        if self._last_k is None:
+            return np.full(n, np.nan)
+        indices = first + np.arange(n, dtype=np.float64)
+        if self.updates < self.WARMUP:
+            stamps = self._last_t + (indices - self._last_k) / self.nominal_rate
+        else:
+            stamps = self._mean_t + self._envelope + (indices - self._mean_k) * self.period
+        if self._last_stamp is not None and n and stamps[0] <= self._last_stamp:
+            stamps = np.maximum(stamps, self._last_stamp + (indices - first + 1) * self.period)
+        if n:
+            self._last_stamp = stamps[-1]
+        return stamps
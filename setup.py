@@ -30,6 +30,7 @@ setup(
     entry_points={
         "console_scripts": [
             "byb-cars=byb_cars.main:main",
+            "byb-cars-sim=byb_cars.simulator:main",
         ],
     },
 )
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from byb_cars.calibration import P2Quantile, RunningStats
+
+
+def blocks(values, seed=0):
+    edges = np.sort(np.random.default_rng(seed).choice(np.arange(1, len(values)), 30, replace=False))
+    return np.split(values, edges)
+
+
+def test_running_stats_matches_numpy():
+    values = 3.0 + 0.5 * np.random.default_rng(1).standard_normal(10000)
+    stats = RunningStats()
+    for block in blocks(values):
+        stats.add(block)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert stats.variance == pytest.approx(values.var(ddof=1), rel=1e-10)
+    assert stats.sd == pytest.approx(values.std(ddof=1), rel=1e-10)
+
+
+@pytest.mark.parametrize("p", [0.1, 0.5, 0.9, 0.95])
+def test_p2_quantile_tracks_percentile(p):
+    rng = np.random.default_rng(2)
+    # Skewed like a rectified EMG envelope
+    values = rng.lognormal(0.0, 0.5, 20000)
+    estimator = P2Quantile(p)
+    for block in blocks(values):
+        estimator.add(block)
+    expected = np.percentile(values, 100 * p)
+    assert estimator.value == pytest.approx(expected, rel=0.02)
+
+
+def test_p2_quantile_is_exact_for_few_values():
+    estimator = P2Quantile(0.9)
+    estimator.add([5.0, 1.0, 3.0])
+    assert estimator.value == pytest.approx(np.percentile([5.0, 1.0, 3.0], 90))
@@ -0,0 +1,65 @@
+import numpy as np
+
+from byb_cars.decimation import MinMaxPyramid
+
+
+def append_in_blocks(pyramid, signal, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = np.sort(rng.choice(np.arange(1, len(signal)), 50, replace=False))
+    for block in np.split(signal, edges):
+        pyramid.append(block)
+
+
+def test_levels_hold_min_max_of_raw_runs():
+    signal = np.random.default_rng(1).standard_normal(5000).astype(np.float32)
+    # Blocks stay shorter than the rings, as game frames do
+    pyramid = MinMaxPyramid(capacity=1024, levels=4, factor=4)
+    append_in_blocks(pyramid, signal)
+
+    assert pyramid.total_samples == len(signal)
+    for level in range(pyramid.levels):
+        scale = 4**level
+        count = int(pyramid.counts[level])
+        assert count == len(signal) // scale
+        # The newest `capacity` entries of every level survive
+        start = max(0, count - pyramid.capacity)
+        runs = signal[start * scale : count * scale].reshape(-1, scale)
+        np.testing.assert_array_equal(pyramid._read(pyramid.mins[level], start, count), runs.min(axis=1))
+        np.testing.assert_array_equal(pyramid._read(pyramid.maxs[level], start, count), runs.max(axis=1))
+
+    np.testing.assert_array_equal(pyramid.samples(4900, 5000), signal[4900:])
+    # Samples that left the level 0 ring are dropped from the front
+    np.testing.assert_array_equal(pyramid.samples(0, 5000), signal[-1024:])
+
+
+def reference_window(signal, num_samples, num_pixels, factor):
+    """Coarsest level with an entry per pixel, split into pixels by brute force"""
+    scale = 1
+    while scale * factor <= num_samples / num_pixels:
+        scale *= factor
+    count = len(signal) // scale
+    entries = -(-num_samples // scale)
+    runs = signal[(count - entries) * scale : count * scale].reshape(-1, scale)
+    edges = np.floor(np.linspace(0, entries, num_pixels + 1)).astype(int)
+    mins = [runs[edges[p] : edges[p + 1]].min() for p in range(num_pixels)]
+    maxs = [runs[edges[p] : edges[p + 1]].max() for p in range(num_pixels)]
+    return np.array(mins, dtype=np.float32), np.array(maxs, dtype=np.float32)
+
+
+def test_window_matches_brute_force():
+    signal = np.random.default_rng(2).standard_normal(20000).astype(np.float32)
+    pyramid = MinMaxPyramid(capacity=65536, levels=5, factor=4)
+    append_in_blocks(pyramid, signal)
+    for num_samples, num_pixels in ((100, 100), (1000, 300), (5000, 640), (19999, 640)):
+        mins, maxs = pyramid.window(num_samples, num_pixels)
+        expected_mins, expected_maxs = reference_window(signal, num_samples, num_pixels, 4)
+        np.testing.assert_array_equal(mins, expected_mins)
+        np.testing.assert_array_equal(maxs, expected_maxs)
+
+
+def test_window_pads_missing_history_with_nan():
+    pyramid = MinMaxPyramid()
+    pyramid.append(np.arange(50, dtype=np.float32))
+    mins, maxs = pyramid.window(100, 100)
+    assert np.isnan(mins[:50]).all() and np.isnan(maxs[:50]).all()
+    assert not np.isnan(mins[-1]) and np.nanmax(maxs) <= 49
@@ -0,0 +1,141 @@
+import numpy as np
+
+from byb_cars.decoder import V2Decoder, decode_frames, encode_frames, v2_batch_frames, v2_batch_size
+
+
+def reference_encode(values):
+    """Protocol v1 bytes for (n_frames, num_channels) 14-bit values"""
+    data = bytearray()
+    for frame in values:
+        for channel, value in enumerate(frame):
+            data.append((value >> 7) | (0x80 if channel == 0 else 0))
+            data.append(value & 0x7F)
+    return bytes(data)
+
+
+def reference_decode(buffer, num_channels):
+    """One byte at a time: a start byte opens a frame, any other start drops it"""
+    frames, frame = [], None
+    for byte in buffer:
+        if byte & 0x80:
+            frame = [byte & 0x7F]
+        elif frame is not None:
+            frame.append(byte)
+            if len(frame) == 2 * num_channels:
+                frames.append([(frame[i] << 7) | frame[i + 1] for i in range(0, len(frame), 2)])
+                frame = None
+    return np.array(frames, dtype=np.int16).reshape(-1, num_channels)
+
+
+def checksum(payload):
+    """The firmware's running sums"""
+    s1 = s2 = 0
+    for byte in payload:
+        s1 = (s1 + byte) % 128
+        s2 = (s2 + s1) % 128
+    return s1, s2
+
+
+def encode_batches(values, first_sequence=0):
+    """Protocol v2 bytes for whole batches of (n_frames, num_channels) values"""
+    num_channels = values.shape[1]
+    frames = v2_batch_frames(num_channels)
+    data = bytearray()
+    for i, batch in enumerate(values.reshape(-1, frames * num_channels)):
+        payload = [(first_sequence + i) % 128]
+        for value in batch:
+            payload += [value >> 7, value & 0x7F]
+        data += bytes([payload[0] | 0x80] + payload[1:] + list(checksum(payload)))
+    return bytes(data)
+
+
+def test_decode_frames_matches_per_byte_decoding():
+    rng = np.random.default_rng(0)
+    for num_channels in (1, 2, 6):
+        values = rng.integers(0, 1024, (500, num_channels))
+        data = bytearray(reference_encode(values))
+        # Drop and flip some bytes so frames get truncated or split
+        for index in sorted(rng.choice(len(data), 40, replace=False), reverse=True):
+            if rng.random() < 0.5:
+                del data[index]
+            else:
+                data[index] ^= 0x80
+        data = bytes(data)
+
+        decoded, consumed = decode_frames(data, num_channels)
+        # Only a trailing partial frame is left unconsumed
+        assert not any(byte & 0x80 for byte in data[consumed + 1 :])
+        np.testing.assert_array_equal(decoded, reference_decode(data[:consumed], num_channels))
+
+
+def test_encode_frames_matches_per_byte_encoding():
+    values = np.random.default_rng(3).integers(0, 1024, (100, 3)).astype(np.int16)
+    assert encode_frames(values) == reference_encode(values)
+
+
+def test_decode_frames_in_pieces_matches_whole():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 1024, (300, 2))
+    data = reference_encode(values)
+    decoded, pending = [], b""
+    for piece in np.array_split(np.frombuffer(data, np.uint8), 37):
+        pending += piece.tobytes()
+        frames, consumed = decode_frames(pending, 2)
+        decoded.append(frames)
+        pending = pending[consumed:]
+    np.testing.assert_array_equal(np.concatenate(decoded), values)
+
+
+def test_v2_decoder_matches_per_batch_decoding():
+    rng = np.random.default_rng(2)
+    for num_channels in (1, 3):
+        frames = v2_batch_frames(num_channels)
+        batch_size = v2_batch_size(num_channels)
+        values = rng.integers(0, 1024, (200 * frames, num_channels))
+        batches = [bytearray(b) for b in np.frombuffer(encode_batches(values), np.uint8).reshape(200, -1).tolist()]
+
+        # Corrupt some batches in place, cut bytes out of others, drop a few
+        corrupt = set(rng.choice(200, 10, replace=False).tolist())
+        truncated = set(rng.choice(sorted(set(range(200)) - corrupt), 5, replace=False).tolist())
+        dropped = set(rng.choice(sorted(set(range(200)) - corrupt - truncated), 5, replace=False).tolist())
+        for i in corrupt:
+            batches[i][1 + rng.integers(batch_size - 1)] ^= 0x01
+        for i in truncated:
+            del batches[i][1 + rng.integers(batch_size - 1)]
+        data = b"".join(bytes(b) for i, b in enumerate(batches) if i not in dropped)
+
+        decoder = V2Decoder(num_channels)
+        decoded, consumed = decoder.decode(data)
+        assert consumed == len(data)
+
+        good = [i for i in range(200) if not ({i} & (corrupt | truncated | dropped))]
+        expected = values.reshape(200, frames, num_channels)[good].reshape(-1, num_channels)
+        np.testing.assert_array_equal(decoded, expected)
+        assert decoder.batches_ok == len(good)
+        assert decoder.batches_corrupt == len(corrupt)
+        assert decoder.batches_truncated == len(truncated)
+        # Lost counts every sequence gap between good batches
+        assert decoder.batches_lost == good[-1] - good[0] + 1 - len(good)
+
+
+def test_v2_decoder_counts_sequence_gaps_across_calls():
+    values = np.arange(4 * 32).reshape(-1, 1)
+    decoder = V2Decoder()
+    decoder.decode(encode_batches(values[:64], first_sequence=126))
+    # Sequence wraps from 127 to 0, then skips 1 and 2
+    decoded, _ = decoder.decode(encode_batches(values[64:], first_sequence=3))
+    np.testing.assert_array_equal(decoded, values[64:])
+    assert decoder.batches_lost == 3
+
+
+def test_v2_decoder_counts_filler_apart():
+    # Zero samples put zero bytes inside batches too; only the gaps are filler
+    values = np.zeros((3 * 32, 1), dtype=np.int64)
+    batches = np.frombuffer(encode_batches(values), np.uint8).reshape(3, -1)
+    data = b"\0" * 5 + (b"\0" * 7).join(batch.tobytes() for batch in batches) + b"\0" * 3
+    decoder = V2Decoder()
+    decoded, consumed = decoder.decode(data)
+    assert consumed == len(data)
+    np.testing.assert_array_equal(decoded, values)
+    assert decoder.filler_bytes == 5 + 2 * 7 + 3
+    assert decoder.batches_corrupt == decoder.batches_truncated == decoder.batches_lost == 0
@@ -0,0 +1,15 @@
+import pygame
+
+from byb_cars.elements.fonts import TextCache, get_font
+from byb_cars.elements.layout_config import layout
+
+
+def test_default_family_shares_cache_entries():
+    pygame.font.init()
+    default = layout.fonts.default_font
+    assert get_font(20) is get_font(20, default)
+
+    cache = TextCache()
+    surface = cache.render("Lap 1", 20, (255, 255, 255))
+    assert cache.render("Lap 1", 20, (255, 255, 255), family=default) is surface
+    assert (cache.hits, cache.misses, len(cache.surfaces)) == (1, 1, 1)
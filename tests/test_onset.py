@@ -0,0 +1,67 @@
+import numpy as np
+
+from byb_cars.dsp import SOSFilter, butterworth
+from byb_cars.onset import OnsetConfig, OnsetDetector
+
+RATE = 10000
+
+
+def emg(seed=0):
+    """Rest until calibrated, contractions from 2.5 s to 3.0 s and 3.4 s to 3.6 s"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(4 * RATE) / RATE
+    amplitude = np.where(((t >= 2.5) & (t < 3.0)) | ((t >= 3.4) & (t < 3.6)), 0.2, 0.01)
+    samples = 0.5 + amplitude[:, None] * rng.standard_normal((len(t), 2))
+    return samples.astype(np.float32), 100.0 + t
+
+
+def reference_events(samples, rest_mean, rest_sd, config):
+    """The same envelope over the whole signal, then the hysteresis one sample at a time"""
+    num_channels = samples.shape[1]
+    highpass = SOSFilter(butterworth("highpass", 2, config.highpass_hz, RATE), num_channels)
+    lowpass = SOSFilter(butterworth("lowpass", 2, config.lowpass_hz, RATE), num_channels)
+    level = (lowpass.process(np.abs(highpass.process(samples))) - rest_mean) / rest_sd
+    events = []
+    for channel in range(num_channels):
+        active = False
+        for i, value in enumerate(level[:, channel]):
+            if not active and value > config.on_sd:
+                active = True
+            elif active and value < config.off_sd:
+                active = False
+            else:
+                continue
+            events.append((i, channel, active))
+    return sorted(events)
+
+
+def test_detector_matches_per_sample_hysteresis():
+    samples, timestamps = emg()
+    detector = OnsetDetector(RATE, num_channels=2)
+    detector.set_rest([0.006, 0.007], [0.001, 0.0012])
+    edges = np.sort(np.random.default_rng(1).choice(np.arange(1, len(samples)), 200, replace=False))
+    events = []
+    for block, times in zip(np.split(samples, edges), np.split(timestamps, edges)):
+        events += detector.process(block, times)
+
+    expected = reference_events(samples, detector.rest_mean, detector.rest_sd, OnsetConfig())
+    assert len(expected) >= 8
+    assert sorted((e.sample, e.channel, e.active) for e in events) == expected
+    for event in events:
+        assert event.time == timestamps[event.sample]
+
+
+def test_calibrated_onsets_land_on_the_contractions():
+    samples, timestamps = emg(seed=2)
+    detector = OnsetDetector(RATE, num_channels=2)
+    detector.calibrate()
+    events = []
+    for start in range(0, len(samples), 160):
+        events += detector.process(samples[start : start + 160], timestamps[start : start + 160])
+
+    assert detector.calibrated
+    for channel in range(2):
+        onsets = [e.time - 100.0 for e in events if e.channel == channel and e.active]
+        assert len(onsets) == 2
+        assert 2.5 <= onsets[0] < 2.51
+        assert 3.4 <= onsets[1] < 3.41
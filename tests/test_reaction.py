@@ -0,0 +1,35 @@
+import numpy as np
+
+from byb_cars.elements.reaction import ReactionGame
+from byb_cars.input_bus import InputSnapshot
+
+RATE = 1000
+
+
+def rest_ticks(game, start, seconds, tick=0.02):
+    """Feed resting noise a tick at a time; yields the time after each tick"""
+    rng = np.random.default_rng(0)
+    n = int(tick * RATE)
+    for i in range(int(seconds / tick)):
+        now = start + (i + 1) * tick
+        samples = (0.5 + 0.01 * rng.standard_normal((n, 1))).astype(np.float32)
+        timestamps = now - tick + np.arange(n) / RATE
+        game.update(InputSnapshot(i, now, samples, timestamps, 0.5, 0.0))
+        yield now
+
+
+def test_reset_stays_calibrating_until_the_rest_window_ends():
+    game = ReactionGame(RATE)
+    config = game.detector.config
+    rest_window = config.settle_seconds + config.calibration_seconds
+    for _ in rest_ticks(game, 0.0, rest_window + 0.1):
+        pass
+    assert game.state == ReactionGame.WAITING
+
+    # The filters have settled by now, so only the calibration window remains
+    game.reset()
+    for now in rest_ticks(game, 10.0, config.calibration_seconds + 0.1):
+        if now - 10.0 < config.calibration_seconds - 0.05:
+            assert game.state == ReactionGame.CALIBRATING
+    assert game.state == ReactionGame.WAITING
+    assert not game.detector.calibrating
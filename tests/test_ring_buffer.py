@@ -0,0 +1,58 @@
+import numpy as np
+
+from byb_cars.ring_buffer import _WRITING, SampleRingBuffer, SharedSampleRingBuffer
+
+
+def check_against_list(ring, reader=None):
+    """Random writes and reads, compared with a plain list of every sample written"""
+    reader = reader or ring
+    rng = np.random.default_rng(0)
+    written = np.empty((0, ring.num_channels), dtype=np.float32)
+    stamps = np.empty(0)
+    cursors = [0, 0, 0]
+    for step in range(300):
+        # Mostly small blocks, now and then more than the ring holds
+        n = int(rng.integers(0, 3 * ring.capacity if step % 50 == 49 else ring.capacity // 3))
+        block = rng.standard_normal((n, ring.num_channels)).astype(np.float32)
+        times = step + np.arange(n) / max(n, 1)
+        ring.write(block, times)
+        written = np.concatenate((written, block))
+        stamps = np.concatenate((stamps, times))
+
+        # Readers at different paces, some falling behind by more than capacity
+        for i, cursor in enumerate(cursors):
+            if rng.random() < 1 / (i + 1):
+                samples, timestamps, new_cursor = reader.read_block_since(cursor, copy=bool(i % 2))
+                oldest = max(cursor, len(written) - ring.capacity)
+                np.testing.assert_array_equal(samples, written[oldest:])
+                np.testing.assert_array_equal(timestamps, stamps[oldest:])
+                assert new_cursor == len(written)
+                cursors[i] = new_cursor
+
+    np.testing.assert_array_equal(reader.latest(5), written[-5:])
+
+
+def test_ring_matches_list():
+    check_against_list(SampleRingBuffer(capacity=64, num_channels=2))
+
+
+def test_shared_ring_matches_list_across_mappings():
+    ring = SharedSampleRingBuffer(capacity=64, num_channels=3)
+    reader = SharedSampleRingBuffer.attach(ring.name)
+    try:
+        assert (reader.capacity, reader.num_channels) == (64, 3)
+        check_against_list(ring, reader)
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_copies_drop_samples_a_write_in_progress_overwrites():
+    ring = SampleRingBuffer(capacity=8)
+    ring.write(np.arange(8), np.arange(8.0))
+    # A producer that has announced a 3-sample block but not published it yet
+    ring._header[_WRITING] = ring.write_index + 3
+    samples, timestamps, cursor = ring.read_block_since(0, copy=True)
+    np.testing.assert_array_equal(samples[:, 0], np.arange(3, 8))
+    np.testing.assert_array_equal(timestamps, np.arange(3.0, 8.0))
+    assert cursor == 8
@@ -0,0 +1,91 @@
+import numpy as np
+import pygame
+import pytest
+
+from byb_cars.elements.scenery import (
+    SceneryChunks,
+    SceneryIndex,
+    dart_throw,
+    fill_gap,
+    poisson_disc,
+    scatter_points,
+)
+
+
+def min_distance(xs, ys, other_xs=None, other_ys=None):
+    """Smallest distance between two points, checking every pair"""
+    if other_xs is None:
+        distances = np.hypot(xs[:, None] - xs, ys[:, None] - ys)
+        distances[np.diag_indices(len(xs))] = np.inf
+    else:
+        distances = np.hypot(xs[:, None] - other_xs, ys[:, None] - other_ys)
+    return distances.min()
+
+
+def in_range(values, value_range):
+    return ((values >= value_range[0]) & (values <= value_range[1])).all()
+
+
+@pytest.mark.parametrize("radius", [10.0, 37.5])
+def test_poisson_disc_keeps_points_apart(radius):
+    rng = np.random.default_rng(0)
+    xs, ys = poisson_disc(rng, (0, 300), (0, 2000), radius)
+    assert min_distance(xs, ys) >= radius
+    assert in_range(xs, (0, 300)) and in_range(ys, (0, 2000))
+    # Maximal: no spot of the rectangle is more than 2 radii from a point
+    probe_xs, probe_ys = rng.uniform(0, 300, 2000), rng.uniform(0, 2000, 2000)
+    nearest = np.hypot(probe_xs[:, None] - xs, probe_ys[:, None] - ys).min(axis=1)
+    assert nearest.max() < 2 * radius
+
+
+def test_dart_throw_keeps_points_apart():
+    rng = np.random.default_rng(1)
+    xs, ys = dart_throw(rng, (0, 200), (0, 5000), 25.0, 300)
+    assert len(xs) == 300
+    assert min_distance(xs, ys) >= 25.0
+    assert in_range(xs, (0, 200)) and in_range(ys, (0, 5000))
+
+
+def test_fill_gap_keeps_away_from_existing_points():
+    rng = np.random.default_rng(2)
+    strips = [(0, 150), (450, 600)]
+    xs, ys = scatter_points(rng, strips, (0, 1000), 40.0, count=40)
+    assert len(xs) == 40 and min_distance(xs, ys) >= 40.0
+    new_xs, new_ys = fill_gap(rng, strips, (900, 1100), 40.0, xs, ys)
+    assert len(new_xs) > 0
+    assert in_range(new_ys, (900, 1100))
+    assert min_distance(new_xs, new_ys) >= 40.0
+    assert min_distance(new_xs, new_ys, xs, ys) >= 40.0
+
+
+@pytest.fixture
+def sprites():
+    return [pygame.Surface((20, 30)), pygame.Surface((40, 60))]
+
+
+def test_scenery_index_visible_matches_scan(sprites):
+    rng = np.random.default_rng(3)
+    ys = rng.integers(0, 10000, 500)
+    index = SceneryIndex(rng.integers(0, 800, 500), ys, rng.integers(0, 2, 500), sprites)
+    surface = pygame.Surface((800, 600))
+    for position in rng.integers(-100, 10100, 50):
+        start, stop = index.visible(position, 600)
+        # What a per-tree test against the tallest sprite would pick
+        on_screen = (position - ys > -60) & (position - ys < 600)
+        np.testing.assert_array_equal(np.sort(index.ys[start:stop]), np.sort(ys[on_screen]))
+        assert index.draw(surface, position, 600) == stop - start
+
+
+def test_scenery_chunks_are_deterministic_and_bounded(sprites):
+    def generate(chunk):
+        rng = np.random.default_rng([7, chunk])
+        ys = chunk * 1000 + rng.integers(0, 1000, 20)
+        return SceneryIndex(rng.integers(0, 800, 20), ys, rng.integers(0, 2, 20), sprites)
+
+    chunks = SceneryChunks(1000, generate, max_height=60)
+    for position in range(0, 20000, 50):
+        chunks.update(position, 600)
+        assert len(chunks.chunks) <= 3
+    again = generate(19)
+    np.testing.assert_array_equal(chunks.chunks[19].ys, again.ys)
+    np.testing.assert_array_equal(chunks.chunks[19].xs, again.xs)